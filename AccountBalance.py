@@ -0,0 +1,231 @@
+"""
+Provides a command showing the balance of the account under the cursor.
+
+See README.md for details.
+
+@author: Etienne Monier <etienne.monier@enseeiht.fr>
+@license: CC-BY-NC-SA
+@since: 2026-10-17
+"""
+
+import sublime
+import sublime_plugin
+import datetime
+import re
+import threading
+
+from . import utils
+from . import ledger_balance
+from . import ledger_cache
+from . import ledger_forecast
+from . import ledger_profile
+from . import ledger_regex
+from . import ledger_stream
+from . import ledger_tokenizer
+from .ledger_model import Balance, parse_date
+
+
+# The balance engine of each view, by view id.
+BALANCE_ENGINES = {}
+
+# The engines are created in the worker thread and dropped in the main
+# one. The lock only protects the table: the engines themselves are only
+# used in the worker thread.
+BALANCE_ENGINES_LOCK = threading.Lock()
+
+# The output panel name.
+PANEL_NAME = "ledger_balance"
+
+
+def cursor_account(view):
+    """Returns the account under the first cursor, or None.
+
+    The selected text is used if any, else the account of the posting
+    line.
+    """
+    region = view.sel()[0]
+
+    if not region.empty():
+        return ledger_balance.clean_account(view.substr(region).strip())
+
+    line = view.substr(view.line(region.begin()))
+
+    # Only the account is needed: an invalid amount does not matter.
+    if line[:1] not in (' ', '\t'):
+        return None
+
+    start = len(line) - len(line.lstrip(' \t'))
+    end = ledger_tokenizer.scan_account(line, start)
+
+    if end == start:
+        return None
+
+    return ledger_balance.clean_account(line[start:end])
+
+
+def transaction_date(blocks, point):
+    """Returns the date of the user transaction containing POINT, or None.
+    """
+    for block in blocks:
+        if block.begin <= point < block.end:
+            if block.kind != 'user_transaction':
+                return None
+            m = re.match(ledger_regex.trans_date_line, block.header, re.X)
+            return parse_date(m.group(1)) if m else None
+    return None
+
+
+def update_engine(view_id, filename, blocks):
+    """Updates the balance engine of a view with a snapshot of its blocks
+    and the files it includes.
+
+    Returns
+    -------
+    ledger_balance.BalanceEngine
+    """
+    with BALANCE_ENGINES_LOCK:
+        engine = BALANCE_ENGINES.setdefault(
+            view_id, ledger_balance.BalanceEngine())
+
+    # The view content is used instead of the saved file.
+    engine.update_source(None, ledger_balance.extract_entries(
+        blocks, engine.sources.get(None)))
+
+    included = []
+    if filename is not None:
+        included = ledger_cache.resolve_includes(filename)[1:]
+
+    entries = ledger_cache.derive_files(
+        included, 'balance_entries', ledger_balance.extract_entries)
+
+    for cached, file_entries in zip(included, entries):
+        engine.update_source(cached.filename, file_entries)
+
+    # Drop the files which are not included anymore.
+    names = set(cached.filename for cached in included)
+    for source in list(engine.sources):
+        if source is not None and source not in names:
+            engine.remove_source(source)
+
+    return engine
+
+
+def periodic_transactions(filename, blocks):
+    """Returns the periodic transactions of a view snapshot and of the
+    files it includes.
+    """
+    transactions = ledger_forecast.extract_periodic_transactions(blocks)
+
+    if filename is not None:
+        for file_transactions in ledger_cache.derive_files(
+                ledger_cache.resolve_includes(filename)[1:],
+                'periodic_transactions',
+                ledger_forecast.extract_periodic_transactions):
+            transactions += file_transactions
+
+    return transactions
+
+
+def format_balance(account, date, at_date, total, horizon=None,
+                   projected=None):
+    """Formats the balance panel content.
+    """
+    lines = ['Balance of {}'.format(account)]
+
+    if date is not None:
+        lines.append('')
+        lines.append('At {}:'.format(date.strftime('%Y/%m/%d')))
+        lines.extend('    {}'.format(amount) for amount in at_date or [0])
+
+    lines.append('')
+    lines.append('Total:')
+    lines.extend('    {}'.format(amount) for amount in total or [0])
+
+    if horizon is not None:
+        lines.append('')
+        lines.append('Projected at {}:'.format(horizon.strftime('%Y/%m/%d')))
+        lines.extend('    {}'.format(amount) for amount in projected or [0])
+
+    return '\n'.join(lines) + '\n'
+
+
+class LedgerShowBalanceCommand(sublime_plugin.TextCommand):
+    """Shows the balance of the account under the cursor (with its
+    sub-accounts), at the date of the current transaction, in total and
+    projected with the periodic transactions. The balances are computed
+    in the worker thread.
+    """
+
+    @ledger_profile.profiled('balance')
+    def run(self, edit):
+
+        account = cursor_account(self.view)
+
+        if not account:
+            sublime.status_message("LedgerTools: no account under the cursor.")
+            return
+
+        # Take a snapshot of the view.
+        view_id = self.view.id()
+        filename = self.view.file_name()
+        point = self.view.sel()[0].begin()
+        text = self.view.substr(sublime.Region(0, self.view.size()))
+        horizon_days = utils.get_settings().get('forecast_horizon_days', 365)
+
+        @ledger_profile.profiled('balance_compute')
+        def compute():
+            ledger_profile.set_size(len(text))
+            blocks = ledger_stream.split_blocks(text)
+            ledger_profile.add_items(len(blocks))
+            try:
+                engine = update_engine(view_id, filename, blocks)
+            except ledger_cache.IncludeCycleError as error:
+                sublime.error_message(str(error))
+                return
+
+            date = transaction_date(blocks, point)
+            total = engine.balance(account)
+
+            # The projected balance is the total and the occurrences of
+            # the periodic transactions from tomorrow to the horizon.
+            horizon = projected = None
+            if horizon_days > 0:
+                today = datetime.date.today()
+                horizon = today + datetime.timedelta(days=horizon_days)
+                projected = ledger_forecast.forecast_balance(
+                    periodic_transactions(filename, blocks), account,
+                    today + datetime.timedelta(days=1), horizon)
+                projected += Balance(total)
+                projected = projected.amounts()
+
+            content = format_balance(
+                account, date,
+                None if date is None else engine.balance(account, date),
+                total, horizon, projected)
+
+            sublime.set_timeout(lambda: self.show(content), 0)
+
+        sublime.set_timeout_async(compute, 0)
+
+    def show(self, content):
+        """Shows the balance in the output panel, in the main thread.
+        """
+        window = self.view.window()
+        if window is None:
+            return
+
+        panel = window.create_output_panel(PANEL_NAME)
+        panel.run_command("append", {"characters": content})
+        window.run_command("show_panel", {"panel": "output." + PANEL_NAME})
+
+    def is_enabled(self):
+        return utils.is_ledger_file(self.view)
+
+
+class BalanceEngineCleaner(sublime_plugin.EventListener):
+    """Drops the balance engine of a closed view.
+    """
+
+    def on_close(self, view):
+        with BALANCE_ENGINES_LOCK:
+            BALANCE_ENGINES.pop(view.id(), None)
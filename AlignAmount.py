@@ -10,62 +10,131 @@ See README.md for details.
 
 import sublime
 import sublime_plugin
-import re
 import threading
 
 from . import utils
+from . import ledger_align
+from . import ledger_profile
 
 
-class LedgerAlignAmountsCommand(sublime_plugin.TextCommand):
+# The key of the hidden regions which keep track of the lines modified
+# since the last alignment. Sublime shifts these regions by itself when
+# text is inserted or removed before them.
+DIRTY_REGIONS_KEY = "ledger_align_dirty"
 
-    def run(self, edit):
 
-        # if not utils.is_ledger_file(self.view):
-        #     # Current view is not a ledger file.
-        #     return
+def is_indented(line_content):
+    """Returns True if the line starts with a space or a tab, i.e. if it
+    belongs to the body of a transaction.
+    """
+    return line_content[:1] in (' ', '\t')
 
-        dot_pos = utils.get_settings().get('dot_pos')
 
-        # Get the whole document as a region.
-        region = sublime.Region(0, self.view.size())
+def transaction_block(view, point):
+    """Returns the region of the transaction block containing POINT.
+
+    A transaction block is made of a non-indented line (the transaction
+    header) followed by all the indented lines below it.
+
+    Arguments
+    ---------
+    view: sublime.View
+        The current view.
+    point: int
+        A position in the view.
+
+    Returns
+    -------
+    sublime.Region
+        The block region.
+    """
+    # Go up to the transaction header.
+    first_line = view.line(point)
+    while first_line.begin() > 0 and \
+            is_indented(view.substr(first_line)):
+        first_line = view.line(first_line.begin() - 1)
 
-        # Get a list of all lines
-        lines = self.view.lines(region)
+    # Go down to the last posting or note.
+    last_line = view.line(point)
+    while last_line.end() < view.size():
+        next_line = view.line(last_line.end() + 1)
+        if not is_indented(view.substr(next_line)):
+            break
+        last_line = next_line
 
-        # Set match pattern.
-        p = re.compile(
-            r'^\s+([\[\]\w:\s_-]+)\s+([-$£¥€¢\d,_]+)(?:.\d*)?.*$')
+    return sublime.Region(first_line.begin(), last_line.end())
 
-        for line in reversed(lines):
 
-            # Get line content
-            line_content = self.view.substr(line)
+def dirty_blocks(view):
+    """Returns the transaction blocks which were modified since the last
+    alignment. Overlapping blocks are merged.
 
-            # Catch amount
-            res = p.search(line_content)
+    Arguments
+    ---------
+    view: sublime.View
+        The current view.
 
-            # If the line has an amount, correct it.
-            if res:
+    Returns
+    -------
+    list of sublime.Region
+        The sorted list of modified blocks.
+    """
+    blocks = []
+    for region in sorted(view.get_regions(DIRTY_REGIONS_KEY)):
 
-                # Get the position of the dot in the line.
-                line_pos_dot = line_content.find(res.group(2)) + \
-                    len(res.group(2))
-                # Get number of spaces to add or to remove
-                # If >=0, spaces should be added
-                # If <0, spaces should be removed
-                num = dot_pos - line_pos_dot
+        block = transaction_block(view, region.begin()).cover(
+            transaction_block(view, region.end()))
 
-                # Get position of the beggining of ammount in the line
-                line_pos_amount = line_content.find(res.group(2))
-                # Same in the view
-                view_pos_amount = line.begin() + line_pos_amount
+        if blocks and blocks[-1].end() >= block.begin():
+            blocks[-1] = blocks[-1].cover(block)
+        else:
+            blocks.append(block)
 
-                if num > 0:
-                    self.view.insert(edit, view_pos_amount, ' '*num)
-                elif num < 0:
-                    self.view.erase(
-                        edit,
-                        sublime.Region(view_pos_amount+num, view_pos_amount))
+    return blocks
+
+
+class LedgerAlignAmountsCommand(sublime_plugin.TextCommand):
+
+    @ledger_profile.profiled('align_amounts')
+    def run(self, edit, dirty_only=False):
+        """Aligns the amounts of the view.
+
+        Arguments
+        ---------
+        dirty_only: bool
+            If True, only the transactions modified since the last
+            alignment are processed. Otherwise, the whole document is.
+            Default: False
+        """
+
+        # if not utils.is_ledger_file(self.view):
+        #     # Current view is not a ledger file.
+        #     return
+
+        if dirty_only:
+            regions = dirty_blocks(self.view)
+        else:
+            # Get the whole document as a region.
+            regions = [sublime.Region(0, self.view.size())]
+
+        # All pending modifications are handled now.
+        self.view.erase_regions(DIRTY_REGIONS_KEY)
+
+        dot_pos = utils.get_settings().get('dot_pos')
+
+        # Each region is replaced at once by its aligned text. Regions
+        # are processed from the end so that they do not shift the
+        # positions of the regions yet to be processed.
+        for region in reversed(regions):
+            text = self.view.substr(region)
+            edits = ledger_align.alignment_edits(
+                text, dot_pos, region.begin())
+
+            ledger_profile.add_items(len(edits))
+
+            if edits:
+                self.view.replace(edit, region, ledger_align.apply_edits(
+                    text, edits, region.begin()))
 
 
 class alignOnModified(sublime_plugin.EventListener):
@@ -75,7 +144,10 @@ class alignOnModified(sublime_plugin.EventListener):
     # listen actions
     registered_actions = ["insert", "left_delete", "right_delete",
                           "delete_word", "paste", "cut"]
+    # The view sizes after the last modification, by view id.
+    view_sizes = {}
 
+    @ledger_profile.profiled('align_on_modified')
     def on_modified(self, view):
 
         # If not a ledger file
@@ -89,12 +161,19 @@ class alignOnModified(sublime_plugin.EventListener):
         if view.is_scratch() or view.settings().get('is_widget'):
             return
 
+        # Get the number of inserted characters since last modification.
+        size = view.size()
+        inserted = size - self.view_sizes.get(view.id(), size)
+        self.view_sizes[view.id()] = size
+
         # Get the last executed command
         cmdhist = view.command_history(0)
         # If that' not a command to listen, return.
         if cmdhist[0] not in self.registered_actions:
             return
 
+        self.mark_dirty(view, inserted)
+
         # Default delay
         delay = 0.2
 
@@ -107,6 +186,30 @@ class alignOnModified(sublime_plugin.EventListener):
 
         self.thread = threading.Timer(
             delay,
-            lambda: view.run_command('ledger_align_amounts')
+            lambda: view.run_command(
+                'ledger_align_amounts', {'dirty_only': True})
         )
         self.thread.start()
+
+    def mark_dirty(self, view, inserted):
+        """Records the lines which were just modified so that the next
+        alignment only processes their transactions.
+
+        Arguments
+        ---------
+        view: sublime.View
+            The modified view.
+        inserted: int
+            The number of characters inserted by the modification. When
+            text is pasted, the inserted text ends at the cursor.
+        """
+        dirty = view.get_regions(DIRTY_REGIONS_KEY)
+
+        for sel in view.sel():
+            begin = max(0, sel.begin() - max(inserted, 0))
+            dirty.append(view.line(sublime.Region(begin, sel.end())))
+
+        view.add_regions(DIRTY_REGIONS_KEY, dirty, "", "", sublime.HIDDEN)
+
+    def on_close(self, view):
+        self.view_sizes.pop(view.id(), None)
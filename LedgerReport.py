@@ -0,0 +1,134 @@
+"""
+Provides balance, register and monthly report commands.
+
+See README.md for details.
+
+@author: Etienne Monier <etienne.monier@enseeiht.fr>
+@license: CC-BY-NC-SA
+@since: 2026-10-17
+"""
+
+import sublime
+import sublime_plugin
+import os.path
+import re
+
+from . import utils
+from . import ledger_cache
+from . import ledger_profile
+from . import ledger_report
+
+
+# The output panel name.
+PANEL_NAME = "ledger_report"
+
+# The merged posting table, with the per-file tables it was built from.
+MERGED_TABLE = ((), None)
+
+
+def journal_tables(view):
+    """Returns the posting tables of the definition file, the view file
+    and the files they include, each file once, in include order.
+    """
+    filenames = [utils.get_settings().get('definition_filename'),
+                 view.file_name()]
+
+    cached_files = []
+    seen = set()
+    for filename in filenames:
+        if filename and os.path.exists(filename):
+            for cached in ledger_cache.resolve_includes(filename):
+                if cached.filename not in seen:
+                    seen.add(cached.filename)
+                    cached_files.append(cached)
+
+    return tuple(ledger_cache.derive_files(
+        cached_files, 'report_table', ledger_report.extract_table))
+
+
+def get_table(view):
+    """Returns the posting table of the journal. It is only merged again
+    if a file changed.
+    """
+    global MERGED_TABLE
+
+    tables = journal_tables(view)
+    previous, table = MERGED_TABLE
+
+    if len(tables) != len(previous) or \
+            any(a is not b for a, b in zip(tables, previous)):
+        table = ledger_report.merge_tables(tables)
+        MERGED_TABLE = (tables, table)
+
+    return table
+
+
+class LedgerReportCommand(sublime_plugin.TextCommand):
+    """Asks for a query and shows the balance, register or monthly
+    report of the saved journal in an output panel. The report is
+    computed in the worker thread.
+    """
+
+    @ledger_profile.profiled('report')
+    def run(self, edit, report='balance', query=None):
+
+        if query is None:
+            self.view.window().show_input_panel(
+                'Ledger {} (account regex, from:, to:, depth:)'.format(
+                    report),
+                '',
+                lambda query: self.view.run_command(
+                    'ledger_report', {'report': report, 'query': query}),
+                None, None)
+            return
+
+        try:
+            options = ledger_report.parse_query(query)
+        except ValueError as error:
+            sublime.error_message(str(error))
+            return
+
+        sublime.set_timeout_async(
+            lambda: self.compute(report, query, options), 0)
+
+    @ledger_profile.profiled('report_compute')
+    def compute(self, report, query, options):
+        """Computes the report, in the worker thread.
+        """
+        try:
+            table = get_table(self.view)
+            rows = ledger_report.select(
+                table, options['pattern'], options['begin'], options['end'])
+        except (ledger_cache.IncludeCycleError, re.error) as error:
+            sublime.error_message(str(error))
+            return
+
+        ledger_profile.add_items(len(rows))
+
+        if report == 'balance':
+            result = ledger_report.balance_report(
+                table, rows, options['depth'])
+        elif report == 'register':
+            result = ledger_report.register_report(table, rows)
+        else:
+            result = ledger_report.monthly_report(table, rows)
+
+        content = '{} report: {}\n\n{}'.format(
+            report.capitalize(), query or 'all accounts',
+            ledger_report.format_report(report, result))
+
+        sublime.set_timeout(lambda: self.show(content), 0)
+
+    def show(self, content):
+        """Shows the report in the output panel, in the main thread.
+        """
+        window = self.view.window()
+        if window is None:
+            return
+
+        panel = window.create_output_panel(PANEL_NAME)
+        panel.run_command("append", {"characters": content})
+        window.run_command("show_panel", {"panel": "output." + PANEL_NAME})
+
+    def is_enabled(self):
+        return utils.is_ledger_file(self.view)
@@ -11,9 +11,15 @@ See README.md for details.
 """
 # flake8: noqa: E501
 
+import collections
+
 import parsimonious.grammar
 import parsimonious.nodes
 
+from . import ledger_tokenizer
+from .ledger_model import Posting, UserTransaction, \
+    AutomaticTransaction, PeriodicTransaction
+
 
 # The grammar beggins with the basic parts of the language
 grammar = r"""
@@ -48,19 +54,20 @@ grammar += r"""
 
     user_transaction   = tran_header ("\n" (posting / (indent tran_note)))+
     autom_transaction  = ~r"^= /"m ap_tran_regex "/" stab* ("\n" posting)+
-    period_transaction = ~r"^~ /"m ap_tran_regex "/" stab* ("\n" posting)+
+    period_transaction = ~r"^~"m stab+ period_expr ("\n" posting)+
 
     tran_header        = tran_date aux_date? stab+ state? payee (hard_sep tran_note)? stab*
 
     tran_note          = comment_char (tag_text / note_text)
     note_text          = ~r"[^\n:]*"
-    tag_text           = stab* (metadata_tag / metadata_value)  stab*
+    tag_text           = stab* (metadata_tag / metadata_value) note_text
     metadata_tag       = (":" tag)+ ":"
     metadata_value     = tag ":" stab+ ~r"[^\n]+"
 
     posting            = indent account (hard_sep amount)? (hard_sep tran_note)? stab*
 
     ap_tran_regex      = ~"[^\/]+"
+    period_expr        = ~r"[^\n]+"
     state              = ~r"([*!][ \t]+)?"
 """
 
@@ -99,7 +106,7 @@ grammar += r"""
 
 # Command values (account, payee and co.) [^;#\%\|\*\n]+(?=( {2}|\t|$))
 grammar += r"""
-    account            = ~r"([^;#\%\|\*\n\t ]|(?<! ) )+[^;#\%\|\*\n\t ]"m
+    account            = ~r"[^;#\%\|\*\n\t ]+( [^;#\%\|\*\n\t ]+)*"m
     payee              = account
     tag                = ~r"[A-Za-z0-9]+"
     commodity          = currency_name_long / currency_name / currency
@@ -120,6 +127,179 @@ grammar += r"""
 """
 
 
+# The compiled grammar. It is built once, on first use.
+GRAMMAR = None
+
+
+def get_grammar():
+    """Returns the compiled grammar.
+    """
+    global GRAMMAR
+
+    if GRAMMAR is None:
+        GRAMMAR = parsimonious.grammar.Grammar(grammar)
+
+    return GRAMMAR
+
+
+# A command like "account Assets:Bank".
+#
+# Attributes
+# ----------
+# kind: str
+#     The command keyword (account, payee, tag, commodity or include).
+# value: str
+#     The command value.
+Definition = collections.namedtuple('Definition', ['kind', 'value'])
+
+
+def flatten(values):
+    """Flattens nested lists of visited values. Parse tree nodes, which
+    are returned for the rules carrying no information, are dropped.
+    """
+    result = []
+    for value in values:
+        if isinstance(value, list):
+            result += flatten(value)
+        elif not isinstance(value, parsimonious.nodes.Node):
+            result.append(value)
+    return result
+
+
+class LedgerVisitor(parsimonious.nodes.NodeVisitor):
+    """Visits the parse tree to build the ledger objects.
+
+    The visit of the whole tree returns the list of the Definition,
+    UserTransaction and AutomaticTransaction objects, in order.
+    """
+
+    def generic_visit(self, node, visited_children):
+        return flatten(visited_children) or node
+
+    def visit_expr(self, node, visited_children):
+        return flatten(visited_children)
+
+    # Commands
+    #
+    # The value is always the last element of the command.
+
+    def visit_account_def(self, node, visited_children):
+        return Definition('account', node.children[-1].text.strip())
+
+    def visit_payee_def(self, node, visited_children):
+        return Definition('payee', node.children[-1].text.strip())
+
+    def visit_tag_def(self, node, visited_children):
+        return Definition('tag', node.children[-1].text.strip())
+
+    def visit_currency_def(self, node, visited_children):
+        return Definition('commodity', node.children[-1].text.strip())
+
+    def visit_include_def(self, node, visited_children):
+        return Definition('include', node.children[-1].text.strip())
+
+    # Transactions
+
+    def visit_tran_header(self, node, visited_children):
+        # The date and the payee.
+        return (node.children[0].text, node.children[4].text)
+
+    def visit_user_transaction(self, node, visited_children):
+        values = flatten(visited_children)
+
+        date, payee = values[0]
+        postings = [value for value in values if isinstance(value, Posting)]
+
+        return UserTransaction(date, payee, postings)
+
+    def visit_autom_transaction(self, node, visited_children):
+        postings = [value for value in flatten(visited_children)
+                    if isinstance(value, Posting)]
+
+        return AutomaticTransaction(node.children[1].text, postings)
+
+    def visit_period_transaction(self, node, visited_children):
+        postings = [value for value in flatten(visited_children)
+                    if isinstance(value, Posting)]
+
+        return PeriodicTransaction(node.children[2].text.strip(), postings)
+
+    def visit_posting(self, node, visited_children):
+        # The amount is the only value visited in a posting.
+        values = flatten(visited_children)
+
+        return Posting(
+            node.children[1].text,
+            values[0] if values else None)
+
+    def visit_amount(self, node, visited_children):
+        return ledger_tokenizer.parse_amount(node.text)
+
+    def visit_tran_note(self, node, visited_children):
+        # Notes and tags are ignored.
+        return None
+
+    def visit_comment(self, node, visited_children):
+        return None
+
+
+def collect(values):
+    """Sorts the ledger objects by kind.
+
+    Arguments
+    ---------
+    values: iterable
+        The Definition, UserTransaction, AutomaticTransaction and
+        PeriodicTransaction objects.
+
+    Returns
+    -------
+    dict
+        A dictionnary with the keys accounts, payees, tags, commodities,
+        includes (lists of str), user_transactions (list of
+        UserTransaction), automatic_transactions (list of
+        AutomaticTransaction) and periodic_transactions (list of
+        PeriodicTransaction).
+    """
+    result = {
+        'accounts': [],
+        'payees': [],
+        'tags': [],
+        'commodities': [],
+        'includes': [],
+        'user_transactions': [],
+        'automatic_transactions': [],
+        'periodic_transactions': [],
+    }
+
+    keys = {
+        'account': 'accounts',
+        'payee': 'payees',
+        'tag': 'tags',
+        'commodity': 'commodities',
+        'include': 'includes',
+    }
+
+    for value in values:
+        if isinstance(value, Definition):
+            result[keys[value.kind]].append(value.value)
+        elif isinstance(value, UserTransaction):
+            result['user_transactions'].append(value)
+        elif isinstance(value, AutomaticTransaction):
+            result['automatic_transactions'].append(value)
+        elif isinstance(value, PeriodicTransaction):
+            result['periodic_transactions'].append(value)
+
+    return result
+
+
+def parse(content):
+    """Parses a ledger content and returns the extracted information.
+    See collect.
+    """
+    return collect(LedgerVisitor().visit(get_grammar().parse(content)))
+
+
 def Ledger_parser(filename):
     """Reads a Ledger file located at FILENAME to extract relevant
     informations.
@@ -133,14 +313,9 @@ def Ledger_parser(filename):
     -------
     dict
         A dictionnary containing the extracted relevant information.
+        See collect.
     """
-    # Open file to be parsed.
     with open(filename) as file:
         content = file.read()
 
-    # Construct grammar object
-    Grammar = parsimonious.grammar.Grammar(grammar)
-    # Parse content.
-    tree = Grammar.parse(content)
-
-    return tree
+    return parse(content)
@@ -0,0 +1,36 @@
+"""
+Provides a command printing the time spent in the LedgerTools commands
+and event listeners.
+
+See README.md for details.
+
+@author: Etienne Monier <etienne.monier@enseeiht.fr>
+@license: CC-BY-NC-SA
+@since: 2026-10-17
+"""
+
+import sublime_plugin
+
+from . import utils
+from . import ledger_profile
+
+
+class LedgerShowPerformanceStatsCommand(sublime_plugin.WindowCommand):
+    """Prints the p50, p95 and max time of each profiled command and
+    event listener in the console.
+    """
+
+    def run(self):
+
+        if not utils.get_settings().get('profiling', False):
+            print('LedgerTools: profiling is disabled. Set "profiling" to '
+                  'true in the LedgerTools settings.')
+
+        elif not ledger_profile.RECORDS:
+            print('LedgerTools: no call recorded yet.')
+
+        else:
+            print('LedgerTools performance stats:\n' +
+                  ledger_profile.format_statistics())
+
+        self.window.run_command("show_panel", {"panel": "console"})
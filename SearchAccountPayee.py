@@ -8,14 +8,50 @@ See README.md for details.
 @since: 2020-07-24
 """
 
+import sublime
 import sublime_plugin
+import collections
+import os.path
 import re
+import threading
 
 from . import utils
+from . import ledger_cache
+from . import ledger_index
+from . import ledger_profile
+
+
+def get_info_lists(filename, search_key):
+    """Gets info from ledger file and the files it includes, file by
+    file.
+
+    Arguments
+    ---------
+    filename: str
+        The ledger filename.
+    search_key: str
+        The key to search for.
+
+    Returns
+    -------
+    list of list
+        List of key entries of each file, in include order.
+    """
+    pattern = re.compile(r'^{} (.+)$'.format(search_key))
+
+    def extract(blocks):
+        result = []
+        for block in blocks:
+            m = pattern.match(block.header)
+            if block.kind == 'directive' and m:
+                result.append(m.group(1).strip())
+        return result
+
+    return ledger_cache.derive_all(filename, ('info', search_key), extract)
 
 
 def get_info(filename, search_key):
-    """Gets info from ledger file.
+    """Gets info from ledger file and the files it includes.
 
     Arguments
     ---------
@@ -29,18 +65,131 @@ def get_info(filename, search_key):
     list
         List of key entries.
     """
-    with open(filename, encoding="utf-8") as file:
-        content = file.read()
+    return [item
+            for items in get_info_lists(filename, search_key)
+            for item in items]
+
+
+# The index of each search key, with the per-file information it was
+# built from.
+INDEXES = {}
+
+# The indexes are updated from the main and the worker threads.
+INDEXES_LOCK = threading.Lock()
+
+
+def get_index(filename, search_key, journal_filenames=()):
+    """Gets the index of the entries declared in the ledger file and the
+    files it includes, and of the ones used in their transactions. The
+    entries are ranked by their use in these files and in the journal
+    files.
+
+    The index is kept between calls. Only the files modified since the
+    last call are read again and their counts replaced in the index.
+
+    Arguments
+    ---------
+    filename: str
+        The ledger filename.
+    search_key: str
+        The key to search for.
+    journal_filenames: list of str
+        Other ledger files whose transactions should be indexed.
+
+    Returns
+    -------
+    ledger_index.NameIndex
+    """
+    info_lists = get_info_lists(filename, search_key)
+
+    # The usage of each file, by filename.
+    cached_files = collections.OrderedDict()
+    for name in [filename] + list(journal_filenames):
+        for cached in ledger_cache.resolve_includes(name):
+            cached_files[cached.filename] = cached
+
+    usages = dict(zip(cached_files, ledger_cache.derive_files(
+        list(cached_files.values()), 'usage', ledger_index.extract_usage)))
+
+    with INDEXES_LOCK:
+
+        index, sources, previous_usages = INDEXES.get(
+            search_key, (ledger_index.NameIndex(), None, {}))
+
+        # The cached lists are the same objects as long as the files are
+        # not modified.
+        if sources is None or len(sources) != len(info_lists) or any(
+                source is not info
+                for source, info in zip(sources, info_lists)):
+            index.set_declared(
+                item for items in info_lists for item in items)
+
+        for name, usage in previous_usages.items():
+            if usages.get(name) is not usage:
+                index.remove_counts(usage.counts(search_key))
+
+        for name, usage in usages.items():
+            if previous_usages.get(name) is not usage:
+                index.add_counts(usage.counts(search_key))
+
+        index.usages = list(usages.values())
+
+        INDEXES[search_key] = (index, info_lists, usages)
+
+    return index
+
+
+def describe_uses(uses):
+    """Describes the uses of an entry for the quick panel.
+
+    Arguments
+    ---------
+    uses: tuple
+        The number of uses and the first and last use dates.
+        See ledger_index.NameIndex.uses.
+    """
+    count, first, last = uses
+
+    if first is None:
+        return 'Used {} times'.format(count)
+
+    return 'Used {} times, from {} to {}'.format(
+        count, first.isoformat(), last.isoformat())
+
+
+def journal_filenames(view):
+    """Returns the files of the view whose transactions are indexed.
+    """
+    if utils.is_ledger_file(view):
+        return [view.file_name()]
+    return []
+
+
+def update_indexes(view):
+    """Updates the account and payee indexes in the worker thread.
+    """
+    filename = utils.get_settings().get('definition_filename')
+
+    if not filename or not os.path.exists(filename):
+        return
 
-    result = re.findall(r'^{} (.+)$'.format(search_key), content, re.M)
+    @ledger_profile.profiled('search_update_indexes')
+    def update():
+        try:
+            for search_key in ('account', 'payee'):
+                get_index(filename, search_key, journal_filenames(view))
+        except ledger_cache.IncludeCycleError:
+            # Reported when the indexes are used.
+            pass
 
-    return list(map(str.strip, result))
+    sublime.set_timeout_async(update, 0)
 
 
 class LedgerBaseSearchCommand(sublime_plugin.TextCommand):
     """Command to search a key in the definition file.
 
     """
+    @ledger_profile.profiled('search')
     def run(self, edit, item=None, search_key='account'):
 
         # Get filename and check it.
@@ -50,9 +199,6 @@ class LedgerBaseSearchCommand(sublime_plugin.TextCommand):
         if not filename:
             return
 
-        # Get account or payee
-        items = get_info(filename, search_key)
-
         if item:
             # Insert item.
 
@@ -67,11 +213,86 @@ class LedgerBaseSearchCommand(sublime_plugin.TextCommand):
             self.view.run_command("insert", {"characters": item})
 
         else:
+            # Get account or payee, most used first. The current file
+            # transactions are also counted.
+            try:
+                index = get_index(
+                    filename, search_key, journal_filenames(self.view))
+            except ledger_cache.IncludeCycleError as error:
+                sublime.error_message(str(error))
+                return
+
+            items = index.ranked()
+
             # Go to catch item.
             self.view.window().show_quick_panel(
-                items,
+                [[item, describe_uses(index.uses(item, search_key))]
+                 for item in items],
                 lambda idx: self.pick(idx, edit, items, search_key))
 
     def pick(self, index, edit, items, search_key):
         if index >= 0:
             self.run(edit, items[index], search_key)
+
+
+class IndexUpdater(sublime_plugin.EventListener):
+    """Indexes the accounts and payees in the background when a ledger
+    file is opened or saved, and completes them when typing.
+    """
+
+    @ledger_profile.profiled('search_on_load')
+    def on_load(self, view):
+        if utils.is_ledger_file(view):
+            update_indexes(view)
+
+    @ledger_profile.profiled('search_on_save')
+    def on_post_save(self, view):
+        if utils.is_ledger_file(view):
+            update_indexes(view)
+
+    @ledger_profile.profiled('search_completions')
+    def on_query_completions(self, view, prefix, locations):
+
+        if not utils.is_ledger_file(view):
+            return None
+
+        # The line beginning, up to the cursor.
+        point = locations[0]
+        line_start = view.substr(
+            sublime.Region(view.line(point).begin(), point))
+
+        if line_start[:1] in (' ', '\t'):
+            # Posting line: complete the account.
+            search_key = 'account'
+            typed = line_start.lstrip(' \t[(')
+
+        else:
+            # Transaction header: complete the payee after the date and
+            # the state.
+            m = re.match(r'^[\d/=-]+[ \t]+(?:[!*][ \t]+)?(.*)$', line_start)
+            if not m:
+                return None
+            search_key = 'payee'
+            typed = m.group(1)
+
+        # Only the account or payee being typed is completed.
+        if '  ' in typed or '\t' in typed or not typed.endswith(prefix):
+            return None
+
+        with INDEXES_LOCK:
+            index = INDEXES.get(search_key, (None,))[0]
+
+            if index is None:
+                update_indexes(view)
+                return None
+
+            names = index.prefix(typed)
+
+        ledger_profile.add_items(len(names))
+
+        # Sublime replaces the current word (PREFIX) by the completion.
+        start = len(typed) - len(prefix)
+
+        return [
+            ['{}\t{} uses'.format(name, index.counts[name]), name[start:]]
+            for name in names]
@@ -0,0 +1,160 @@
+"""
+Highlights the unbalanced user transactions of ledger files.
+
+See README.md for details.
+
+@author: Etienne Monier <etienne.monier@enseeiht.fr>
+@license: CC-BY-NC-SA
+@since: 2026-10-17
+"""
+
+import sublime
+import sublime_plugin
+import html
+
+from . import utils
+from . import ledger_lint
+from . import ledger_profile
+
+
+# The key of the problem regions and phantoms.
+LINT_KEY = "ledger_lint"
+
+# The delay after the last modification before the view is checked, in ms.
+LINT_DELAY = 500
+
+PHANTOM_TEMPLATE = """
+<body id="ledger-lint">
+    <style>
+        div.error {{
+            color: var(--redish);
+            padding: 0.2rem 0.5rem;
+        }}
+    </style>
+    <div class="error">{}</div>
+</body>
+"""
+
+
+def erase_problems(view):
+    """Removes the problem regions and phantoms of a view.
+    """
+    view.erase_regions(LINT_KEY)
+
+    phantom_set = TransactionLinter.phantom_sets.pop(view.id(), None)
+    if phantom_set is not None:
+        phantom_set.update([])
+
+
+def on_lint_setting_change():
+    """Removes the problems of all views when the check is disabled.
+    """
+    if utils.get_settings().get('transaction_lint', True):
+        return
+
+    for window in sublime.windows():
+        for view in window.views():
+            TransactionLinter.tables.pop(view.id(), None)
+            erase_problems(view)
+
+
+def plugin_loaded():
+    utils.get_settings().add_on_change(
+        'LedgerTools.transaction_lint', on_lint_setting_change)
+
+
+class TransactionLinter(utils.SnapshotAnalysis,
+                        sublime_plugin.ViewEventListener):
+    """Checks the user transactions of the view in Sublime's worker
+    thread when the file is opened, modified or saved. The problems are
+    underlined and described in phantoms.
+
+    Only the transactions modified since the last check are checked
+    again. See utils.SnapshotAnalysis.
+    """
+
+    # The number of the last requested check, by view id.
+    generations = {}
+    # The lint table, by view id.
+    tables = {}
+    # The phantom set, by view id.
+    phantom_sets = {}
+
+    def request_lint(self, delay=0):
+        """Requests a check of the view after DELAY ms. The problems are
+        removed if the check is disabled.
+        """
+        if not utils.is_ledger_file(self.view):
+            return
+
+        if not utils.get_settings().get('transaction_lint', True):
+            self.cancel_analysis()
+            self.tables.pop(self.view.id(), None)
+            erase_problems(self.view)
+            return
+
+        self.request_analysis(self.lint, delay)
+
+    @ledger_profile.profiled('lint_check')
+    def lint(self, text, change_count, generation):
+        """Checks the snapshot, in the worker thread.
+        """
+        ledger_profile.set_size(len(text))
+
+        if self.is_outdated(generation):
+            return
+
+        table = self.tables.setdefault(
+            self.view.id(), ledger_lint.LintTable())
+        problems = table.update(text, lambda: self.is_outdated(generation))
+
+        if problems is None:
+            return
+
+        ledger_profile.add_items(len(problems))
+
+        self.publish_analysis(
+            lambda: self.publish(problems), change_count, generation)
+
+    @ledger_profile.profiled('lint_publish')
+    def publish(self, problems):
+        """Shows the problems in the view, in the main thread.
+        """
+        self.view.add_regions(
+            LINT_KEY,
+            [sublime.Region(problem.begin, problem.end)
+             for problem in problems],
+            "invalid", "circle",
+            sublime.DRAW_NO_FILL | sublime.DRAW_NO_OUTLINE |
+            sublime.DRAW_SQUIGGLY_UNDERLINE)
+
+        phantom_set = self.phantom_sets.get(self.view.id())
+        if phantom_set is None:
+            phantom_set = sublime.PhantomSet(self.view, LINT_KEY)
+            self.phantom_sets[self.view.id()] = phantom_set
+
+        phantom_set.update([
+            sublime.Phantom(
+                sublime.Region(problem.end),
+                PHANTOM_TEMPLATE.format(html.escape(problem.message)),
+                sublime.LAYOUT_BELOW)
+            for problem in problems])
+
+    def on_load(self):
+        self.request_lint()
+
+    def on_activated(self):
+        if self.view.id() not in self.tables:
+            self.request_lint()
+
+    @ledger_profile.profiled('lint_on_modified')
+    def on_modified(self):
+        self.request_lint(LINT_DELAY)
+
+    def on_post_save(self):
+        self.request_lint()
+
+    def on_close(self):
+        self.forget_analysis()
+        for state in (self.tables, self.phantom_sets):
+            state.pop(self.view.id(), None)
@@ -11,15 +11,28 @@ See README.md for details.
 import sublime
 import sublime_plugin
 
+import bisect
+import functools
 import re
 
 from . import utils
-from. import ledger_regex
+from . import ledger_cache
+from . import ledger_forecast
+from . import ledger_profile
+from . import ledger_regex
+from . import ledger_stream
+from . import ledger_tokenizer
+from .ledger_model import (
+    align_dot, Balance, Posting, UserTransaction, AutomaticTransaction,
+    AutomaticTransactionMatcher)
 
 
-# The gutter lines and text.
-GUTTER_LINES = []
-GUTTER_TEXT = []
+# The gutter index of each view, by view id.
+GUTTER_INDEXES = {}
+
+# The last automatic transaction matcher, with the per-file lists of
+# automatic transactions it was built from.
+MATCHER_CACHE = (None, None)
 
 # Inspired from SublimeLinter
 TOOLTIP_STYLES = """
@@ -56,6 +69,7 @@ TOOLTIP_TEMPLATE = """
             <p>
                 {content}
             </p>
+            <p>Total: {total}</p>
         </div>
         <div class="footer"><a href="{href}">Click</a>
             <span>Go to Automatic Transaction definition
@@ -64,645 +78,520 @@ TOOLTIP_TEMPLATE = """
 """
 
 
-def is_numeric(x):
-    """Returns True is x is a number.
-    """
-    return isinstance(x, int) or isinstance(x, float)
+def analyze_posting_line(content):
+    """This analyses a string containing one or several postings.
+    It returns a list of Posting.
 
+    Arguments
+    ---------
+    content: str
+        The string to analyze.
 
-def is_string(x):
-    """Returns True is x is a string.
+    Returns
+    -------
+    None, list of Posting
+        None if no matching, else the extracted information.
     """
-    return isinstance(x, str)
+    postings = []
 
+    for line in content.split('\n'):
+        posting = ledger_tokenizer.parse_posting(line)
 
-def homogeneous_type(seq):
-    """Checks if all elements of a list are the same.
-    If that's the case, it returns the common type, else False.
-    """
-    first_type = type(seq[0])
-    return first_type if all([type(x) is first_type for x in seq]) else False
+        if posting is not None:
+            postings.append(posting)
 
+    # No result found
+    if len(postings) == 0:
+        return None
 
-def number_to_str(number):
-    """Constructs a string based on a number.
-
-    Arguments
-    ---------
-    number: int, float or Amount
-        The number.
-    """
-    if isinstance(number, float):
-        return "{:.2f}".format(number)
-    return str(number)
+    return postings
 
 
-def align_dot(account, number=None, dot_pos=58, html=False):
-    r"""Constructs a string of the form '    account     10.52 EUR' where
-    the dot is located at position dot_pos.
+def get_automatic_transactions(filename):
+    """Reads the file located at FILENAME and the files it includes to
+    detect automatic transactions. It then returns a list of
+    AutomaticTransaction objects.
 
     Arguments
     ---------
-    account: str
-        The account name
-    number: int, float or Amount
-        The number.
-    dot_pos: int
-        The dot position in the line.
-        Default: 58
-    html: bool
-        If this flag is True, all whitespaces are replaces by \u00A0 to
-        keep multiple spaces in tooltip.
-    """
-    string = ' '*4 + account
-
-    if number is None:
-        output = string
-
-    else:
-        number_str = str(number)
-
-        # Get the number of spaces to add or remove
-        m = re.match(r'([-$£¥€¢\d,_]+)(?:.\d*)?.*', number_str)
-
-        if not m:
-            num_spaces = 0
-        else:
-            num_spaces = dot_pos - len(string) - len(m.group(1))
-
-        # if num_spaces > 0, this means there is a lots of spaces to add.
-        # Otherwise, it means the account is too long or the number of
-        # digits before dot is too high. In this case, a hard separator
-        # is required.
-        if num_spaces > 0:
-            output = string + ' ' * num_spaces + number_str
-        else:
-            output = string + '  ' + number_str
+    filename: string
+        The file location.
 
-    if html:
-        output = output.replace(' ', '\u00A0')
+    Returns
+    -------
+    list of AutomaticTransaction
+        The automatic transactions defined in the files.
+    """
+    return [autom_trans
+            for autom_trans_list in ledger_cache.derive_all(
+                filename, 'automatic_transactions',
+                extract_automatic_transactions)
+            for autom_trans in autom_trans_list]
 
-    return output
 
+def get_automatic_transaction_matcher(filename):
+    """Returns a matcher for the automatic transactions defined in the
+    file located at FILENAME and the files it includes. The matcher is
+    only built again when one of these files is modified.
 
-class Amount():
-    """Defines an amount with a currency.
+    Arguments
+    ---------
+    filename: string
+        The file location.
 
-    Attributes
-    ----------
-    number: int or float
-        The amount
-    currency: str
-        The currency
-    type: int
-        The currency type.
-        0 for symbol (e.g. €),
-        1 for name (e.g. EUR),
-        2 for long name (e.g. "A long name").
+    Returns
+    -------
+    AutomaticTransactionMatcher
     """
+    global MATCHER_CACHE
 
-    def __init__(self, number, currency):
-        """Amount constructor
+    cached_files = ledger_cache.resolve_includes(filename)
+    autom_trans_lists = ledger_cache.derive_files(
+        cached_files, 'automatic_transactions',
+        extract_automatic_transactions)
 
-        Arguments
-        ---------
-        number: int or float
-            The amount
-        currency: str
-            The currency
-        """
-        if not is_numeric(number):
-            raise ValueError('The amount number is not numeric.')
-        if not is_string(currency):
-            raise ValueError('The amount currency is not a string.')
-
-        self.number = number
-        self.currency = currency
-
-        # Determine the currency type.
-        # 0 for symbol (e.g. €)
-        # 1 for name (e.g. EUR)
-        # 2 for long name (e.g. "A long name")
-        if currency in ['$', '£', '¥', '€', '¢']:
-            self.type = 0
-        elif '"' in currency:
-            self.type = 2
-        else:
-            self.type = 1
+    sources, matcher = MATCHER_CACHE
 
-    def __add__(self, other):
-        """Function to add two amounts.
-
-        Arguments
-        ---------
-        other: Amount
-            The other amount.
+    # The cached lists are the same objects as long as the files are
+    # not modified.
+    if sources is None or len(sources) != len(autom_trans_lists) or any(
+            source is not autom_trans
+            for source, autom_trans in zip(sources, autom_trans_lists)):
 
-        Returns
-        -------
-        Amount
-            The sum of self and other.
-        """
-        if isinstance(other, Amount):
+        # Each automatic transaction is linked to the file defining it.
+        matcher = AutomaticTransactionMatcher(
+            [autom_trans
+             for autom_trans_list in autom_trans_lists
+             for autom_trans in autom_trans_list],
+            [cached.filename
+             for cached, autom_trans_list in zip(
+                 cached_files, autom_trans_lists)
+             for autom_trans in autom_trans_list])
 
-            # Check if the two currencies are the same
-            if self.currency != other.currency:
-                raise Exception('Two amounts can be added only if the '
-                                'currencies are the same.')
+        MATCHER_CACHE = (autom_trans_lists, matcher)
 
-            return Amount(self.number + other.number, self.currency)
+    return matcher
 
-        else:
-            # Invalid type
-            raise ValueError(
-                'Addind an amount with type {} is incorect.'.format(
-                    type(other)))
 
-    def __sub__(self, other):
-        """Function to substract two amounts.
+def extract_automatic_transactions(blocks):
+    """Detects the automatic transactions in a ledger file.
 
-        Arguments
-        ---------
-        other: Amount
-            The other amount.
+    Arguments
+    ---------
+    blocks: iterable of ledger_stream.Block
+        The file blocks.
 
-        Returns
-        -------
-        Amount
-            The substraction of self by other.
-        """
-        if isinstance(other, Amount):
+    Returns
+    -------
+    list of AutomaticTransaction
+        The automatic transactions defined in the file.
+    """
+    pattern = re.compile(ledger_regex.pattern_autom, re.VERBOSE)
 
-            # Check if the two currencies are the same
-            if self.currency != other.currency:
-                raise Exception('Two amounts can be substracted only if the '
-                                'currencies are the same.')
+    autom_trans_objects = []
+    for block in blocks:
+
+        if block.kind != 'automatic_transaction':
+            continue
+
+        # The pattern expects the transaction to be preceded and
+        # followed by a new line.
+        trans = pattern.match('\n' + block.text.rstrip('\n') + '\n', 1)
+
+        # Find all postings inside
+        if trans:
+            autom_trans_objects.append(
+                AutomaticTransaction(
+                    trans.group(1),
+                    analyze_posting_line(trans.group(2))
+                )
+            )
 
-            return Amount(self.number - other.number, self.currency)
+    return autom_trans_objects
 
-        else:
-            # Invalid type
-            raise ValueError(
-                'Substracting an amount with type {} is incorect.'.format(
-                    type(other)))
 
-    def __mul__(self, other):
-        """Function to multiply an amounts by a number.
+def parse_user_transaction(block):
+    """Analyzes a user transaction block.
 
-        Arguments
-        ---------
-        other: float or int
-            The multiplier.
+    Arguments
+    ---------
+    block: ledger_stream.Block
+        The block.
 
-        Returns
-        -------
-        Amount
-            The multiplication of self by other.
-        """
-        if is_numeric(other):
-            # A number * an amount
-            return Amount(self.number * other, self.currency)
+    Returns
+    -------
+    None or UserTransaction
+        None if the block header is invalid. Otherwise, the transaction.
+        Its postings regions are the posting lines positions.
+    """
+    parsed = ledger_tokenizer.parse_block(block.text)
 
-        else:
-            # Invalid type
-            raise ValueError(
-                'Multiplying an amount with type {} is incorect.'.format(
-                    type(other)))
+    if parsed.date is None:
+        return None
 
-    def __radd__(self, other):
-        """This is the same as __add__, but is called when "a + self" is
-        computed with "a" not being an Amount.
+    return UserTransaction(
+        parsed.date, parsed.payee, parsed.new_postings(),
+        posting_regions(parsed, block.begin))
 
-        If "a" does not support a.__add__(self) as adding Amount to "a"
-        is not supported, then self.__radd(a) is called.
 
-        This is important to compute sum([list of Amount]) as it calls
-        (0 + Amount1) + Amount2 ...
-        If 0 + Amount1 is not defined, it returns an error.
-        """
-        if other == 0:
-            return self
-        else:
-            return self.__add__(other)
+def posting_regions(parsed, offset):
+    """Returns the regions of the posting lines of a parsed block.
 
-    def __rmul__(self, other):
-        """Same as for __radd__.
-        This aims at defining 5 * Amount.
-        """
-        if other == 1:
-            return self
-        else:
-            return self.__mul__(other)
+    Arguments
+    ---------
+    parsed: ledger_tokenizer.ParsedBlock
+        The parsed block.
+    offset: int
+        The position of the block.
+    """
+    return [sublime.Region(offset + posting.begin, offset + posting.end)
+            for posting in parsed.postings]
 
-    def __str__(self):
-        if self.type == 0:
-            return self.currency + number_to_str(self.number)
-        else:
-            return number_to_str(self.number) + ' ' + self.currency
 
-    def __repr__(self):
-        return 'Amount(number={}, currency={})'.format(
-            self.number, self.currency)
+def parse_periodic_transaction(block):
+    """Analyzes a periodic transaction block. The automatic
+    transactions apply to each of its occurrences.
 
+    Arguments
+    ---------
+    block: ledger_stream.Block
+        The block.
 
-class Posting():
-    """A posting is composed of an account and an amount or a coefficient.
-    That's the basic element of a transaction.
+    Returns
+    -------
+    None or PeriodicTransaction
+        None if the transaction is invalid. Otherwise, the transaction.
+        Its postings regions are the posting lines positions.
     """
+    transaction = ledger_forecast.parse_periodic_transaction(block.text)
 
-    def __init__(self, account, number=None):
-
-        self.account = account
-        self.number = number
+    if transaction is not None:
+        transaction.postings_regions = posting_regions(
+            ledger_tokenizer.parse_block(block.text), block.begin)
 
-    def is_empty(self):
-        """Returns True is the posting number is empty.
-        """
-        return self.number is None
+    return transaction
 
-    def is_Amount(self):
-        """Returns True is the posting number is an Amount object.
-        """
-        return isinstance(self.number, Amount)
 
-    def update_number(self, number):
-        """Updates the number to number.
-        """
-        self.number = number
+def get_user_transactions(text):
+    """Finds the User transactions in a ledger text.
 
-    def __str__(self):
-        return align_dot(self.account, self.number)
+    Arguments
+    ---------
+    text: str
+        The ledger text, usually the content of the current view.
 
-    def __repr__(self):
-        return 'Posting(account={}, number={})'.format(
-            self.account, self.number)
+    Returns
+    -------
+    list of UserTransaction
+        The transactions. Their postings regions are the posting lines
+        positions in the text.
+    """
+    list_of_user_transaction = []
+    for block in ledger_stream.split_blocks(text):
 
+        if block.kind != 'user_transaction':
+            continue
 
-class Transaction():
+        transaction = parse_user_transaction(block)
 
-    def __init__(self, postings):
+        if transaction is not None:
+            list_of_user_transaction.append(transaction)
 
-        self.postings = self.fill_in_empty_amount(postings)
+    return list_of_user_transaction
 
-    def fill_in_empty_amount(self, postings_list):
 
-        # This list contains the indexes of postings which do not have
-        # an amount nor number.
-        None_amount_index = [
-            i for i, post in enumerate(postings_list) if post.is_empty()]
+def format_tooltip(postings_list, autom_trans_regex):
+    """Formats a postings list into a html code for popups.
 
-        if len(None_amount_index) > 1:
-            raise ValueError('More than one posting do not have an amount.')
+    Arguments
+    ---------
+    postings_list: list of Posting
+        A list of tuple of the form (account, amount).
+    autom_trans_regex: str
+        The related automatic transaction regex. Used to link to
+        definition file.
 
-        elif len(None_amount_index) == 1:
-            # The missing amount should be found.
+    Returns
+    -------
+    str
+        html code.
+    """
+    content = ''
+    for element in postings_list:
+        content += '<li>{}</li>'.format(
+            align_dot(element.account, element.number, html=True)
+            )
 
-            # The index of the missing amount posting.
-            index = None_amount_index[0]
+    # The sum of the added postings, by commodity.
+    total = Balance(element.number for element in postings_list)
 
-            # The list of available amounts
-            amounts = [
-                post.number for post in postings_list if not post.is_empty()]
+    html = TOOLTIP_TEMPLATE.format(
+        stylesheet=TOOLTIP_STYLES,
+        content=content,
+        total=total,
+        href=autom_trans_regex
+        )
 
-            # Check all types are coherent
-            if not homogeneous_type(amounts):
-                raise ValueError('Postings have incoherent type.')
+    return html
 
-            else:
-                if is_numeric(amounts[0]):
-                    # The amounts are multipliers
-                    if len(amounts) == 1:
-                        result = 0-amounts[0]
 
-                    else:
-                        result = 0 - sum(amounts)
-                else:
-                    # The amount ARE amounts
-                    currency = amounts[0].currency
+def apply_automatic_transaction(autom_trans, number):
+    """Computes the postings an automatic transaction adds when it
+    catches a posting.
 
-                    if len(amounts) == 1:
-                        result = Amount(0, currency) - amounts[0]
+    Arguments
+    ---------
+    autom_trans: AutomaticTransaction
+        The automatic transaction.
+    number: int, float or Amount
+        The number of the caught posting.
 
-                    else:
-                        result = Amount(0, currency) - \
-                            sum(amounts)
+    Returns
+    -------
+    list of Posting
+        The postings to add.
+    """
+    # The list of postings to print
+    postings_to_print = []
 
-                # Change the missing number.
-                postings_list[index].update_number(result)
+    for autom_post in autom_trans.postings:
 
-        return postings_list
+        if autom_post.is_Amount():
+            # One should only apply the amount to the account
+            post_number = autom_post.number
+        else:
+            # Should multiply with current amount
+            post_number = autom_post.number * number
 
-    def __str__(self):
+        # Add the info to the list
+        postings_to_print.append(
+            Posting(autom_post.account, post_number))
 
-        string = ''
-        for post in self.postings:
-            string += str(post) + '\n'
+    return postings_to_print
 
-        return string[:-1]
 
+class GutterRecord():
+    """A posting caught by an automatic transaction.
 
-class UserTransaction(Transaction):
-    """
     Attributes
     ----------
-    date: str
-        The transaction date.
-    payee: str
-        The payee.
-    postings: list of tuple
-        The transaction operations.
-    postings_regions: optional, None or list of sublime.Region
-        The regions associated to the postings in the current view.
+    begin: int
+        The posting line beginning.
+    end: int
+        The posting line end.
+    rule: int
+        The index of the automatic transaction in the matcher.
+    number: int, float or Amount
+        The number of the caught posting.
     """
 
-    def __init__(self, date, payee, postings, postings_regions=None):
-        """
-        Arguments
-        ---------
-        date: str
-            The transaction date.
-        payee: str
-            The payee.
-        postings: list of tuple
-            The transaction operations.
-        """
-        Transaction.__init__(self, postings)
-        self.date = date
-        self.payee = payee
-        self.postings_regions = postings_regions
-
-    def __str__(self):
-        string = 'User transaction on {} to {}\n'.format(
-            self.date, self.payee)
-
-        return string + Transaction.__str__(self)
-
-    def __repr__(self):
-        return 'UserTransaction(date={}, payee={}, postings={})'.format(
-            self.date, self.payee, self.postings)
+    __slots__ = ('begin', 'end', 'rule', 'number')
 
-
-class AutomaticTransaction(Transaction):
-
-    def __init__(self, regex, postings):
-        """
-        Arguments
-        ---------
-        regex: str
-            The regular expression to match.
-        postings: list of Posting
-            The operations to apply when the regular expression is met.
-        """
-        Transaction.__init__(self, postings)
-        self.regex = regex
-
-    def catches_posting(self, posting):
-        """Returns True is the posting is catched by the automatic
-        transaction.
-        """
-        if re.search(self.regex, posting.account):
-            return True
-        else:
-            return False
-
-    def __str__(self):
-        string = 'Automatic transaction /{}/\n'.format(
-            self.regex)
-
-        return string + Transaction.__str__(self)
+    def __init__(self, begin, end, rule, number):
+        self.begin = begin
+        self.end = end
+        self.rule = rule
+        self.number = number
 
     def __repr__(self):
-        return 'AutomaticTransaction(regex={}, postings={})'.format(
-            self.regex, self.postings)
+        return 'GutterRecord(begin={}, end={}, rule={}, number={})'.format(
+            self.begin, self.end, self.rule, self.number)
 
 
-def analyze_posting_line(content):
-    """This analyses a string containing one or several postings.
-    It returns a list of Posting.
+def transaction_gutter_records(transaction, matcher):
+    """Finds the postings of a user transaction caught by automatic
+    transactions.
 
     Arguments
     ---------
-    content: str
-        The string to analyze.
+    transaction: UserTransaction
+        The transaction.
+    matcher: AutomaticTransactionMatcher
+        The matcher of the automatic transactions detected in the
+        definition file.
 
     Returns
     -------
-    None, list of Posting
-        None if no matching, else the extracted information.
+    list of GutterRecord
+        A record for each posting and automatic transaction catching it.
     """
+    records = []
 
-    # postings_info is a list whose elements are tuple.
-    #
-    # Each tuple contains 5 elements: account, cur. symb., amount,
-    # cur. name, cur. name long.
-    postings_info = re.findall(
-        ledger_regex.posting_pattern, content, re.VERBOSE | re.M)
+    for cnt, trans_posting in enumerate(transaction.postings):
 
-    # No result found
-    if len(postings_info) == 0:
-        return None
+        # For each posting in the file, one needs to check if an
+        # automatic transaction matches.
+        line = transaction.postings_regions[cnt]
 
-    # For each element of postings_info, only one currency info should
-    # be kept: the currency symbol (€), name ('EUR') or long name
-    # ("this is a long name"). Only one of them is accepted.
-    #
-    # Each element of postings_info_proc is a list of length 2
-    # like [account, Amount or numeric or None]
-    postings_info_proc = []
-
-    for post in postings_info:
-
-        if post[2] == "":
-            # No number nor amount was given
-            post_number = None
-
-        else:
-            # A number or Amount was given
-            number = eval(post[2])
-            currency = (post[1] or post[3] or post[4]).strip()
+        for rule in matcher.matches(trans_posting.account):
+            records.append(GutterRecord(
+                line.begin(), line.end(), rule, trans_posting.number))
 
-            if currency == '':
-                # That was a multiplier
-                post_number = number
-            else:
-                # That was an amount
-                post_number = Amount(number, currency)
+    return records
 
-        # Add the current posting to the autom. transaction list.
-        postings_info_proc.append(Posting(post[0], post_number))
 
-    return postings_info_proc
-
-
-def get_automatic_transactions(filename):
-    """Reads the file located at FILENAME to detect automatic transactions.
-    It then returns a list of AutomaticTransaction objects.
-
-    Arguments
-    ---------
-    filename: string
-        The file location.
+class GutterTable(ledger_stream.BlockTable):
+    """The gutter records of the user and periodic transactions of a
+    view. See ledger_stream.BlockTable.
 
-    Returns
-    -------
-    list of AutomaticTransaction
-        The automatic transactions defined in the file.
+    The records are relative to the block beginning, so that the records
+    of the unmodified blocks are only shifted to their new position.
     """
-    # Read file content
-    with open(filename, encoding="utf-8") as file:
-        content = file.read()
 
-    # Find all autom. transactions
-    autom_trans = re.findall(ledger_regex.pattern_autom, content, re.VERBOSE)
+    kinds = ('user_transaction', 'periodic_transaction')
 
-    # Find all postings inside
-    autom_trans_objects = []
-    for trans in autom_trans:
+    def __init__(self):
+        ledger_stream.BlockTable.__init__(self)
 
-        autom_trans_objects.append(
-            AutomaticTransaction(
-                trans[0],
-                analyze_posting_line(trans[1])
-            )
-        )
-
-    return autom_trans_objects
+        # The matcher the records were computed with.
+        self.matcher = None
 
+    def compute(self, block):
+        """Returns the records of a block, relatively to its beginning.
+        """
+        parse = parse_user_transaction
+        if block.kind == 'periodic_transaction':
+            parse = parse_periodic_transaction
 
-def get_user_transactions(view):
-    """Finds the User transactions in current view.
-
-    Arguments
-    ---------
-    view: sublime.View
-        The current view.
-
-    Returns
-    -------
-    list of UserTransaction
-    """
-    matched_transaction = view.find_all(ledger_regex.user_trans_pattern)
-
-    list_of_user_transaction = []
-    for match in matched_transaction:
+        try:
+            transaction = parse(
+                ledger_stream.Block(block.kind, 0, block.text))
+        except (ValueError, IndexError):
+            # The missing amount can not be computed. Reported by the
+            # transaction linter.
+            return []
 
-        # Extract the different lines of the user transaction.
-        lines = view.lines(match)
+        if transaction is None:
+            return []
 
-        # Extract the date and payee
-        first_line_content = view.substr(lines[0])
+        return transaction_gutter_records(transaction, self.matcher)
 
-        m = re.match(ledger_regex.trans_date_line, first_line_content, re.X)
+    def update(self, text, matcher, is_cancelled=None):
+        """Computes the gutter lines and records of a ledger text.
 
-        date, payee = m.group(1), m.group(2)
+        Arguments
+        ---------
+        text: str
+            The ledger text, usually a snapshot of the current view.
+        matcher: AutomaticTransactionMatcher
+            The matcher of the automatic transactions detected in the
+            definition file.
+        is_cancelled: optional, None or function
+            A function returning True if the computation should be
+            stopped.
 
-        # Search posting in other lines
-        list_of_postings = []
-        list_of_regions = []
-        for line in lines[1:]:
+        Returns
+        -------
+        None or GutterIndex
+            None if the computation was cancelled. Otherwise, the gutter
+            lines and their records.
+        """
+        # All blocks should be analyzed again if the automatic
+        # transactions changed.
+        if matcher is not self.matcher:
+            self.matcher = matcher
+            self.clear()
 
-            res = analyze_posting_line(view.substr(line))
+        results = ledger_stream.BlockTable.update(self, text, is_cancelled)
 
-            if res is not None:
-                list_of_postings += res
-                list_of_regions.append(line)
+        if results is None:
+            return None
 
-        list_of_user_transaction.append(
-            UserTransaction(date, payee, list_of_postings, list_of_regions)
-        )
-
-    return list_of_user_transaction
+        gutter_lines = []
+        gutter_records = []
 
+        for block, records in results:
+            for record in records:
+                gutter_lines.append(sublime.Region(
+                    block.begin + record.begin, block.begin + record.end))
+            gutter_records += records
 
-def format_tooltip(postings_list, autom_trans_regex):
-    """Formats a postings list into a html code for popups.
+        return GutterIndex(gutter_lines, gutter_records, matcher)
 
-    Arguments
-    ---------
-    postings_list: list of Posting
-        A list of tuple of the form (account, amount).
-    autom_trans_regex: str
-        The related automatic transaction regex. Used to link to
-        definition file.
 
-    Returns
-    -------
-    str
-        html code.
+def compute_gutter_settings(text, matcher, is_cancelled=None):
+    """Computes the gutter lines and records of a ledger text from
+    scratch. See GutterTable.update.
     """
-    content = ''
-    for element in postings_list:
-        content += '<li>{}</li>'.format(
-            align_dot(element.account, element.number, html=True)
-            )
-
-    html = TOOLTIP_TEMPLATE.format(
-        stylesheet=TOOLTIP_STYLES,
-        content=content,
-        href=autom_trans_regex
-        )
+    return GutterTable().update(text, matcher, is_cancelled)
 
-    return html
 
+class GutterIndex():
+    """The gutter lines of a view, sorted for fast lookup. The tooltips
+    are only rendered when needed.
 
-def update_gutter_settings(view, autom_trans_list):
-    """
-    Arguments
-    ---------
-    view: sublime.View object
-        The current view
-    autom_trans_list: list of AutomaticTransaction
-        The automatic transactions detected in the definition file.
-
-    Returns
-    -------
+    Attributes
+    ----------
+    lines: list of sublime.Region
+        The sorted gutter lines.
+    records: list of GutterRecord
+        The record of each line.
+    matcher: AutomaticTransactionMatcher
+        The matcher the records were computed with.
     """
-    global GUTTER_LINES, GUTTER_TEXT
 
-    # Re-initialize lines and text.
-    GUTTER_LINES = []
-    GUTTER_TEXT = []
+    # The number of rendered tooltips to keep.
+    TOOLTIP_CACHE_SIZE = 32
 
-    transaction_list = get_user_transactions(view)
+    def __init__(self, lines, records, matcher):
+        """
+        Arguments
+        ---------
+        lines: list of sublime.Region
+            The gutter lines, sorted by position.
+        records: list of GutterRecord
+            The record of each line.
+        matcher: AutomaticTransactionMatcher
+            The matcher the records were computed with.
+        """
+        self.lines = lines
+        self.records = records
+        self.matcher = matcher
 
-    for transaction in transaction_list:
+        # The lines do not overlap, so their ends are sorted too.
+        self.ends = [line.end() for line in lines]
 
-        for cnt, trans_posting in enumerate(transaction.postings):
+        self.tooltip = functools.lru_cache(self.TOOLTIP_CACHE_SIZE)(
+            self.render_tooltip)
 
-            # For each posting in the file, one needs to check if an
-            # automatic transaction matches.
-            for autom_trans in autom_trans_list:
+    def find(self, region):
+        """Returns the index of the first gutter line which intersects
+        REGION, or None.
+        """
+        index = bisect.bisect_left(self.ends, region.begin())
 
-                if autom_trans.catches_posting(trans_posting):
+        if index < len(self.lines) and self.lines[index].intersects(region):
+            return index
 
-                    # The list of postings to print
-                    postings_to_print = []
+        return None
 
-                    # The current automatic transaction catches the
-                    # current posting. One need to conpute the result.
+    def definition(self, index):
+        """Returns the file defining the automatic transaction of the line
+        at INDEX, and its regex.
+        """
+        rule = self.records[index].rule
 
-                    for autom_post in autom_trans.postings:
+        return (self.matcher.filenames[rule],
+                self.matcher.autom_trans_list[rule].regex)
 
-                        if autom_post.is_Amount():
-                            # One should only apply the amount to the account
-                            post_number = autom_post.number
-                        else:
-                            # Should multiply with current amount
-                            post_number = autom_post.number * \
-                                trans_posting.number
+    def render_tooltip(self, index):
+        """Returns the tooltip html code of the line at INDEX. Use the
+        cached version, tooltip.
+        """
+        record = self.records[index]
+        autom_trans = self.matcher.autom_trans_list[record.rule]
 
-                        # Add the info to the list
-                        postings_to_print.append(
-                            Posting(autom_post.account, post_number))
+        return format_tooltip(
+            apply_automatic_transaction(autom_trans, record.number),
+            autom_trans.regex)
 
-                    GUTTER_LINES.append(transaction.postings_regions[cnt])
-                    GUTTER_TEXT.append(
-                        format_tooltip(postings_to_print, autom_trans.regex)
-                        )
+    def __len__(self):
+        return len(self.lines)
 
 
 class TooltipController(sublime_plugin.EventListener):
 
+    @ledger_profile.profiled('gutter_tooltip')
     def on_hover(self, view, point, hover_zone):
 
         if utils.is_ledger_file(view):
@@ -710,26 +599,29 @@ class TooltipController(sublime_plugin.EventListener):
 
                 line_region = view.line(point)
 
-                intersect_test = [
-                    region.intersects(line_region) for region in GUTTER_LINES]
+                gutter_index = GUTTER_INDEXES.get(view.id())
+                if gutter_index is None:
+                    return
+
+                index = gutter_index.find(line_region)
 
-                if any(intersect_test):
+                if index is not None:
 
-                    index = intersect_test.index(True)
+                    filename, regex = gutter_index.definition(index)
 
                     def on_navigate(href):
-                        """When called, il opens the definition file and
-                        shows the automatic transaction associated with
-                        the regex.
+                        """When called, il opens the file defining the
+                        automatic transaction and shows it.
                         """
-                        # Open definition file.
+                        # Open the definition file, or the included file
+                        # defining the automatic transaction.
                         def_file_view = view.window().open_file(
-                            utils.get_definition_filename()
+                            filename or utils.get_definition_filename()
                             )
 
                         # Catch the region to highlight
                         region = def_file_view.find(
-                            '= /{}/'.format(href),
+                            '= /{}/'.format(regex),
                             0,
                             sublime.LITERAL)
 
@@ -742,7 +634,7 @@ class TooltipController(sublime_plugin.EventListener):
                         view.hide_popup()
 
                     view.show_popup(
-                        content=GUTTER_TEXT[index],
+                        content=gutter_index.tooltip(index),
                         flags=sublime.HIDE_ON_MOUSE_MOVE_AWAY,
                         location=point,
                         max_width=1000,
@@ -750,11 +642,22 @@ class TooltipController(sublime_plugin.EventListener):
                     )
 
 
-class AutomaticTransactionGutterUpdateOnSave(sublime_plugin.ViewEventListener):
+class AutomaticTransactionGutterUpdateOnSave(
+        utils.SnapshotAnalysis, sublime_plugin.ViewEventListener):
     """ This view event listener watches for ledger journal file saving to
     update the gutters that show hidden automatic transactions.
+
+    The gutters are computed in Sublime's worker thread from a snapshot
+    of the view, see utils.SnapshotAnalysis. Only the transactions
+    modified since the last update are analyzed.
     """
 
+    # The number of the last requested update, by view id.
+    generations = {}
+    # The gutter table, by view id.
+    tables = {}
+
+    @ledger_profile.profiled('gutter_snapshot')
     def update_autom_trans_info(self):
 
         # If not a ledger file, exit.
@@ -766,15 +669,49 @@ class AutomaticTransactionGutterUpdateOnSave(sublime_plugin.ViewEventListener):
         if not location:
             return
 
+        self.request_analysis(
+            lambda text, change_count, generation: self.compute_gutter(
+                location, text, change_count, generation))
+
+    @ledger_profile.profiled('gutter_compute')
+    def compute_gutter(self, location, text, change_count, generation):
+        """Computes the gutters in the worker thread.
+        """
+        ledger_profile.set_size(len(text))
+
+        if self.is_outdated(generation):
+            return
+
         # Get automatic transactions from definition file
-        autom_trans_list = get_automatic_transactions(location)
+        try:
+            matcher = get_automatic_transaction_matcher(location)
+        except ledger_cache.IncludeCycleError as error:
+            sublime.error_message(str(error))
+            return
+
+        # Get the gutter positions in the snapshot
+        table = self.tables.setdefault(self.view.id(), GutterTable())
+        gutter_index = table.update(
+            text, matcher, lambda: self.is_outdated(generation))
+
+        if gutter_index is None:
+            return
 
-        # Get the gutter positions in the current file
-        update_gutter_settings(self.view, autom_trans_list)
+        ledger_profile.add_items(len(gutter_index))
+
+        self.publish_analysis(
+            lambda: self.publish_gutter(gutter_index), change_count,
+            generation)
+
+    @ledger_profile.profiled('gutter_publish')
+    def publish_gutter(self, gutter_index):
+        """Adds the gutters to the view, in the main thread.
+        """
+        GUTTER_INDEXES[self.view.id()] = gutter_index
 
         # Add gutters
         self.view.add_regions(
-            "autom_tran", GUTTER_LINES,
+            "autom_tran", gutter_index.lines,
             "markup.warning", "dot", sublime.HIDDEN)
 
     def on_post_save(self):
@@ -782,3 +719,8 @@ class AutomaticTransactionGutterUpdateOnSave(sublime_plugin.ViewEventListener):
 
     def on_load(self):
         self.update_autom_trans_info()
+
+    def on_close(self):
+        self.forget_analysis()
+        self.tables.pop(self.view.id(), None)
+        GUTTER_INDEXES.pop(self.view.id(), None)
@@ -0,0 +1,116 @@
+"""
+The former implementations of some hot paths, kept as benchmark
+baselines:
+    - the account and payee pattern fragment with alternation and
+      lookbehind,
+    - the posting analysis with the former posting_pattern and eval,
+    - the float based Amount class.
+
+@author: Etienne Monier <etienne.monier@enseeiht.fr>
+@license: CC-BY-NC-SA
+@since: 2026-10-17
+"""
+# flake8: noqa: E501
+
+import re
+
+
+# The former account and payee fragment.
+OLD_NAME = r"(?:[^;#\%\|\*\n\t ]|(?<!\ )\ )+[^;#\%\|\*\n\t ]"
+
+
+def name_line_pattern(name):
+    """Returns a posting line pattern built on a name fragment. It
+    requires a hard separator and a number after the account.
+    """
+    return re.compile(
+        r"^\ [ \t]*(" + name + r")(?:\ {2}|\t)[ \t]*-?\d", re.M)
+
+
+# The former posting pattern, built on the former name fragment.
+OLD_POSTING_PATTERN = r"""
+    ^\ [ \t]*
+    (""" + OLD_NAME + r""")                            # ACCOUNT
+    (?:[ {2}\t][ \t]*                              # HARD SEP
+        ([$£¥€¢]?)                                 # CURRENCY SYMB
+        (-?\d+(?:,\d{3})*(?:\.\d{1,2})?)           # NUMBER
+        ((?:\ [A-Za-z]+)?)                         # CURRENCY NAME
+        ((?:\ \"[^"]+\")?)                         # CURRENCY NAME LONG
+    )?
+    .*$
+"""
+
+
+def regex_postings(content):
+    """The former posting analysis: the former posting_pattern, then
+    eval on the numbers and a FloatAmount and a FloatPosting for each
+    posting.
+
+    Returns
+    -------
+    list of FloatPosting
+    """
+    postings = []
+
+    for account, symbol, number, name, long_name in re.findall(
+            OLD_POSTING_PATTERN, content, re.X | re.M):
+
+        if number == '':
+            # No number nor amount was given
+            post_number = None
+        else:
+            post_number = eval(number)
+            currency = (symbol or name or long_name).strip()
+
+            if currency != '':
+                post_number = FloatAmount(post_number, currency)
+
+        postings.append(FloatPosting(account, post_number))
+
+    return postings
+
+
+class FloatPosting():
+    """The former Posting class, holding a FloatAmount or a number.
+    """
+
+    def __init__(self, account, number=None):
+        self.account = account
+        self.number = number
+
+
+class FloatAmount():
+    """The former Amount class: a float number, a new object for each
+    operation and type checks.
+    """
+
+    def __init__(self, number, currency):
+        if not (isinstance(number, int) or isinstance(number, float)):
+            raise ValueError('The amount number is not numeric.')
+        if not isinstance(currency, str):
+            raise ValueError('The amount currency is not a string.')
+
+        self.number = number
+        self.currency = currency
+
+        if currency in ['$', '£', '¥', '€', '¢']:
+            self.type = 0
+        elif '"' in currency:
+            self.type = 2
+        else:
+            self.type = 1
+
+    def __add__(self, other):
+        if isinstance(other, FloatAmount):
+            if self.currency != other.currency:
+                raise Exception('Two amounts can be added only if the '
+                                'currencies are the same.')
+            return FloatAmount(self.number + other.number, self.currency)
+
+        raise ValueError(
+            'Addind an amount with type {} is incorect.'.format(type(other)))
+
+    def __radd__(self, other):
+        if other == 0:
+            return self
+        return self.__add__(other)
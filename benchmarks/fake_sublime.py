@@ -0,0 +1,317 @@
+"""
+A minimal headless replacement for the sublime and sublime_plugin
+modules, so that the plugin code can be run outside of Sublime Text.
+
+Only what LedgerTools uses is provided. Timeouts are run at once and
+regions added to a view are not shifted when the text is modified.
+
+@author: Etienne Monier <etienne.monier@enseeiht.fr>
+@license: CC-BY-NC-SA
+@since: 2026-10-17
+"""
+
+import json
+import os.path
+import re
+import sys
+import tempfile
+import types
+
+
+HIDDEN = 128
+DRAW_NO_FILL = 32
+DRAW_NO_OUTLINE = 256
+DRAW_SQUIGGLY_UNDERLINE = 2048
+HOVER_TEXT = 1
+HOVER_GUTTER = 2
+HOVER_MARGIN = 3
+HIDE_ON_MOUSE_MOVE_AWAY = 2
+LITERAL = 1
+LAYOUT_INLINE = 0
+LAYOUT_BELOW = 2
+
+
+class Region():
+    """A text region, as sublime.Region.
+    """
+
+    __slots__ = ('a', 'b')
+
+    def __init__(self, a, b=None):
+        self.a = a
+        self.b = a if b is None else b
+
+    def begin(self):
+        return min(self.a, self.b)
+
+    def end(self):
+        return max(self.a, self.b)
+
+    def size(self):
+        return abs(self.b - self.a)
+
+    def empty(self):
+        return self.a == self.b
+
+    def cover(self, other):
+        return Region(min(self.begin(), other.begin()),
+                      max(self.end(), other.end()))
+
+    def intersects(self, other):
+        return self.begin() < other.end() and other.begin() < self.end()
+
+    def contains(self, point):
+        return self.begin() <= point <= self.end()
+
+    def __eq__(self, other):
+        return (self.begin(), self.end()) == (other.begin(), other.end())
+
+    def __lt__(self, other):
+        return (self.begin(), self.end()) < (other.begin(), other.end())
+
+    def __len__(self):
+        return self.size()
+
+    def __repr__(self):
+        return 'Region({}, {})'.format(self.a, self.b)
+
+
+class Settings():
+    """A settings object, as sublime.Settings.
+    """
+
+    def __init__(self, values=None):
+        self.values = dict(values or {})
+
+    def get(self, key, default=None):
+        return self.values.get(key, default)
+
+    def set(self, key, value):
+        self.values[key] = value
+
+    def has(self, key):
+        return key in self.values
+
+
+class View():
+    """A text buffer, as sublime.View.
+
+    The edits made from the end of the buffer to its beginning (as the
+    alignment command does) are applied in a single pass when the text
+    is read again, so that the fake view does not dominate the
+    measures.
+    """
+
+    next_id = 1
+
+    def __init__(self, text='', filename=None):
+        self.text = text
+        self.filename = filename
+        self.view_id = View.next_id
+        View.next_id += 1
+
+        self.changes = 0
+        self.regions = {}
+        self.selection = [Region(0)]
+        self.view_settings = Settings()
+
+        # The pending (begin, end, replacement) edits, from the end of
+        # the text to its beginning.
+        self.pending = []
+
+    def flush(self):
+        """Applies the pending edits.
+        """
+        if not self.pending:
+            return
+
+        pieces = []
+        position = len(self.text)
+        for begin, end, replacement in self.pending:
+            pieces.append(self.text[end:position])
+            pieces.append(replacement)
+            position = begin
+        pieces.append(self.text[:position])
+
+        self.text = ''.join(reversed(pieces))
+        self.pending = []
+
+    def edit(self, begin, end, replacement):
+        """Replaces the text between BEGIN and END.
+        """
+        if self.pending and end > self.pending[-1][0]:
+            self.flush()
+
+        self.pending.append((begin, end, replacement))
+        self.changes += 1
+
+    def content(self):
+        """Returns the whole text.
+        """
+        self.flush()
+        return self.text
+
+    def id(self):
+        return self.view_id
+
+    def file_name(self):
+        return self.filename
+
+    def is_valid(self):
+        return True
+
+    def window(self):
+        return None
+
+    def settings(self):
+        return self.view_settings
+
+    def change_count(self):
+        return self.changes
+
+    def size(self):
+        return len(self.content())
+
+    def substr(self, region):
+        if isinstance(region, int):
+            return self.content()[region:region + 1]
+        return self.content()[region.begin():region.end()]
+
+    def line(self, point):
+        if isinstance(point, Region):
+            return self.line(point.begin()).cover(self.line(point.end()))
+
+        text = self.content()
+        begin = text.rfind('\n', 0, point) + 1
+        end = text.find('\n', point)
+        return Region(begin, len(text) if end == -1 else end)
+
+    def full_line(self, point):
+        line = self.line(point)
+        return Region(line.begin(), min(line.end() + 1, self.size()))
+
+    def insert(self, edit, point, text):
+        self.edit(point, point, text)
+        return len(text)
+
+    def erase(self, edit, region):
+        self.edit(region.begin(), region.end(), '')
+
+    def replace(self, edit, region, text):
+        self.edit(region.begin(), region.end(), text)
+
+    def sel(self):
+        return self.selection
+
+    def add_regions(self, key, regions, scope='', icon='', flags=0):
+        self.regions[key] = list(regions)
+
+    def get_regions(self, key):
+        return list(self.regions.get(key, []))
+
+    def erase_regions(self, key):
+        self.regions.pop(key, None)
+
+    def show_popup(self, *args, **kwargs):
+        pass
+
+    def run_command(self, name, args=None):
+        pass
+
+
+class Edit():
+    """The edit token given to the text commands.
+    """
+
+
+def load_settings_file(location):
+    """Reads a .sublime-settings file, which is JSON with comments and
+    trailing commas.
+    """
+    with open(location, encoding='utf-8') as file:
+        content = file.read()
+
+    content = re.sub(r'^\s*//.*$', '', content, flags=re.M)
+    content = re.sub(r',(\s*[}\]])', r'\1', content)
+
+    return json.loads(content)
+
+
+# The settings, by file name. See install.
+SETTINGS = {}
+
+
+def load_settings(name):
+    return SETTINGS.setdefault(name, Settings())
+
+
+def set_timeout(function, delay=0):
+    function()
+
+
+def set_timeout_async(function, delay=0):
+    function()
+
+
+def status_message(message):
+    pass
+
+
+def error_message(message):
+    print('error:', message)
+
+
+def cache_path():
+    return tempfile.gettempdir()
+
+
+class TextCommand():
+
+    def __init__(self, view):
+        self.view = view
+
+
+class WindowCommand():
+
+    def __init__(self, window):
+        self.window = window
+
+
+class EventListener():
+    pass
+
+
+class ViewEventListener():
+
+    def __init__(self, view):
+        self.view = view
+
+
+def install(package_directory, package_name='LedgerTools'):
+    """Registers the fake sublime and sublime_plugin modules, reads the
+    package default settings and makes the package importable as
+    PACKAGE_NAME.
+
+    Arguments
+    ---------
+    package_directory: str
+        The LedgerTools directory.
+    package_name: optional, str
+        The name the package is imported with.
+        Default: 'LedgerTools'
+    """
+    sys.modules['sublime'] = sys.modules[__name__]
+
+    plugin = types.ModuleType('sublime_plugin')
+    for cls in (TextCommand, WindowCommand, EventListener,
+                ViewEventListener):
+        setattr(plugin, cls.__name__, cls)
+    sys.modules['sublime_plugin'] = plugin
+
+    SETTINGS['LedgerTools.sublime-settings'] = Settings(load_settings_file(
+        os.path.join(package_directory, 'LedgerTools.sublime-settings')))
+
+    # The package has no __init__.py, as Sublime Text packages.
+    package = types.ModuleType(package_name)
+    package.__path__ = [os.path.abspath(package_directory)]
+    sys.modules[package_name] = package
@@ -0,0 +1,185 @@
+"""
+Generates synthetic ledger journals for the benchmarks.
+
+A journal is made of a definition file (accounts, payees, commodities
+and automatic transactions) and a transaction file. The amounts are
+written with random spacing so that the alignment has work to do.
+
+Usage:
+
+    python generate_journal.py 100000 --accounts 200 --payees 500 \\
+        --commodities 3 --rules 50 --output /tmp/journal
+
+@author: Etienne Monier <etienne.monier@enseeiht.fr>
+@license: CC-BY-NC-SA
+@since: 2026-10-17
+"""
+
+import argparse
+import datetime
+import os.path
+import random
+
+
+# The commodities, in the three currency styles (symbol, name and long
+# name).
+COMMODITIES = ['€', 'EUR', '"Gift card"', '$', 'USD', '"Meal voucher"',
+               '£', 'GBP', '"Loyalty points"']
+
+ACCOUNT_ROOTS = ['Expenses', 'Assets', 'Income', 'Liabilities']
+
+
+def format_amount(cents, commodity):
+    """Formats an amount the way it is written in a journal.
+    """
+    number = '{}{}.{:02d}'.format(
+        '-' if cents < 0 else '', abs(cents) // 100, abs(cents) % 100)
+
+    if len(commodity) == 1:
+        return '{}{}'.format(commodity, number)
+    return '{} {}'.format(number, commodity)
+
+
+def generate_journal(transactions, accounts=50, payees=100, commodities=3,
+                     rules=20, seed=0):
+    """Generates a journal.
+
+    Arguments
+    ---------
+    transactions: int
+        The number of user transactions.
+    accounts: optional, int
+        The number of accounts.
+        Default: 50
+    payees: optional, int
+        The number of payees.
+        Default: 100
+    commodities: optional, int
+        The number of commodities, at most len(COMMODITIES).
+        Default: 3
+    rules: optional, int
+        The number of automatic transactions.
+        Default: 20
+    seed: optional, int
+        The random seed.
+        Default: 0
+
+    Returns
+    -------
+    tuple of str
+        The definition file and transaction file contents.
+    """
+    rng = random.Random(seed)
+
+    account_names = [
+        '{}:Category{}:Item{}'.format(
+            ACCOUNT_ROOTS[i % len(ACCOUNT_ROOTS)], i % 17, i)
+        for i in range(accounts)]
+    payee_names = ['Payee number {}'.format(i) for i in range(payees)]
+    commodity_names = COMMODITIES[:max(1, min(commodities,
+                                              len(COMMODITIES)))]
+
+    # The definition file.
+    lines = []
+    lines += ['account {}'.format(name) for name in account_names]
+    lines.append('')
+    lines += ['payee {}'.format(name) for name in payee_names]
+    lines.append('')
+    lines += ['commodity {}'.format(name) for name in commodity_names]
+    lines.append('')
+
+    for i in range(rules):
+        target = rng.choice(account_names)
+        lines += ['= /{}/'.format(target),
+                  '    [Equity:Budgets]{}1'.format(' ' * 40),
+                  '    [Assets:Budgets:Rule{}]{}-1'.format(i, ' ' * 30),
+                  '']
+
+    definition = '\n'.join(lines) + '\n'
+
+    # The transaction file.
+    lines = []
+    date = datetime.date(2000, 1, 1)
+
+    for i in range(transactions):
+
+        date += datetime.timedelta(days=rng.randrange(2))
+        commodity = rng.choice(commodity_names)
+
+        lines.append('{} {}{}'.format(
+            date.strftime('%Y/%m/%d'), rng.choice(('', '* ')),
+            rng.choice(payee_names)))
+
+        if rng.random() < 0.2:
+            lines.append('    ; A note about transaction {}'.format(i))
+
+        total = 0
+        for _ in range(rng.randrange(1, 4)):
+            cents = rng.randrange(1, 100000)
+            total += cents
+            lines.append('    {}{}{}'.format(
+                rng.choice(account_names), ' ' * rng.randrange(2, 40),
+                format_amount(cents, commodity)))
+
+        # The last posting amount is either written or left empty.
+        account = rng.choice(account_names)
+        if rng.random() < 0.5:
+            lines.append('    {}'.format(account))
+        else:
+            lines.append('    {}{}{}'.format(
+                account, ' ' * rng.randrange(2, 40),
+                format_amount(-total, commodity)))
+
+        lines.append('')
+
+    return definition, '\n'.join(lines)
+
+
+def write_journal(directory, transactions, **options):
+    """Generates a journal and writes it in DIRECTORY.
+
+    Returns
+    -------
+    tuple of str
+        The definition file and transaction file locations.
+    """
+    definition, journal = generate_journal(transactions, **options)
+
+    definition_filename = os.path.join(
+        directory, 'definition-{}.ledger'.format(transactions))
+    journal_filename = os.path.join(
+        directory, 'journal-{}.ledger'.format(transactions))
+
+    with open(definition_filename, 'w', encoding='utf-8') as file:
+        file.write(definition)
+    with open(journal_filename, 'w', encoding='utf-8') as file:
+        file.write(journal)
+
+    return definition_filename, journal_filename
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Generates a synthetic ledger journal.')
+    parser.add_argument('transactions', type=int,
+                        help='the number of user transactions')
+    parser.add_argument('--accounts', type=int, default=50)
+    parser.add_argument('--payees', type=int, default=100)
+    parser.add_argument('--commodities', type=int, default=3)
+    parser.add_argument('--rules', type=int, default=20,
+                        help='the number of automatic transactions')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='.',
+                        help='the output directory')
+    args = parser.parse_args()
+
+    filenames = write_journal(
+        args.output, args.transactions, accounts=args.accounts,
+        payees=args.payees, commodities=args.commodities, rules=args.rules,
+        seed=args.seed)
+
+    print('\n'.join(filenames))
+
+
+if __name__ == '__main__':
+    main()
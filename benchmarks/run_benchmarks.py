@@ -0,0 +1,502 @@
+"""
+Measures the LedgerTools hot paths on synthetic journals, outside of
+Sublime Text.
+
+The plugin runs against the fake sublime module of fake_sublime.py.
+For each journal size and scenario, the best time of a few runs and the
+peak memory of one more run (measured with tracemalloc) are reported.
+
+Usage:
+
+    python run_benchmarks.py --sizes 1000,10000 --repeat 3
+    python run_benchmarks.py --only gutter,align --save before.json
+    python run_benchmarks.py --compare before.json
+
+The benchmarks directory is not loaded by Sublime Text, which only
+loads the plugins at the package root.
+
+@author: Etienne Monier <etienne.monier@enseeiht.fr>
+@license: CC-BY-NC-SA
+@since: 2026-10-17
+"""
+
+import argparse
+import collections
+import decimal
+import gc
+import importlib
+import json
+import os.path
+import sys
+import tempfile
+import time
+import tracemalloc
+
+BENCHMARKS_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+PACKAGE_DIRECTORY = os.path.dirname(BENCHMARKS_DIRECTORY)
+
+sys.path.insert(0, BENCHMARKS_DIRECTORY)
+
+import fake_sublime  # noqa: E402
+import baselines  # noqa: E402
+import generate_journal  # noqa: E402
+
+fake_sublime.install(PACKAGE_DIRECTORY)
+
+
+def plugin(name):
+    """Imports a LedgerTools module.
+    """
+    return importlib.import_module('LedgerTools.' + name)
+
+
+class Journal():
+    """A generated journal and its content.
+
+    Attributes
+    ----------
+    size: int
+        The number of user transactions.
+    definition: str
+        The definition file location.
+    filename: str
+        The transaction file location.
+    text: str
+        The transaction file content.
+    """
+
+    def __init__(self, directory, size):
+        self.size = size
+        self.definition, self.filename = generate_journal.write_journal(
+            directory, size, rules=20)
+
+        with open(self.filename, encoding='utf-8') as file:
+            self.text = file.read()
+
+        settings = fake_sublime.load_settings('LedgerTools.sublime-settings')
+        settings.set('definition_filename', self.definition)
+
+    def split(self, parts=8):
+        """Writes the transactions in PARTS files, included by a main
+        file, as a journal split by year.
+
+        Returns
+        -------
+        str
+            The main file location.
+        """
+        blocks = self.text.split('\n\n')
+        size = -(-len(blocks) // parts)
+
+        names = []
+        for part in range(parts):
+            name = '{}.part{}.ledger'.format(self.filename[:-7], part)
+            with open(name, 'w', encoding='utf-8') as file:
+                file.write('\n\n'.join(blocks[part * size:
+                                                (part + 1) * size]))
+            names.append(name)
+
+        main = '{}.main.ledger'.format(self.filename[:-7])
+        with open(main, 'w', encoding='utf-8') as file:
+            file.write(''.join('include {}\n'.format(name)
+                               for name in names))
+
+        return main
+
+    def posting_lines(self):
+        return [line for line in self.text.split('\n')
+                if line.startswith('    ') and not line.startswith('    ;')]
+
+
+# The scenarios, by name. Each one is a function taking a Journal and
+# returning the function to measure.
+SCENARIOS = collections.OrderedDict()
+
+
+def scenario(name):
+    def register(function):
+        SCENARIOS[name] = function
+        return function
+    return register
+
+
+def cold_cache():
+    """Empties the parse cache, in memory and on disk.
+    """
+    ledger_cache = plugin('ledger_cache')
+    ledger_cache.set_cache_directory(None)
+    ledger_cache.clear()
+
+
+@scenario('align')
+def align(journal):
+    AlignAmount = plugin('AlignAmount')
+
+    def run():
+        view = fake_sublime.View(journal.text, journal.filename)
+        AlignAmount.LedgerAlignAmountsCommand(view).run(
+            fake_sublime.Edit())
+        view.content()
+    return run
+
+
+@scenario('align_dirty_only')
+def align_dirty_only(journal):
+    AlignAmount = plugin('AlignAmount')
+    middle = journal.text.find('\n    ', len(journal.text) // 2) + 1
+
+    def run():
+        view = fake_sublime.View(journal.text, journal.filename)
+        view.add_regions(AlignAmount.DIRTY_REGIONS_KEY,
+                         [fake_sublime.Region(middle, middle + 1)])
+        AlignAmount.LedgerAlignAmountsCommand(view).run(
+            fake_sublime.Edit(), dirty_only=True)
+        view.content()
+    return run
+
+
+@scenario('get_user_transactions')
+def get_user_transactions(journal):
+    gutter = plugin('autom_transaction_gutter')
+    return lambda: gutter.get_user_transactions(journal.text)
+
+
+@scenario('gutter_full')
+def gutter_full(journal):
+    gutter = plugin('autom_transaction_gutter')
+    matcher = gutter.get_automatic_transaction_matcher(journal.definition)
+    return lambda: gutter.compute_gutter_settings(journal.text, matcher)
+
+
+@scenario('gutter_incremental')
+def gutter_incremental(journal):
+    gutter = plugin('autom_transaction_gutter')
+    matcher = gutter.get_automatic_transaction_matcher(journal.definition)
+
+    # Alternate between the journal and a version with one modified
+    # transaction.
+    middle = journal.text.find('\n    ', len(journal.text) // 2) + 1
+    texts = [journal.text,
+             journal.text[:middle] + '    Expenses:Extra  €1.00\n' +
+             journal.text[middle:]]
+
+    table = gutter.GutterTable()
+    table.update(texts[0], matcher)
+    state = [0]
+
+    def run():
+        state[0] = 1 - state[0]
+        table.update(texts[state[0]], matcher)
+    return run
+
+
+@scenario('get_automatic_transactions_cold')
+def get_automatic_transactions_cold(journal):
+    gutter = plugin('autom_transaction_gutter')
+
+    def run():
+        cold_cache()
+        gutter.get_automatic_transactions(journal.definition)
+    return run
+
+
+@scenario('get_automatic_transactions_warm')
+def get_automatic_transactions_warm(journal):
+    gutter = plugin('autom_transaction_gutter')
+    cold_cache()
+    return lambda: gutter.get_automatic_transactions(journal.definition)
+
+
+@scenario('get_info_cold')
+def get_info_cold(journal):
+    search = plugin('SearchAccountPayee')
+
+    def run():
+        cold_cache()
+        search.get_info(journal.filename, 'account')
+    return run
+
+
+@scenario('get_info_warm')
+def get_info_warm(journal):
+    search = plugin('SearchAccountPayee')
+    cold_cache()
+    return lambda: search.get_info(journal.filename, 'account')
+
+
+@scenario('derive_split')
+def derive_split(journal):
+    ledger_cache = plugin('ledger_cache')
+    ledger_balance = plugin('ledger_balance')
+    main = journal.split()
+
+    def run():
+        cold_cache()
+        ledger_cache.derive_all(
+            main, 'balance_entries', ledger_balance.extract_entries)
+    return run
+
+
+@scenario('parser_grammar')
+def parser_grammar(journal):
+    try:
+        Ledger_parser = plugin('Ledger_parser')
+    except ImportError:
+        # parsimonious is not installed.
+        return None
+
+    return lambda: Ledger_parser.Ledger_parser(journal.filename)
+
+
+@scenario('parser_blocks')
+def parser_blocks(journal):
+    # The same transactions, read with the block splitter and the
+    # tokenizer: the backend the gutter uses.
+    ledger_stream = plugin('ledger_stream')
+    ledger_balance = plugin('ledger_balance')
+
+    return lambda: [ledger_balance.parse_transaction(block)
+                    for block in ledger_stream.iter_blocks(journal.filename)
+                    if block.kind == 'user_transaction']
+
+
+@scenario('posting_regex_eval')
+def posting_regex_eval(journal):
+    content = '\n'.join(journal.posting_lines())
+
+    return lambda: baselines.regex_postings(content)
+
+
+@scenario('posting_tokenizer')
+def posting_tokenizer(journal):
+    ledger_tokenizer = plugin('ledger_tokenizer')
+    lines = journal.posting_lines()
+
+    return lambda: [ledger_tokenizer.parse_posting(line) for line in lines]
+
+
+def adversarial_line(journal):
+    """A long line with single spaces only, as a pasted bank memo. It
+    has no hard separator, so the account patterns fail on it.
+    """
+    return ' ' + 'memo ' * journal.size + 'end\n'
+
+
+@scenario('adversarial_line_old_pattern')
+def adversarial_line_old_pattern(journal):
+    pattern = baselines.name_line_pattern(baselines.OLD_NAME)
+    line = adversarial_line(journal)
+    return lambda: pattern.search(line)
+
+
+@scenario('adversarial_line_pattern')
+def adversarial_line_pattern(journal):
+    pattern = baselines.name_line_pattern(plugin('ledger_regex').name)
+    line = adversarial_line(journal)
+    return lambda: pattern.search(line)
+
+
+@scenario('adversarial_line_tokenizer')
+def adversarial_line_tokenizer(journal):
+    ledger_tokenizer = plugin('ledger_tokenizer')
+    line = adversarial_line(journal)[:-1]
+    return lambda: ledger_tokenizer.parse_posting(line)
+
+
+def amount_numbers(journal):
+    return [(i * 37) % 100000 / 100 for i in range(journal.size * 3)]
+
+
+@scenario('amount_sum_float_baseline')
+def amount_sum_float_baseline(journal):
+    amounts = [baselines.FloatAmount(number, 'EUR')
+               for number in amount_numbers(journal)]
+    return lambda: sum(amounts)
+
+
+@scenario('amount_sum')
+def amount_sum(journal):
+    Amount = plugin('ledger_model').Amount
+    amounts = [Amount(decimal.Decimal(str(number)), 'EUR')
+               for number in amount_numbers(journal)]
+    return lambda: sum(amounts)
+
+
+@scenario('amount_sum_balance')
+def amount_sum_balance(journal):
+    ledger_model = plugin('ledger_model')
+    commodities = ['EUR', '€', '"Gift card"']
+    amounts = [ledger_model.Amount(decimal.Decimal(str(number)),
+                                   commodities[i % 3])
+               for i, number in enumerate(amount_numbers(journal))]
+
+    def run():
+        total = ledger_model.Balance()
+        for amount in amounts:
+            total += amount
+    return run
+
+
+@scenario('balance_engine')
+def balance_engine(journal):
+    ledger_balance = plugin('ledger_balance')
+    ledger_stream = plugin('ledger_stream')
+
+    def run():
+        engine = ledger_balance.BalanceEngine()
+        engine.update_source(None, ledger_balance.extract_entries(
+            ledger_stream.split_blocks(journal.text)))
+        engine.balance('Expenses')
+    return run
+
+
+@scenario('balance_edit')
+def balance_edit(journal):
+    # A transaction is edited in a view whose balances are computed:
+    # the running sums are only computed again from its date.
+    ledger_balance = plugin('ledger_balance')
+    ledger_stream = plugin('ledger_stream')
+
+    engine = ledger_balance.BalanceEngine()
+    blocks = ledger_stream.split_blocks(journal.text)
+    engine.update_source(None, ledger_balance.extract_entries(blocks))
+
+    middle = journal.text.find('\n    ', len(journal.text) // 2) + 1
+    edited = journal.text[:middle] + '    Expenses:Edited  1 EUR\n' + \
+        journal.text[middle:]
+    # The blocks are read beforehand: only the engine update is
+    # measured.
+    sources = [engine.sources[None]]
+    sources.insert(0, ledger_balance.extract_entries(
+        ledger_stream.split_blocks(edited), sources[0]))
+
+    def run():
+        for entries in sources:
+            engine.update_source(None, entries)
+        engine.balance('Expenses')
+    return run
+
+
+@scenario('lint')
+def lint(journal):
+    ledger_lint = plugin('ledger_lint')
+    return lambda: ledger_lint.LintTable().update(journal.text)
+
+
+@scenario('load_gutter_and_lint')
+def load_gutter_and_lint(journal):
+    # A view being opened: the gutter and the linter read the same
+    # blocks, which are parsed once.
+    gutter = plugin('autom_transaction_gutter')
+    ledger_lint = plugin('ledger_lint')
+    matcher = gutter.get_automatic_transaction_matcher(journal.definition)
+
+    def run():
+        gutter.compute_gutter_settings(journal.text, matcher)
+        ledger_lint.LintTable().update(journal.text)
+    return run
+
+
+@scenario('report_balance')
+def report_balance(journal):
+    ledger_report = plugin('ledger_report')
+    ledger_stream = plugin('ledger_stream')
+    table = ledger_report.extract_table(
+        ledger_stream.iter_blocks(journal.filename))
+
+    return lambda: ledger_report.balance_report(
+        table, ledger_report.select(table, 'Expenses'), 2)
+
+
+def measure(function, repeat):
+    """Measures a function.
+
+    Returns
+    -------
+    tuple
+        The best time in seconds and the peak memory in bytes.
+    """
+    # The blocks parsed by a run should not be found by the next one.
+    parse_block = plugin('ledger_tokenizer').parse_block
+
+    times = []
+    for _ in range(repeat):
+        parse_block.cache_clear()
+        gc.collect()
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+
+    # Memory is measured apart, as tracemalloc slows the code down.
+    parse_block.cache_clear()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        function()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return min(times), peak
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Measures the LedgerTools hot paths.')
+    parser.add_argument('--sizes', default='1000,10000',
+                        help='comma separated numbers of transactions')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--only', default='',
+                        help='comma separated scenario name prefixes')
+    parser.add_argument('--save', help='writes the results as JSON')
+    parser.add_argument('--compare',
+                        help='compares with results saved with --save')
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    prefixes = [prefix for prefix in args.only.split(',') if prefix]
+    names = [name for name in SCENARIOS
+             if not prefixes or any(name.startswith(prefix)
+                                    for prefix in prefixes)]
+
+    reference = {}
+    if args.compare:
+        with open(args.compare) as file:
+            reference = json.load(file)
+
+    results = {}
+    directory = tempfile.mkdtemp(prefix='ledgertools-benchmarks-')
+
+    print('{:<34} {:>9} {:>12} {:>12} {:>9}'.format(
+        'scenario', 'size', 'time (ms)', 'peak (KiB)', 'vs ref'))
+
+    for size in sizes:
+
+        journal = Journal(directory, size)
+
+        for name in names:
+
+            function = SCENARIOS[name](journal)
+            if function is None:
+                print('{:<34} {:>9} {:>12}'.format(name, size, 'skipped'))
+                continue
+
+            seconds, peak = measure(function, args.repeat)
+
+            key = '{}/{}'.format(name, size)
+            results[key] = {'time': seconds, 'peak': peak}
+
+            ratio = ''
+            if key in reference and reference[key]['time']:
+                ratio = '{:.2f}x'.format(seconds / reference[key]['time'])
+
+            print('{:<34} {:>9} {:>12.2f} {:>12.0f} {:>9}'.format(
+                name, size, seconds * 1000, peak / 1024, ratio))
+
+    if args.save:
+        with open(args.save, 'w') as file:
+            json.dump(results, file, indent=2, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main()
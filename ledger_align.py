@@ -0,0 +1,106 @@
+"""
+Computes the edits needed to align the amounts of a ledger text.
+
+This module does not depend on Sublime Text so that the alignment can
+be tested and benchmarked on its own.
+
+@author: Etienne Monier <etienne.monier@enseeiht.fr>
+@license: CC-BY-NC-SA
+@since: 2026-10-17
+"""
+
+import re
+
+
+# Pattern to catch a posting line with an amount.
+#
+# It catches the following groups:
+#     1. The account name
+#     2. The integer part of the amount (with currency and sign)
+#
+# Only spaces and tabs are used as white spaces so that a match never
+# spans over several lines of the text.
+amount_line_pattern = re.compile(
+    r'^[ \t]+([\[\]\w: \t_-]+)[ \t]+([-$£¥€¢\d,_]+)(?:.\d*)?.*$', re.M)
+
+
+def alignment_edits(text, dot_pos=58, offset=0):
+    """Computes the edits to apply to TEXT so that the amount dots are
+    located at position DOT_POS in their line.
+
+    Arguments
+    ---------
+    text: str
+        The text to align. It should begin at the beginning of a line.
+    dot_pos: int
+        The dot position in the line.
+        Default: 58
+    offset: int
+        The position of the text in the document. It is added to the
+        edit positions.
+        Default: 0
+
+    Returns
+    -------
+    list of tuple
+        A list of (position, delta) sorted by position. If delta > 0,
+        delta spaces should be inserted at position. Otherwise, the
+        -delta characters before position should be removed.
+    """
+    edits = []
+
+    for m in amount_line_pattern.finditer(text):
+
+        # Position of the amount in the line and in the text.
+        amount_pos = m.start(2)
+        line_pos_dot = m.end(2) - m.start()
+
+        # Get number of spaces to add or to remove
+        # If >=0, spaces should be added
+        # If <0, spaces should be removed
+        num = dot_pos - line_pos_dot
+
+        if num < 0:
+            # Never remove more than the white spaces before the amount
+            # and keep a hard separator (two spaces).
+            line_start = text[m.start():amount_pos]
+            spaces = len(line_start) - len(line_start.rstrip(' \t'))
+            num = max(num, min(0, 2 - spaces))
+
+        if num != 0:
+            edits.append((offset + amount_pos, num))
+
+    return edits
+
+
+def apply_edits(text, edits, offset=0):
+    """Applies a list of edits computed by alignment_edits to TEXT.
+
+    Arguments
+    ---------
+    text: str
+        The text to modify.
+    edits: list of tuple
+        The (position, delta) edits.
+    offset: int
+        The position of the text in the document.
+        Default: 0
+
+    Returns
+    -------
+    str
+        The aligned text.
+    """
+    chunks = []
+    last = 0
+    for position, delta in edits:
+        position -= offset
+        if delta > 0:
+            chunks.append(text[last:position])
+            chunks.append(' ' * delta)
+        else:
+            chunks.append(text[last:position + delta])
+        last = position
+    chunks.append(text[last:])
+
+    return ''.join(chunks)
@@ -0,0 +1,334 @@
+"""
+Computes account balances from the user transactions.
+
+For each account and commodity, the postings are summed by day and
+kept sorted by date with their running (prefix) sums, so that the
+balance at any date is found by bisection. The balances are updated
+transaction by transaction when the journal is modified, and the
+running sums are only computed again from the first modified date.
+
+@author: Etienne Monier <etienne.monier@enseeiht.fr>
+@license: CC-BY-NC-SA
+@since: 2026-10-17
+"""
+
+import bisect
+import hashlib
+
+from . import ledger_tokenizer
+from .ledger_model import Balance, UserTransaction, parse_date
+
+
+def clean_account(account):
+    """Removes the brackets or parenthesis around a virtual account.
+    """
+    if len(account) > 1 and (account[0], account[-1]) in (
+            ('[', ']'), ('(', ')')):
+        return account[1:-1]
+
+    return account
+
+
+def parse_transaction(block):
+    """Analyzes a user transaction block.
+
+    Arguments
+    ---------
+    block: ledger_stream.Block
+        The block.
+
+    Returns
+    -------
+    None or UserTransaction
+        None if the transaction is invalid. Otherwise, the transaction,
+        with its date as a datetime.date.
+    """
+    parsed = ledger_tokenizer.parse_block(block.text)
+    if parsed.date is None:
+        return None
+
+    date = parse_date(parsed.date)
+    if date is None:
+        return None
+
+    try:
+        return UserTransaction(date, parsed.payee, parsed.new_postings())
+    except ValueError:
+        # The missing amount can not be found.
+        return None
+
+
+def block_entries(block):
+    """Computes the balance entries of a user transaction block.
+
+    Arguments
+    ---------
+    block: ledger_stream.Block
+        The block.
+
+    Returns
+    -------
+    list of tuple
+        The (date ordinal, account, commodity, number) of each posting
+        with an amount. Empty if the transaction is invalid.
+    """
+    transaction = parse_transaction(block)
+    if transaction is None:
+        return []
+
+    ordinal = transaction.date.toordinal()
+
+    return [
+        (ordinal, clean_account(posting.account), posting.number.currency,
+         posting.number.number)
+        for posting in transaction.postings if posting.is_Amount()]
+
+
+def extract_entries(blocks, previous=None):
+    """Computes the balance entries of each user transaction of a file.
+
+    Arguments
+    ---------
+    blocks: iterable of ledger_stream.Block
+        The file blocks.
+    previous: None or dict
+        The entries previously extracted from the file. The unmodified
+        transactions are not parsed again.
+
+    Returns
+    -------
+    dict
+        The entries of each transaction (see block_entries), by block
+        key. The key is a digest of the block text, with an occurrence
+        number to tell identical transactions apart. Unlike hash(), the
+        digest does not change between sessions, so that the entries
+        can be kept in the persistent cache.
+    """
+    entries = {}
+    occurrences = {}
+
+    for block in blocks:
+
+        if block.kind != 'user_transaction':
+            continue
+
+        text_hash = hashlib.md5(block.text.encode('utf-8')).digest()
+        occurrence = occurrences.get(text_hash, 0)
+        occurrences[text_hash] = occurrence + 1
+
+        key = (text_hash, occurrence)
+        if previous is not None and key in previous:
+            entries[key] = previous[key]
+        else:
+            entries[key] = block_entries(block)
+
+    return entries
+
+
+class Series():
+    """The daily movements of an account in a commodity, with their
+    running sums.
+
+    Attributes
+    ----------
+    days: dict
+        The sum of the postings of each day, by date ordinal.
+    dates: list of int
+        The sorted date ordinals.
+    sums: list of decimal.Decimal
+        The balance at the end of each date.
+    changed: None or int
+        The first date modified since the running sums were computed.
+    """
+
+    __slots__ = ('days', 'dates', 'sums', 'changed')
+
+    def __init__(self):
+        self.days = {}
+        self.dates = []
+        self.sums = []
+        self.changed = None
+
+    def add(self, ordinal, number):
+        """Adds a movement. The running sums should be rebuilt after.
+        """
+        total = self.days.get(ordinal, 0) + number
+
+        # The days without movement left are dropped.
+        if total == 0:
+            if ordinal in self.days:
+                del self.days[ordinal]
+                del self.dates[bisect.bisect_left(self.dates, ordinal)]
+        else:
+            if ordinal not in self.days:
+                bisect.insort(self.dates, ordinal)
+            self.days[ordinal] = total
+
+        if self.changed is None or ordinal < self.changed:
+            self.changed = ordinal
+
+    def rebuild(self):
+        """Computes the running sums from the first modified date. The
+        dates before it did not move, and neither did their sums.
+        """
+        if self.changed is None:
+            return
+
+        index = bisect.bisect_left(self.dates, self.changed)
+        self.changed = None
+
+        total = self.sums[index - 1] if index else 0
+        del self.sums[index:]
+        for ordinal in self.dates[index:]:
+            total += self.days[ordinal]
+            self.sums.append(total)
+
+    def balance(self, ordinal=None):
+        """Returns the balance at the end of a date.
+
+        Arguments
+        ---------
+        ordinal: None or int
+            The date ordinal. None for the balance after the last
+            posting.
+        """
+        if ordinal is None:
+            return self.sums[-1] if self.sums else 0
+
+        index = bisect.bisect_right(self.dates, ordinal)
+        return self.sums[index - 1] if index else 0
+
+
+class BalanceEngine():
+    """Keeps the balance of each account and commodity.
+
+    The postings come from several sources (a view, a file, ...). Each
+    source gives the entries of its transactions by block key. When a
+    source is updated, only the transactions which appeared or
+    disappeared are applied, and only the series they touch are
+    rebuilt.
+
+    Attributes
+    ----------
+    series: dict
+        The Series of each (account, commodity).
+    accounts: list of str
+        The sorted account names.
+    commodities: dict
+        The commodities used by each account.
+    """
+
+    def __init__(self):
+        self.series = {}
+        self.accounts = []
+        self.commodities = {}
+
+        # The entries of each source, by source id.
+        self.sources = {}
+
+    def apply(self, entries, sign, touched):
+        """Adds (sign=1) or removes (sign=-1) entries. The touched series
+        keys are added to TOUCHED.
+        """
+        for ordinal, account, commodity, number in entries:
+
+            key = (account, commodity)
+
+            if key not in self.series:
+                self.series[key] = Series()
+                index = bisect.bisect_left(self.accounts, account)
+                if index == len(self.accounts) or \
+                        self.accounts[index] != account:
+                    self.accounts.insert(index, account)
+                self.commodities.setdefault(account, set()).add(commodity)
+
+            self.series[key].add(ordinal, sign * number)
+            touched.add(key)
+
+    def update_source(self, source, entries):
+        """Replaces the entries of a source.
+
+        Arguments
+        ---------
+        source: hashable
+            The source id.
+        entries: dict
+            The entries of each transaction, by block key. See
+            extract_entries.
+        """
+        previous = self.sources.get(source, {})
+
+        if previous is entries:
+            return
+
+        touched = set()
+
+        for key, transaction_entries in previous.items():
+            if key not in entries:
+                self.apply(transaction_entries, -1, touched)
+
+        for key, transaction_entries in entries.items():
+            if key not in previous:
+                self.apply(transaction_entries, 1, touched)
+
+        self.sources[source] = entries
+
+        for key in touched:
+            self.series[key].rebuild()
+
+    def remove_source(self, source):
+        """Removes all the entries of a source.
+        """
+        self.update_source(source, {})
+        del self.sources[source]
+
+    def sub_accounts(self, account):
+        """Returns the account and its sub-accounts.
+        """
+        accounts = [account] if account in self.commodities else []
+
+        # The sub-accounts are contiguous in the sorted names, but the
+        # siblings with a space, a dash or a digit ("Expenses 2021") sort
+        # between the account and them.
+        prefix = account + ':'
+        index = bisect.bisect_left(self.accounts, prefix)
+
+        while index < len(self.accounts) and \
+                self.accounts[index].startswith(prefix):
+            accounts.append(self.accounts[index])
+            index += 1
+
+        return accounts
+
+    def balance(self, account, date=None, sub_accounts=True):
+        """Returns the balance of an account.
+
+        Arguments
+        ---------
+        account: str
+            The account name.
+        date: None or datetime.date
+            The balance is computed at the end of this date. None for
+            the balance after the last posting.
+        sub_accounts: bool
+            If True, the sub-accounts balances are included.
+            Default: True
+
+        Returns
+        -------
+        list of Amount
+            The non-zero balance in each commodity, sorted by commodity.
+        """
+        ordinal = None if date is None else date.toordinal()
+
+        accounts = self.sub_accounts(account) if sub_accounts \
+            else [account]
+
+        total = Balance()
+        for name in accounts:
+            for commodity in self.commodities.get(name, ()):
+                total.add_number(
+                    self.series[(name, commodity)].balance(ordinal),
+                    commodity)
+
+        return total.amounts()
@@ -0,0 +1,462 @@
+"""
+Provides a cache for the ledger files read by the different commands.
+
+The information extracted from a file (accounts, payees, automatic
+transactions, ...) is stored as long as the file is not modified on
+disk, so that all commands share it. Files are streamed block by block
+when the information is extracted.
+
+The information can also be kept on disk, so that unchanged files are
+not read again after a restart. Each piece of information of a file is
+kept apart, so that it is only loaded when it is asked for.
+
+@author: Etienne Monier <etienne.monier@enseeiht.fr>
+@license: CC-BY-NC-SA
+@since: 2026-10-17
+"""
+
+import concurrent.futures
+import glob
+import hashlib
+import os
+import os.path
+import pickle
+import re
+import tempfile
+
+from . import ledger_profile
+from . import ledger_regex
+from . import ledger_stream
+
+
+# The maximum number of files read at the same time.
+MAX_WORKERS = 4
+
+# The cached files, by absolute path.
+CACHED_FILES = {}
+
+# The directory where the derived information is kept between sessions.
+# None if it should not be kept.
+CACHE_DIRECTORY = None
+
+# The version of the information kept on disk. It should be increased
+# each time the derived information changes.
+CACHE_VERSION = 7
+
+
+def file_signature(filename):
+    """Returns a tuple which changes as soon as the file is modified.
+
+    Arguments
+    ---------
+    filename: str
+        The file location.
+
+    Returns
+    -------
+    tuple
+        The (modification time, size) of the file.
+    """
+    stat = os.stat(filename)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def set_cache_directory(directory):
+    """Sets the directory where the derived information is kept between
+    sessions.
+
+    Arguments
+    ---------
+    directory: None or str
+        The directory. None to only keep information in memory.
+    """
+    global CACHE_DIRECTORY
+
+    if directory is not None:
+        os.makedirs(directory, exist_ok=True)
+
+    CACHE_DIRECTORY = directory
+
+
+def cache_location(filename, key):
+    """Returns the location of the information KEY of a file on disk.
+    """
+    name = hashlib.sha1(
+        '{}\0{!r}'.format(filename, key).encode('utf-8')).hexdigest()
+    return os.path.join(CACHE_DIRECTORY, name + '.pickle')
+
+
+def load_derived(filename, signature, key):
+    """Loads the information KEY of a file kept on disk.
+
+    Arguments
+    ---------
+    filename: str
+        The absolute file location.
+    signature: tuple
+        The current file signature.
+    key: hashable
+        The information key.
+
+    Returns
+    -------
+    tuple
+        (True, information) if it was found, (False, None) if nothing
+        was kept, or if it was stale or corrupt.
+    """
+    if CACHE_DIRECTORY is None:
+        return False, None
+
+    location = cache_location(filename, key)
+
+    try:
+        with open(location, 'rb') as file:
+            version, stored_filename, stored_key, stored_signature, \
+                value = pickle.load(file)
+
+    except FileNotFoundError:
+        return False, None
+
+    except Exception:
+        # Corrupt or written by an incompatible version.
+        try:
+            os.remove(location)
+        except OSError:
+            pass
+        return False, None
+
+    if version != CACHE_VERSION or stored_filename != filename or \
+            stored_key != key or stored_signature != signature:
+        return False, None
+
+    return True, value
+
+
+def store_derived(cached, key):
+    """Keeps the information KEY of a cached file on disk. Errors are
+    ignored as the information can always be computed again.
+
+    Arguments
+    ---------
+    cached: CachedFile
+        The cached file.
+    key: hashable
+        The information key.
+    """
+    if CACHE_DIRECTORY is None:
+        return
+
+    file = None
+
+    try:
+        # The file is replaced at once so that it is never read while
+        # partially written.
+        with tempfile.NamedTemporaryFile(
+                dir=CACHE_DIRECTORY, delete=False) as file:
+            pickle.dump(
+                (CACHE_VERSION, cached.filename, key, cached.signature,
+                 cached.derived[key]),
+                file, pickle.HIGHEST_PROTOCOL)
+
+        os.replace(file.name, cache_location(cached.filename, key))
+
+    except Exception:
+        # E.g. a full disk or information which can not be pickled.
+        if file is not None:
+            try:
+                os.remove(file.name)
+            except OSError:
+                pass
+
+
+class CachedFile():
+    """The information derived from a file.
+
+    Attributes
+    ----------
+    filename: str
+        The absolute file location.
+    signature: tuple
+        The file signature when it was read.
+    """
+
+    def __init__(self, filename, signature):
+        """
+        Arguments
+        ---------
+        filename: str
+            The absolute file location.
+        signature: tuple
+            The file signature, as given by file_signature.
+        """
+        self.filename = filename
+        self.signature = signature
+
+        # The derived information, by key.
+        self.derived = {}
+
+    def blocks(self):
+        """Returns an iterator over the file blocks.
+        See ledger_stream.iter_blocks.
+        """
+        return ledger_stream.iter_blocks(self.filename)
+
+    def load(self, key):
+        """Loads the information KEY kept on disk if it is not known yet.
+        It is only used if the file did not change since.
+
+        Returns
+        -------
+        bool
+            True if the information is known.
+        """
+        if key not in self.derived:
+            found, value = load_derived(self.filename, self.signature, key)
+            if found:
+                self.derived[key] = value
+
+        return key in self.derived
+
+    def derive(self, key, function):
+        """Returns the information stored under KEY. It is computed with
+        FUNCTION(blocks) the first time it is asked for.
+
+        Arguments
+        ---------
+        key: hashable
+            The information key.
+        function: function
+            The function that extracts the information from an iterator
+            over the file blocks.
+        """
+        if not self.load(key):
+            self.derived[key] = function(self.blocks())
+            store_derived(self, key)
+
+        return self.derived[key]
+
+    def __repr__(self):
+        return 'CachedFile(filename={}, signature={})'.format(
+            self.filename, self.signature)
+
+
+def get_file(filename):
+    """Returns the cached version of a file. Its information is dropped
+    if it was modified since the last call.
+
+    Arguments
+    ---------
+    filename: str
+        The file location.
+
+    Returns
+    -------
+    CachedFile
+        The cached file.
+    """
+    filename = os.path.abspath(filename)
+    signature = file_signature(filename)
+
+    cached = CACHED_FILES.get(filename)
+
+    if cached is None or cached.signature != signature:
+        cached = CachedFile(filename, signature)
+        CACHED_FILES[filename] = cached
+
+    return cached
+
+
+def derive(filename, key, function):
+    """Returns the information KEY extracted from a file with FUNCTION.
+    See CachedFile.derive.
+    """
+    return get_file(filename).derive(key, function)
+
+
+@ledger_profile.profiled('derive_files')
+def derive_files(cached_files, key, function):
+    """Returns the information KEY extracted with FUNCTION from each
+    cached file. See CachedFile.derive.
+
+    Arguments
+    ---------
+    cached_files: list of CachedFile
+        The files, usually in include order.
+    key: hashable
+        The information key.
+    function: function
+        The extraction function.
+
+    Returns
+    -------
+    list
+        The information of each file, in the order of CACHED_FILES.
+    """
+    ledger_profile.add_items(len(cached_files))
+
+    return [cached.derive(key, function) for cached in cached_files]
+
+
+def derive_all(filename, key, function):
+    """Returns the information KEY extracted with FUNCTION from each file
+    of the journal FILENAME, i.e. FILENAME and the files it includes.
+    See resolve_includes and derive_files.
+
+    Returns
+    -------
+    list
+        The information of each file, in include order.
+    """
+    return derive_files(resolve_includes(filename), key, function)
+
+
+class IncludeCycleError(ValueError):
+    """Raised when a file includes itself, directly or not.
+    """
+
+
+def extract_includes(blocks, directory):
+    """Finds the files included by a ledger file.
+
+    Arguments
+    ---------
+    blocks: iterable of ledger_stream.Block
+        The file blocks.
+    directory: str
+        The directory of the file. Relative names are resolved from it.
+
+    Returns
+    -------
+    list of str
+        The absolute locations of the included files. The glob patterns
+        are not expanded, see included_files.
+    """
+    includes = []
+
+    for block in blocks:
+
+        m = re.match(ledger_regex.include_line, block.header)
+        if block.kind != 'directive' or not m:
+            continue
+
+        includes.append(os.path.normpath(os.path.join(
+            directory, os.path.expanduser(m.group(1)))))
+
+    return includes
+
+
+def included_files(cached):
+    """Returns the files included by a cached file.
+
+    Ledger accepts glob patterns. They are expanded at each call, so that
+    the matching files added or removed since the file was read are
+    taken into account. The file itself is left out of its patterns
+    (e.g. "include *.ledger").
+    """
+    directory = os.path.dirname(cached.filename)
+
+    includes = []
+    for name in cached.derive(
+            'includes', lambda blocks: extract_includes(blocks, directory)):
+
+        if glob.has_magic(name):
+            includes += [
+                match for match in sorted(
+                    os.path.normpath(match) for match in glob.glob(name))
+                if match != cached.filename]
+        else:
+            includes.append(name)
+
+    return includes
+
+
+def load_file(filename):
+    """Returns the cached file and the files it includes, or None if it
+    can not be read (missing file, invalid encoding, ...).
+    """
+    try:
+        cached = get_file(filename)
+        return cached, included_files(cached)
+    except (OSError, ValueError):
+        # UnicodeDecodeError is a ValueError.
+        return None
+
+
+@ledger_profile.profiled('resolve_includes')
+def resolve_includes(filename):
+    """Returns the cached files of the journal FILENAME, i.e. FILENAME
+    and the files it includes, recursively.
+
+    Each level of the include graph is read concurrently. Missing files
+    are ignored.
+
+    Arguments
+    ---------
+    filename: str
+        The journal main file location.
+
+    Returns
+    -------
+    list of CachedFile
+        The files in include order. Each file appears only once.
+
+    Raises
+    ------
+    IncludeCycleError
+        If a file includes itself.
+    """
+    root = os.path.abspath(filename)
+
+    # Read the include graph, one level at a time.
+    graph = {}
+    pending = [root]
+
+    while pending:
+
+        if len(pending) == 1:
+            loaded = [load_file(pending[0])]
+        else:
+            with concurrent.futures.ThreadPoolExecutor(MAX_WORKERS) as pool:
+                loaded = list(pool.map(load_file, pending))
+
+        for name, result in zip(pending, loaded):
+            if result is not None:
+                graph[name] = result
+
+        pending = []
+        for cached, includes in [r for r in loaded if r is not None]:
+            for name in includes:
+                if name not in graph and name not in pending:
+                    pending.append(name)
+
+    # Sort the files depth first.
+    ordered = []
+    visited = set()
+
+    def visit(name, stack):
+
+        if name in stack:
+            raise IncludeCycleError('Include cycle: {}'.format(
+                ' -> '.join(stack[stack.index(name):] + [name])))
+
+        if name in visited or name not in graph:
+            return
+        visited.add(name)
+
+        cached, includes = graph[name]
+        ordered.append(cached)
+
+        for included in includes:
+            visit(included, stack + [name])
+
+    visit(root, [])
+
+    ledger_profile.add_items(len(ordered))
+
+    return ordered
+
+
+def clear():
+    """Empties the cache.
+    """
+    CACHED_FILES.clear()
@@ -0,0 +1,366 @@
+"""
+Reads the periodic transactions and computes their occurrences.
+
+A periodic transaction starts with "~" and a period expression, as in
+
+    ~ Monthly from 2020/01/01
+        Expenses:Rent                                   800 EUR
+        Assets:Bank
+
+The supported expressions are "daily", "weekly", "biweekly",
+"monthly", "bimonthly", "quarterly", "yearly" and "every [N]
+day(s)/week(s)/month(s)/quarter(s)/year(s)", followed by an optional
+"from DATE" (or "since") and "to DATE" (or "until"). As in Ledger, the
+end date is excluded. The dates may be partial (2020/01 or 2020).
+
+The occurrences are generated lazily, up to the requested horizon, and
+kept per period, so that a long forecast does not build all the
+projected entries at once.
+
+This module does not depend on Sublime Text.
+
+@author: Etienne Monier <etienne.monier@enseeiht.fr>
+@license: CC-BY-NC-SA
+@since: 2026-10-17
+"""
+
+import bisect
+import calendar
+import collections
+import datetime
+import functools
+
+from . import ledger_balance
+from . import ledger_tokenizer
+from .ledger_model import Balance, PeriodicTransaction, parse_date
+
+
+# A period: every COUNT UNIT (day, week, month or year) from BEGIN
+# (None for the forecast origin) to END (excluded, None for no end).
+Period = collections.namedtuple('Period', ['unit', 'count', 'begin', 'end'])
+
+# The period keywords, with their unit and count.
+PERIOD_KEYWORDS = {
+    'daily': ('day', 1),
+    'weekly': ('week', 1),
+    'biweekly': ('week', 2),
+    'fortnightly': ('week', 2),
+    'monthly': ('month', 1),
+    'bimonthly': ('month', 2),
+    'quarterly': ('month', 3),
+    'yearly': ('year', 1),
+    'annually': ('year', 1),
+}
+
+# The units of "every N ...", with the unit and count of one of them.
+PERIOD_UNITS = {
+    'day': ('day', 1),
+    'week': ('week', 1),
+    'month': ('month', 1),
+    'quarter': ('month', 3),
+    'year': ('year', 1),
+}
+
+
+def parse_period_date(text):
+    """Converts a full (2020/01/15) or partial (2020/01, 2020) date into
+    a datetime.date. A partial date is the first day of the period.
+
+    Returns
+    -------
+    None or datetime.date
+        None if the date is invalid.
+    """
+    parts = text.replace('-', '/').split('/')
+
+    if len(parts) == 3:
+        return parse_date(text)
+
+    try:
+        if len(parts) == 2:
+            return datetime.date(int(parts[0]), int(parts[1]), 1)
+        if len(parts) == 1:
+            return datetime.date(int(parts[0]), 1, 1)
+    except ValueError:
+        pass
+
+    return None
+
+
+@functools.lru_cache(maxsize=256)
+def parse_period(expression):
+    """Parses a period expression.
+
+    Arguments
+    ---------
+    expression: str
+        The period expression, e.g. "every 2 weeks from 2020/01/06".
+
+    Returns
+    -------
+    None or Period
+        None if the expression is not supported.
+    """
+    words = expression.split(';')[0].lower().split()
+
+    if not words:
+        return None
+
+    # The period.
+    if words[0] in PERIOD_KEYWORDS:
+        unit, count = PERIOD_KEYWORDS[words[0]]
+        position = 1
+
+    elif words[0] == 'every':
+        position = 1
+        multiple = 1
+
+        if position < len(words) and words[position].isdigit():
+            multiple = int(words[position])
+            position += 1
+
+        if position == len(words) or multiple == 0:
+            return None
+
+        name = words[position]
+        if name.endswith('s'):
+            name = name[:-1]
+
+        if name not in PERIOD_UNITS:
+            return None
+
+        unit, count = PERIOD_UNITS[name]
+        count *= multiple
+        position += 1
+
+    else:
+        return None
+
+    # The bounds.
+    bounds = {'begin': None, 'end': None}
+
+    while position < len(words):
+
+        if position + 1 == len(words):
+            return None
+
+        keyword, value = words[position], words[position + 1]
+
+        if keyword in ('from', 'since'):
+            bound = 'begin'
+        elif keyword in ('to', 'until'):
+            bound = 'end'
+        else:
+            return None
+
+        bounds[bound] = parse_period_date(value)
+        if bounds[bound] is None:
+            return None
+
+        position += 2
+
+    return Period(unit, count, bounds['begin'], bounds['end'])
+
+
+def add_months(date, months, day):
+    """Returns the date MONTHS months after DATE, on DAY (or the last
+    day of the month if it is shorter).
+    """
+    month_index = date.year * 12 + date.month - 1 + months
+    year, month = divmod(month_index, 12)
+    month += 1
+
+    return datetime.date(
+        year, month, min(day, calendar.monthrange(year, month)[1]))
+
+
+def iter_dates(period, origin):
+    """Yields the dates of a period, lazily.
+
+    Arguments
+    ---------
+    period: Period
+        The period.
+    origin: datetime.date
+        The first date if the period has no beginning.
+
+    Yields
+    ------
+    datetime.date
+    """
+    begin = period.begin or origin
+    index = 0
+
+    while True:
+
+        # Each date is computed from the beginning, so that the month
+        # ends do not shift the following dates.
+        if period.unit == 'day':
+            date = begin + datetime.timedelta(days=index * period.count)
+        elif period.unit == 'week':
+            date = begin + datetime.timedelta(weeks=index * period.count)
+        elif period.unit == 'month':
+            date = add_months(begin, index * period.count, begin.day)
+        else:
+            date = add_months(begin, 12 * index * period.count, begin.day)
+
+        if period.end is not None and date >= period.end:
+            return
+
+        yield date
+        index += 1
+
+
+class Occurrences():
+    """The dates of a period, generated when needed and kept.
+    """
+
+    def __init__(self, period, origin):
+        self.dates = []
+        self.generator = iter_dates(period, origin)
+        self.exhausted = False
+
+    def between(self, start, horizon):
+        """Returns the dates from START to HORIZON, included.
+        """
+        while not self.exhausted and \
+                (not self.dates or self.dates[-1] <= horizon):
+            try:
+                self.dates.append(next(self.generator))
+            except (StopIteration, OverflowError, ValueError):
+                # The period ended or the dates went past year 9999
+                # (OverflowError for the days, ValueError for the months).
+                self.exhausted = True
+
+        return self.dates[bisect.bisect_left(self.dates, start):
+                          bisect.bisect_right(self.dates, horizon)]
+
+
+@functools.lru_cache(maxsize=256)
+def occurrences(period, origin):
+    """Returns the cached Occurrences of a period.
+    """
+    return Occurrences(period, origin)
+
+
+def parse_periodic_transaction(text):
+    """Analyzes a periodic transaction block.
+
+    Arguments
+    ---------
+    text: str
+        The block text.
+
+    Returns
+    -------
+    None or PeriodicTransaction
+        None if the block is not a valid periodic transaction or if its
+        period is not supported.
+    """
+    parsed = ledger_tokenizer.parse_block(text)
+
+    if not parsed.header.startswith('~') or \
+            parse_period(parsed.header[1:].strip()) is None:
+        return None
+
+    try:
+        return PeriodicTransaction(
+            parsed.header[1:].strip(), parsed.new_postings())
+    except (ValueError, IndexError):
+        # The missing amount can not be found.
+        return None
+
+
+def extract_periodic_transactions(blocks):
+    """Finds the periodic transactions of a file.
+
+    Arguments
+    ---------
+    blocks: iterable of ledger_stream.Block
+        The file blocks.
+
+    Returns
+    -------
+    list of PeriodicTransaction
+    """
+    transactions = []
+
+    for block in blocks:
+        if block.kind == 'periodic_transaction':
+            transaction = parse_periodic_transaction(block.text)
+            if transaction is not None:
+                transactions.append(transaction)
+
+    return transactions
+
+
+def projected_entries(transaction, start, horizon):
+    """Yields the entries of the occurrences of a periodic transaction
+    between START and HORIZON, lazily.
+
+    Arguments
+    ---------
+    transaction: PeriodicTransaction
+        The periodic transaction.
+    start: datetime.date
+        The first date of the forecast. The periods without beginning
+        start on this date.
+    horizon: datetime.date
+        The last date of the forecast.
+
+    Yields
+    ------
+    tuple
+        The (date, entries) of each occurrence, the entries being the
+        (date ordinal, account, commodity, number) of each posting with
+        an amount, as ledger_balance.block_entries.
+    """
+    period = parse_period(transaction.period)
+
+    if period is None:
+        return
+
+    postings = [posting for posting in transaction.postings
+                if posting.is_Amount()]
+
+    # The occurrences do not depend on START if the period has a
+    # beginning.
+    origin = None if period.begin else start
+
+    for date in occurrences(period, origin).between(start, horizon):
+        ordinal = date.toordinal()
+        yield date, [
+            (ordinal, ledger_balance.clean_account(posting.account),
+             posting.number.currency, posting.number.number)
+            for posting in postings]
+
+
+def forecast_balance(transactions, account, start, horizon):
+    """Computes the projected balance of an account and its
+    sub-accounts between START and HORIZON.
+
+    Arguments
+    ---------
+    transactions: iterable of PeriodicTransaction
+        The periodic transactions.
+    account: str
+        The account name.
+    start: datetime.date
+        The first date of the forecast.
+    horizon: datetime.date
+        The last date of the forecast.
+
+    Returns
+    -------
+    Balance
+        The sum of the projected amounts.
+    """
+    total = Balance()
+
+    for transaction in transactions:
+        for _, entries in projected_entries(transaction, start, horizon):
+            for _, name, commodity, number in entries:
+                if name == account or name.startswith(account + ':'):
+                    total.add_number(number, commodity)
+
+    return total
@@ -0,0 +1,265 @@
+"""
+Indexes the account and payee names of a journal.
+
+The names declared in the definition file and the ones used in the
+journal transactions are kept sorted for prefix lookup and ranked by
+the number of times they are used.
+
+@author: Etienne Monier <etienne.monier@enseeiht.fr>
+@license: CC-BY-NC-SA
+@since: 2026-10-17
+"""
+
+import bisect
+import collections
+
+from . import ledger_balance
+from . import ledger_tokenizer
+from .ledger_model import parse_date
+
+
+class Usage():
+    """The uses of the accounts and payees in a file.
+
+    Attributes
+    ----------
+    accounts: collections.Counter
+        The number of postings of each account.
+    payees: collections.Counter
+        The number of transactions of each payee.
+    account_dates: dict
+        The dates of the first and last postings of each account, as a
+        list [first, last] of datetime.date.
+    payee_dates: dict
+        The dates of the first and last transactions of each payee.
+    """
+
+    def __init__(self):
+        self.accounts = collections.Counter()
+        self.payees = collections.Counter()
+        self.account_dates = {}
+        self.payee_dates = {}
+
+    def counts(self, search_key):
+        """Returns the counter of a kind of name.
+
+        Arguments
+        ---------
+        search_key: str
+            The kind of name: 'account' or 'payee'.
+        """
+        if search_key == 'account':
+            return self.accounts
+        elif search_key == 'payee':
+            return self.payees
+        else:
+            return collections.Counter()
+
+    def dates(self, search_key):
+        """Returns the first and last use dates of a kind of name. See
+        counts.
+        """
+        if search_key == 'account':
+            return self.account_dates
+        elif search_key == 'payee':
+            return self.payee_dates
+        else:
+            return {}
+
+    def add(self, search_key, name, date):
+        """Records a use of a name.
+
+        Arguments
+        ---------
+        search_key: str
+            The kind of name: 'account' or 'payee'.
+        name: str
+            The name.
+        date: None or datetime.date
+            The date of use.
+        """
+        self.counts(search_key)[name] += 1
+
+        if date is None:
+            return
+
+        dates = self.dates(search_key)
+        if name not in dates:
+            dates[name] = [date, date]
+        elif date < dates[name][0]:
+            dates[name][0] = date
+        elif date > dates[name][1]:
+            dates[name][1] = date
+
+    def __repr__(self):
+        return 'Usage(accounts={}, payees={})'.format(
+            len(self.accounts), len(self.payees))
+
+
+def extract_usage(blocks):
+    """Records the uses of the accounts and payees in the user
+    transactions of a file.
+
+    Arguments
+    ---------
+    blocks: iterable of ledger_stream.Block
+        The file blocks.
+
+    Returns
+    -------
+    Usage
+    """
+    usage = Usage()
+
+    for block in blocks:
+
+        if block.kind != 'user_transaction':
+            continue
+
+        parsed = ledger_tokenizer.parse_block(block.text)
+        if parsed.date is None:
+            continue
+
+        date = parse_date(parsed.date)
+        usage.add('payee', parsed.payee, date)
+
+        # A virtual account is the same name as the real one.
+        for posting in parsed.postings:
+            usage.add('account', ledger_balance.clean_account(
+                posting.account), date)
+
+    return usage
+
+
+class NameIndex():
+    """A sorted list of names with their uses.
+
+    The names are the declared ones and the ones used in transactions.
+
+    Attributes
+    ----------
+    names: list of str
+        The sorted names. A name no longer declared nor used is kept
+        but not listed.
+    declared: set of str
+        The declared names.
+    counts: collections.Counter
+        The number of uses of each name.
+    usages: list of Usage
+        The usages the counts were computed from.
+    """
+
+    def __init__(self, declared=()):
+        """
+        Arguments
+        ---------
+        declared: iterable of str
+            The declared names.
+        """
+        self.declared = set(declared)
+        self.names = sorted(self.declared)
+        self.counts = collections.Counter()
+        self.usages = []
+
+        # The listed names sorted by rank, computed when needed.
+        self.ranked_names = None
+
+    def add_names(self, names):
+        """Inserts names which are not already there.
+        """
+        new_names = set(names).difference(self.names)
+
+        if len(new_names) > 1:
+            self.names = sorted(new_names.union(self.names))
+
+        elif new_names:
+            bisect.insort(self.names, new_names.pop())
+
+        self.ranked_names = None
+
+    def set_declared(self, names):
+        """Replaces the declared names.
+        """
+        self.declared = set(names)
+        self.add_names(self.declared)
+
+    def add_counts(self, counts):
+        """Adds the number of uses of some names.
+
+        Arguments
+        ---------
+        counts: dict
+            The number of uses, by name.
+        """
+        self.counts.update(counts)
+        self.add_names(counts)
+
+    def remove_counts(self, counts):
+        """Removes the number of uses of some names. See add_counts.
+        """
+        self.counts.subtract(counts)
+        self.ranked_names = None
+
+    def is_listed(self, name):
+        """Returns True if the name is declared or used.
+        """
+        return name in self.declared or self.counts[name] > 0
+
+    def uses(self, name, search_key):
+        """Returns the uses of a name.
+
+        Arguments
+        ---------
+        name: str
+            The name.
+        search_key: str
+            The kind of name: 'account' or 'payee'.
+
+        Returns
+        -------
+        tuple
+            The number of uses and the dates of the first and last uses
+            (None if it is not used).
+        """
+        dates = [usage.dates(search_key)[name] for usage in self.usages
+                 if name in usage.dates(search_key)]
+
+        if not dates:
+            return self.counts[name], None, None
+
+        return (self.counts[name],
+                min(first for first, last in dates),
+                max(last for first, last in dates))
+
+    def rank_key(self, name):
+        """The sort key of the names: most used first, then by name.
+        """
+        return (-self.counts[name], name)
+
+    def ranked(self):
+        """Returns all the listed names, most used first.
+        """
+        if self.ranked_names is None:
+            self.ranked_names = sorted(
+                filter(self.is_listed, self.names), key=self.rank_key)
+
+        return self.ranked_names
+
+    def prefix(self, prefix):
+        """Returns the listed names beginning with PREFIX, most used
+        first.
+        """
+        begin = bisect.bisect_left(self.names, prefix)
+        end = begin
+        while end < len(self.names) and self.names[end].startswith(prefix):
+            end += 1
+
+        return sorted(
+            filter(self.is_listed, self.names[begin:end]),
+            key=self.rank_key)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __repr__(self):
+        return 'NameIndex(names={})'.format(len(self.names))
@@ -0,0 +1,173 @@
+"""
+Checks that the user transactions are balanced.
+
+The real postings and the virtual postings in brackets are checked
+separately, the virtual postings in parentheses are not checked. A
+transaction is reported if:
+    - more than one posting has no amount,
+    - a posting has no amount and the other ones use several
+      commodities, so that the missing amount can not be computed,
+    - the postings do not sum to zero in each commodity.
+
+As Ledger does, a transaction between exactly two commodities is
+accepted as an exchange.
+
+This module does not depend on Sublime Text.
+
+@author: Etienne Monier <etienne.monier@enseeiht.fr>
+@license: CC-BY-NC-SA
+@since: 2026-10-17
+"""
+
+import collections
+
+from . import ledger_stream
+from . import ledger_tokenizer
+from .ledger_model import Balance, balance_group
+
+
+# A problem found in a transaction. Its positions are relative to the
+# transaction block beginning.
+Problem = collections.namedtuple('Problem', ['begin', 'end', 'message'])
+
+# The subject of the messages, by posting group (see
+# ledger_model.balance_group).
+SUBJECTS = {
+    'real': 'The transaction is',
+    'virtual': 'The virtual postings are',
+}
+
+
+def check_group(postings, header_end, subject):
+    """Checks a group of postings which should balance. See
+    check_transaction.
+
+    Arguments
+    ---------
+    postings: list of ledger_tokenizer.PostingLine
+        The postings of the group.
+    header_end: int
+        The end of the transaction header.
+    subject: str
+        The group, as the subject of the problem messages.
+
+    Returns
+    -------
+    list of Problem
+    """
+    # The sum of each commodity, and the lines of the postings without
+    # amount.
+    total = Balance()
+    empty_lines = []
+
+    for posting in postings:
+        if posting.number is None:
+            empty_lines.append((posting.begin, posting.end))
+        else:
+            total += posting.number
+
+    if len(empty_lines) > 1:
+        return [Problem(empty_lines[0][0], empty_lines[-1][1],
+                        'More than one posting has no amount.')]
+
+    commodities = total.commodities()
+
+    if empty_lines:
+        if len(commodities) > 1:
+            return [Problem(
+                0, header_end,
+                'The missing amount can not be computed, the commodities '
+                'are mixed: {}.'.format(', '.join(
+                    commodity or 'no currency'
+                    for commodity in commodities)))]
+        return []
+
+    unbalanced = total.amounts()
+
+    # An exchange between two commodities.
+    if len(commodities) == 2 and len(unbalanced) == 2 and \
+            (unbalanced[0].number > 0) != (unbalanced[1].number > 0):
+        return []
+
+    if unbalanced:
+        return [Problem(
+            0, header_end,
+            '{} not balanced: {} left.'.format(subject, total))]
+
+    return []
+
+
+def check_transaction(text):
+    """Checks a user transaction. The real postings and the virtual
+    postings in brackets are checked separately.
+
+    Arguments
+    ---------
+    text: str
+        The transaction block text.
+
+    Returns
+    -------
+    list of Problem
+        The problems found. Their positions are relative to the block.
+    """
+    parsed = ledger_tokenizer.parse_block(text)
+    header_end = len(parsed.header)
+
+    if parsed.date is None:
+        return []
+
+    groups = collections.OrderedDict()
+    for posting in parsed.postings:
+        groups.setdefault(balance_group(posting.account), []).append(
+            posting)
+
+    problems = []
+    for group, postings in groups.items():
+        if group is None:
+            problems += [
+                Problem(posting.begin, posting.end,
+                        'A virtual posting in parentheses has no amount.')
+                for posting in postings if posting.number is None]
+        else:
+            problems += check_group(postings, header_end, SUBJECTS[group])
+
+    return problems
+
+
+class LintTable(ledger_stream.BlockTable):
+    """The problems of the user transactions of a view. See
+    ledger_stream.BlockTable.
+    """
+
+    kinds = ('user_transaction',)
+
+    def compute(self, block):
+        return check_transaction(block.text)
+
+    def update(self, text, is_cancelled=None):
+        """Checks the user transactions of a ledger text.
+
+        Arguments
+        ---------
+        text: str
+            The ledger text, usually a snapshot of the current view.
+        is_cancelled: optional, None or function
+            A function returning True if the check should be stopped.
+
+        Returns
+        -------
+        None or list of Problem
+            None if the check was cancelled. Otherwise, the problems,
+            with positions in the text.
+        """
+        results = ledger_stream.BlockTable.update(self, text, is_cancelled)
+
+        if results is None:
+            return None
+
+        return [Problem(block.begin + problem.begin,
+                        block.begin + problem.end,
+                        problem.message)
+                for block, block_problems in results
+                for problem in block_problems]
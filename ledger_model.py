@@ -0,0 +1,747 @@
+"""
+Defines the ledger objects: amounts, postings and transactions.
+
+This module does not depend on Sublime Text so that it can be used by
+any parser.
+
+See README.md for details.
+
+@author: Etienne Monier <etienne.monier@enseeiht.fr>
+@license: CC-BY-NC-SA
+@since: 2021-01-27
+"""
+
+import datetime
+import decimal
+import re
+import sys
+
+
+def is_numeric(x):
+    """Returns True is x is a number.
+    """
+    return isinstance(x, int) or isinstance(x, float)
+
+
+def homogeneous_type(seq):
+    """Checks if all elements of a list are the same.
+    If that's the case, it returns the common type, else False.
+    """
+    first_type = type(seq[0])
+    return first_type if all([type(x) is first_type for x in seq]) else False
+
+
+def parse_date(date):
+    """Converts a ledger date into a datetime.date.
+
+    Available dates for the moment: DD/MM/YYYY, DD-MM-YYYY, YYYY/MM/DD,
+    YYYY-MM-DD.
+
+    Arguments
+    ---------
+    date: str
+        The date.
+
+    Returns
+    -------
+    None or datetime.date
+        None if the date is invalid.
+    """
+    parts = date.replace('-', '/').split('/')
+
+    if len(parts) != 3:
+        return None
+
+    if len(parts[0]) != 4:
+        # The year is last.
+        parts.reverse()
+
+    try:
+        return datetime.date(int(parts[0]), int(parts[1]), int(parts[2]))
+    except ValueError:
+        return None
+
+
+def align_dot(account, number=None, dot_pos=58, html=False):
+    r"""Constructs a string of the form '    account     10.52 EUR' where
+    the dot is located at position dot_pos.
+
+    Arguments
+    ---------
+    account: str
+        The account name
+    number: int, float or Amount
+        The number.
+    dot_pos: int
+        The dot position in the line.
+        Default: 58
+    html: bool
+        If this flag is True, all whitespaces are replaces by \u00A0 to
+        keep multiple spaces in tooltip.
+    """
+    string = ' '*4 + account
+
+    if number is None:
+        output = string
+
+    else:
+        number_str = str(number)
+
+        # Get the number of spaces to add or remove
+        m = re.match(r'([-$£¥€¢\d,_]+)(?:.\d*)?.*', number_str)
+
+        if not m:
+            num_spaces = 0
+        else:
+            num_spaces = dot_pos - len(string) - len(m.group(1))
+
+        # if num_spaces > 0, this means there is a lots of spaces to add.
+        # Otherwise, it means the account is too long or the number of
+        # digits before dot is too high. In this case, a hard separator
+        # is required.
+        if num_spaces > 0:
+            output = string + ' ' * num_spaces + number_str
+        else:
+            output = string + '  ' + number_str
+
+    if html:
+        output = output.replace(' ', '\u00A0')
+
+    return output
+
+
+# The currency types, by currency. See Amount.
+CURRENCY_TYPES = {}
+
+
+def currency_type(currency):
+    """Returns the interned currency and its type.
+
+    The currency type is 0 for symbol (e.g. €), 1 for name (e.g. EUR)
+    and 2 for long name (e.g. "A long name").
+    """
+    try:
+        return CURRENCY_TYPES[currency]
+
+    except KeyError:
+        if currency in ['$', '£', '¥', '€', '¢']:
+            type_ = 0
+        elif '"' in currency:
+            type_ = 2
+        else:
+            type_ = 1
+
+        CURRENCY_TYPES[currency] = (sys.intern(currency), type_)
+        return CURRENCY_TYPES[currency]
+
+
+def to_decimal(number):
+    """Converts a number to an exact decimal number.
+
+    Arguments
+    ---------
+    number: int, float, decimal.Decimal or str
+        The number. A float is converted from its shortest
+        representation, e.g. 0.1 gives Decimal('0.1').
+    """
+    if isinstance(number, decimal.Decimal):
+        return number
+
+    if isinstance(number, float):
+        return decimal.Decimal(repr(number))
+
+    return decimal.Decimal(number)
+
+
+def decimal_places(number):
+    """Returns the number of decimals of a decimal number, trailing zeros
+    included (e.g. 2 for 10.50).
+    """
+    return max(0, -number.as_tuple().exponent)
+
+
+class Amount():
+    """Defines an amount with a currency.
+
+    The amount is stored as an exact decimal number, with as many
+    decimals as written (e.g. 10.125 AAPL or 0.00012 BTC), so that sums
+    are exact and nothing is rounded.
+
+    Attributes
+    ----------
+    number: decimal.Decimal
+        The amount.
+    currency: str
+        The currency
+    type: int
+        The currency type.
+        0 for symbol (e.g. €),
+        1 for name (e.g. EUR),
+        2 for long name (e.g. "A long name").
+    """
+
+    __slots__ = ('number', 'currency', 'type')
+
+    def __init__(self, number, currency):
+        """Amount constructor
+
+        Arguments
+        ---------
+        number: int, float, decimal.Decimal or str
+            The amount
+        currency: str
+            The currency
+        """
+        self.number = to_decimal(number)
+        self.currency, self.type = currency_type(currency)
+
+    def check_currency(self, other, operation):
+        """Raises an error if OTHER is not an amount with the same
+        currency.
+        """
+        if not isinstance(other, Amount):
+            # Invalid type
+            raise ValueError(
+                '{} an amount with type {} is incorect.'.format(
+                    operation, type(other)))
+
+        # Check if the two currencies are the same
+        if self.currency != other.currency:
+            raise Exception('Two amounts can be combined only if the '
+                            'currencies are the same.')
+
+    def __add__(self, other):
+        """Function to add two amounts.
+
+        Arguments
+        ---------
+        other: Amount
+            The other amount.
+
+        Returns
+        -------
+        Amount
+            The sum of self and other.
+        """
+        self.check_currency(other, 'Adding')
+        return Amount(self.number + other.number, self.currency)
+
+    def __sub__(self, other):
+        """Function to substract two amounts.
+
+        Arguments
+        ---------
+        other: Amount
+            The other amount.
+
+        Returns
+        -------
+        Amount
+            The substraction of self by other.
+        """
+        self.check_currency(other, 'Substracting')
+        return Amount(self.number - other.number, self.currency)
+
+    def __neg__(self):
+        return Amount(-self.number, self.currency)
+
+    def __mul__(self, other):
+        """Function to multiply an amounts by a number.
+
+        Arguments
+        ---------
+        other: int, float or decimal.Decimal
+            The multiplier.
+
+        Returns
+        -------
+        Amount
+            The multiplication of self by other. It is exact, a float
+            multiplier is taken as written (see to_decimal).
+        """
+        if isinstance(other, (int, float, decimal.Decimal)):
+            return Amount(self.number * to_decimal(other), self.currency)
+
+        else:
+            # Invalid type
+            raise ValueError(
+                'Multiplying an amount with type {} is incorect.'.format(
+                    type(other)))
+
+    def __radd__(self, other):
+        """This is the same as __add__, but is called when "a + self" is
+        computed with "a" not being an Amount.
+
+        If "a" does not support a.__add__(self) as adding Amount to "a"
+        is not supported, then self.__radd(a) is called.
+
+        This is important to compute sum([list of Amount]) as it calls
+        (0 + Amount1) + Amount2 ...
+        If 0 + Amount1 is not defined, it returns an error.
+        """
+        if other == 0:
+            return self
+        else:
+            return self.__add__(other)
+
+    def __rmul__(self, other):
+        """Same as for __radd__.
+        This aims at defining 5 * Amount.
+        """
+        if other == 1:
+            return self
+        else:
+            return self.__mul__(other)
+
+    def __eq__(self, other):
+        return isinstance(other, Amount) and \
+            self.number == other.number and self.currency == other.currency
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return hash((self.number, self.currency))
+
+    def number_str(self):
+        """Returns the amount number as a string. The decimals are only
+        written if the amount is not a whole number, with at least two
+        decimals (e.g. 10, 10.50 or 10.125).
+        """
+        number = self.number
+
+        if number == number.to_integral_value():
+            return str(int(number))
+
+        places = max(2, decimal_places(number.normalize()))
+        return '{:.{}f}'.format(number, places)
+
+    def __str__(self):
+        if self.type == 0:
+            return self.currency + self.number_str()
+        else:
+            return self.number_str() + ' ' + self.currency
+
+    def __repr__(self):
+        return 'Amount(number={}, currency={})'.format(
+            self.number_str(), self.currency)
+
+
+class Balance():
+    """Sums amounts of several commodities.
+
+    Each commodity has its own total, an exact decimal number, so that
+    amounts of different commodities can be summed without
+    error and without building intermediate amounts, as in
+
+        total = Balance()
+        for posting in postings:
+            total += posting.number
+
+    The numbers without currency are summed as the commodity ''.
+
+    Attributes
+    ----------
+    totals: dict
+        The total of each commodity, as a decimal.Decimal or an int.
+    """
+
+    __slots__ = ('totals',)
+
+    def __init__(self, numbers=()):
+        """
+        Arguments
+        ---------
+        numbers: optional, iterable of Amount, Balance or numbers
+            The initial amounts.
+        """
+        self.totals = {}
+
+        for number in numbers:
+            self.add(number)
+
+    def add_number(self, number, commodity):
+        """Adds a number (decimal.Decimal or int) of a commodity.
+        """
+        self.totals[commodity] = self.totals.get(commodity, 0) + number
+
+    def add(self, number, sign=1):
+        """Adds (sign=1) or substracts (sign=-1) an amount, a balance or
+        a number without currency, in place.
+        """
+        if isinstance(number, Amount):
+            self.add_number(sign * number.number, number.currency)
+
+        elif isinstance(number, Balance):
+            for commodity, total in number.totals.items():
+                self.add_number(sign * total, commodity)
+
+        elif is_numeric(number) or isinstance(number, decimal.Decimal):
+            self.add_number(sign * to_decimal(number), '')
+
+        else:
+            # Invalid type
+            raise ValueError(
+                'Adding a number with type {} to a balance is '
+                'incorect.'.format(type(number)))
+
+    def __iadd__(self, other):
+        self.add(other)
+        return self
+
+    def __isub__(self, other):
+        self.add(other, -1)
+        return self
+
+    def __neg__(self):
+        result = Balance()
+        result.add(self, -1)
+        return result
+
+    def get(self, commodity):
+        """Returns the total of a commodity.
+        """
+        return self.totals.get(commodity, 0)
+
+    def commodities(self):
+        """Returns the sorted commodities added so far, even if their
+        total is zero.
+        """
+        return sorted(self.totals)
+
+    def amounts(self):
+        """Returns the non-zero totals as amounts, sorted by commodity.
+        """
+        return [Amount(self.totals[commodity], commodity)
+                for commodity in self.commodities()
+                if self.totals[commodity]]
+
+    def is_zero(self):
+        """Returns True if all the totals are zero.
+        """
+        return not any(self.totals.values())
+
+    def __bool__(self):
+        return not self.is_zero()
+
+    def __eq__(self, other):
+        return isinstance(other, Balance) and \
+            self.amounts() == other.amounts()
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    __hash__ = None
+
+    def __str__(self):
+        amounts = self.amounts()
+
+        if not amounts:
+            return '0'
+
+        return ', '.join(
+            amount.number_str() if not amount.currency else str(amount)
+            for amount in amounts)
+
+    def __repr__(self):
+        return 'Balance({})'.format(self)
+
+
+class Posting():
+    """A posting is composed of an account and an amount or a coefficient.
+    That's the basic element of a transaction.
+    """
+
+    def __init__(self, account, number=None):
+
+        self.account = account
+        self.number = number
+
+    def is_empty(self):
+        """Returns True is the posting number is empty.
+        """
+        return self.number is None
+
+    def is_Amount(self):
+        """Returns True is the posting number is an Amount object.
+        """
+        return isinstance(self.number, Amount)
+
+    def update_number(self, number):
+        """Updates the number to number.
+        """
+        self.number = number
+
+    def __str__(self):
+        return align_dot(self.account, self.number)
+
+    def __repr__(self):
+        return 'Posting(account={}, number={})'.format(
+            self.account, self.number)
+
+
+def balance_group(account):
+    """Returns the group of postings which should balance with a posting
+    to ACCOUNT, as Ledger does:
+        - 'real' for a real account,
+        - 'virtual' for a virtual account in brackets, e.g. [Budget],
+        - None for a virtual account in parentheses, e.g. (Budget),
+          which does not need to balance.
+    """
+    if len(account) > 1:
+        if account[0] == '[' and account[-1] == ']':
+            return 'virtual'
+        if account[0] == '(' and account[-1] == ')':
+            return None
+
+    return 'real'
+
+
+class Transaction():
+
+    def __init__(self, postings):
+
+        self.postings = self.fill_in_empty_amount(postings)
+
+    def fill_in_empty_amount(self, postings_list):
+
+        # The real postings and the virtual postings in brackets are
+        # balanced separately. The postings in parentheses are not.
+        groups = {}
+        for post in postings_list:
+            groups.setdefault(balance_group(post.account), []).append(post)
+
+        for group, group_postings in groups.items():
+
+            # The postings which do not have an amount nor number.
+            empty_postings = [
+                post for post in group_postings if post.is_empty()]
+
+            if not empty_postings:
+                continue
+
+            if group is None:
+                raise ValueError(
+                    'A virtual posting in parentheses has no amount.')
+
+            if len(empty_postings) > 1:
+                raise ValueError(
+                    'More than one posting do not have an amount.')
+
+            # The missing amount should be found from the available
+            # amounts of the group.
+            amounts = [
+                post.number for post in group_postings
+                if not post.is_empty()]
+
+            if not amounts:
+                raise ValueError('The missing amount can not be computed.')
+
+            # Check all types are coherent
+            if not homogeneous_type(amounts):
+                raise ValueError('Postings have incoherent type.')
+
+            if is_numeric(amounts[0]):
+                # The amounts are multipliers
+                result = 0 - sum(amounts)
+            else:
+                # The amount ARE amounts. They are summed by commodity.
+                total = Balance(amounts)
+                commodities = total.commodities()
+
+                if len(commodities) > 1:
+                    raise ValueError(
+                        'The missing amount can not be computed from '
+                        'several commodities.')
+
+                result = Amount(-total.get(commodities[0]), commodities[0])
+
+            # Change the missing number.
+            empty_postings[0].update_number(result)
+
+        return postings_list
+
+    def __str__(self):
+
+        string = ''
+        for post in self.postings:
+            string += str(post) + '\n'
+
+        return string[:-1]
+
+
+class UserTransaction(Transaction):
+    """
+    Attributes
+    ----------
+    date: str
+        The transaction date.
+    payee: str
+        The payee.
+    postings: list of tuple
+        The transaction operations.
+    postings_regions: optional, None or list of sublime.Region
+        The regions associated to the postings in the current view.
+    """
+
+    def __init__(self, date, payee, postings, postings_regions=None):
+        """
+        Arguments
+        ---------
+        date: str
+            The transaction date.
+        payee: str
+            The payee.
+        postings: list of tuple
+            The transaction operations.
+        """
+        Transaction.__init__(self, postings)
+        self.date = date
+        self.payee = payee
+        self.postings_regions = postings_regions
+
+    def __str__(self):
+        string = 'User transaction on {} to {}\n'.format(
+            self.date, self.payee)
+
+        return string + Transaction.__str__(self)
+
+    def __repr__(self):
+        return 'UserTransaction(date={}, payee={}, postings={})'.format(
+            self.date, self.payee, self.postings)
+
+
+class PeriodicTransaction(Transaction):
+    """
+    Attributes
+    ----------
+    period: str
+        The period expression (e.g. "Monthly from 2020/01/01").
+    postings: list of Posting
+        The transaction operations.
+    postings_regions: optional, None or list of sublime.Region
+        The regions associated to the postings in the current view.
+    """
+
+    def __init__(self, period, postings, postings_regions=None):
+        """
+        Arguments
+        ---------
+        period: str
+            The period expression.
+        postings: list of Posting
+            The operations repeated at each period.
+        """
+        Transaction.__init__(self, postings)
+        self.period = period
+        self.postings_regions = postings_regions
+
+    def __str__(self):
+        string = 'Periodic transaction {}\n'.format(self.period)
+
+        return string + Transaction.__str__(self)
+
+    def __repr__(self):
+        return 'PeriodicTransaction(period={}, postings={})'.format(
+            self.period, self.postings)
+
+
+class AutomaticTransaction(Transaction):
+
+    def __init__(self, regex, postings):
+        """
+        Arguments
+        ---------
+        regex: str
+            The regular expression to match.
+        postings: list of Posting
+            The operations to apply when the regular expression is met.
+        """
+        Transaction.__init__(self, postings)
+        self.regex = regex
+
+    def catches_posting(self, posting):
+        """Returns True is the posting is catched by the automatic
+        transaction.
+        """
+        if re.search(self.regex, posting.account):
+            return True
+        else:
+            return False
+
+    def __str__(self):
+        string = 'Automatic transaction /{}/\n'.format(
+            self.regex)
+
+        return string + Transaction.__str__(self)
+
+    def __repr__(self):
+        return 'AutomaticTransaction(regex={}, postings={})'.format(
+            self.regex, self.postings)
+
+
+class AutomaticTransactionMatcher():
+    """Finds the automatic transactions which catch an account.
+
+    The regular expressions are compiled once and the result is stored
+    for each account so that each distinct account is only tested once.
+
+    Attributes
+    ----------
+    autom_trans_list: list of AutomaticTransaction
+        The automatic transactions.
+    filenames: list of None or str
+        The file defining each automatic transaction, if known.
+    """
+
+    def __init__(self, autom_trans_list, filenames=None):
+        """
+        Arguments
+        ---------
+        autom_trans_list: list of AutomaticTransaction
+            The automatic transactions.
+        filenames: optional, None or list of str
+            The file defining each automatic transaction.
+        """
+        self.autom_trans_list = list(autom_trans_list)
+
+        if filenames is None:
+            filenames = [None] * len(self.autom_trans_list)
+        self.filenames = list(filenames)
+
+        self.patterns = [
+            re.compile(autom_trans.regex)
+            for autom_trans in self.autom_trans_list]
+
+        # The indexes of the matching automatic transactions, by
+        # account.
+        self.memo = {}
+
+    def matches(self, account):
+        """Returns the indexes of the automatic transactions which catch
+        the account.
+
+        Arguments
+        ---------
+        account: str
+            The account name.
+
+        Returns
+        -------
+        tuple of int
+            The indexes in autom_trans_list.
+        """
+        try:
+            return self.memo[account]
+
+        except KeyError:
+            indexes = tuple(
+                index for index, pattern in enumerate(self.patterns)
+                if pattern.search(account))
+
+            self.memo[account] = indexes
+            return indexes
+
+    def __repr__(self):
+        return 'AutomaticTransactionMatcher(autom_trans_list={})'.format(
+            self.autom_trans_list)
@@ -0,0 +1,225 @@
+"""
+Measures the time spent in the commands and event listeners.
+
+When profiling is enabled, each call of a profiled function records its
+wall time, the size of the view it works on and the number of items it
+handled (transactions, postings, ...) in a ring buffer per function.
+A call over the time budget is reported in the console.
+
+This module does not depend on Sublime Text.
+
+@author: Etienne Monier <etienne.monier@enseeiht.fr>
+@license: CC-BY-NC-SA
+@since: 2026-10-17
+"""
+
+import collections
+import functools
+import math
+import threading
+import time
+
+
+# Profiling status. When disabled, the profiled functions are called
+# directly.
+ENABLED = False
+
+# The time budget of a call, in ms.
+BUDGET_MS = 100
+
+# The number of calls kept per function.
+BUFFER_SIZE = 500
+
+# The last calls, by function name.
+RECORDS = {}
+
+# The calls are recorded from the main and the worker threads.
+RECORDS_LOCK = threading.Lock()
+
+# The [items, size] counters of the calls in progress, per thread.
+CURRENT_CALLS = threading.local()
+
+# A recorded call.
+Record = collections.namedtuple('Record', ['seconds', 'size', 'items'])
+
+
+def configure(enabled, budget_ms=100, buffer_size=500):
+    """Sets the profiling options. The recorded calls are kept unless
+    the buffer size changes.
+    """
+    global ENABLED, BUDGET_MS, BUFFER_SIZE
+
+    ENABLED = enabled
+    BUDGET_MS = budget_ms
+
+    if buffer_size != BUFFER_SIZE:
+        BUFFER_SIZE = buffer_size
+        with RECORDS_LOCK:
+            for name in RECORDS:
+                RECORDS[name] = collections.deque(
+                    RECORDS[name], maxlen=buffer_size)
+
+
+def record(name, seconds, size=None, items=None):
+    """Records a call.
+
+    Arguments
+    ---------
+    name: str
+        The function name.
+    seconds: float
+        The call wall time.
+    size: optional, None or int
+        The size of the view, in characters.
+    items: optional, None or int
+        The number of items handled.
+    """
+    with RECORDS_LOCK:
+        if name not in RECORDS:
+            RECORDS[name] = collections.deque(maxlen=BUFFER_SIZE)
+        RECORDS[name].append(Record(seconds, size, items))
+
+    if seconds * 1000 > BUDGET_MS:
+        print('LedgerTools: {} took {:.1f} ms (budget: {} ms, size: {}, '
+              'items: {}).'.format(
+                  name, seconds * 1000, BUDGET_MS,
+                  '-' if size is None else size,
+                  '-' if items is None else items))
+
+
+def add_items(count):
+    """Adds COUNT items to the profiled calls in progress in the current
+    thread.
+    """
+    if not ENABLED:
+        return
+
+    for counter in getattr(CURRENT_CALLS, 'counters', ()):
+        counter[0] = (counter[0] or 0) + count
+
+
+def set_size(size):
+    """Sets the size of the text handled by the innermost profiled call
+    in progress in the current thread, when it has no view (e.g. in the
+    worker thread).
+    """
+    if not ENABLED:
+        return
+
+    counters = getattr(CURRENT_CALLS, 'counters', None)
+    if counters:
+        counters[-1][1] = size
+
+
+def view_size(args):
+    """Finds the size of the view a function works on: the first
+    argument view attribute (commands, view event listeners) or the
+    second argument (event listeners).
+    """
+    candidates = []
+    if args:
+        candidates.append(getattr(args[0], 'view', None))
+    if len(args) > 1:
+        candidates.append(args[1])
+
+    for candidate in candidates:
+        try:
+            return candidate.size()
+        except Exception:
+            pass
+
+    return None
+
+
+def profiled(name):
+    """Decorates a function so that its calls are recorded under NAME
+    when profiling is enabled.
+    """
+    def decorate(function):
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+
+            if not ENABLED:
+                return function(*args, **kwargs)
+
+            # The items and the size of the call.
+            counter = [None, None]
+            counters = getattr(CURRENT_CALLS, 'counters', None)
+            if counters is None:
+                counters = CURRENT_CALLS.counters = []
+            counters.append(counter)
+
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                seconds = time.perf_counter() - start
+                counters.pop()
+                size = counter[1]
+                if size is None:
+                    size = view_size(args)
+                record(name, seconds, size, counter[0])
+
+        return wrapper
+
+    return decorate
+
+
+def percentile(values, fraction):
+    """Returns the nearest-rank percentile of sorted VALUES.
+    """
+    index = int(math.ceil(fraction * len(values))) - 1
+    return values[max(0, min(len(values) - 1, index))]
+
+
+def statistics():
+    """Computes the statistics of the recorded calls.
+
+    Returns
+    -------
+    list of tuple
+        The (name, calls, p50 ms, p95 ms, max ms, max size, max items)
+        of each function, sorted by name. The sizes and items are None
+        if unknown.
+    """
+    with RECORDS_LOCK:
+        records = dict((name, list(calls)) for name, calls in RECORDS.items())
+
+    result = []
+    for name in sorted(records):
+        calls = records[name]
+        times = sorted(call.seconds * 1000 for call in calls)
+        sizes = [call.size for call in calls if call.size is not None]
+        items = [call.items for call in calls if call.items is not None]
+
+        result.append((
+            name, len(calls), percentile(times, 0.5),
+            percentile(times, 0.95), times[-1],
+            max(sizes) if sizes else None, max(items) if items else None))
+
+    return result
+
+
+def format_statistics():
+    """Formats the statistics of the recorded calls as a table.
+    """
+    lines = ['{:<40} {:>6} {:>9} {:>9} {:>9} {:>10} {:>9}'.format(
+        'function', 'calls', 'p50 (ms)', 'p95 (ms)', 'max (ms)', 'max size',
+        'max items')]
+
+    for name, calls, p50, p95, maximum, size, items in statistics():
+        lines.append(
+            '{:<40} {:>6} {:>9.1f} {:>9.1f} {:>9.1f} {:>10} {:>9}'.format(
+                name, calls, p50, p95, maximum,
+                '-' if size is None else size,
+                '-' if items is None else items))
+
+    return '\n'.join(lines)
+
+
+def clear():
+    """Forgets the recorded calls.
+    """
+    with RECORDS_LOCK:
+        RECORDS.clear()
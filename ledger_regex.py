@@ -7,6 +7,16 @@ Defines all patterns to find transactions and relevant information.
 """
 # flake8: noqa: E501
 
+# Pattern to catch an account or a payee name.
+#
+# A name can not contain comment characters, tabs or several consecutive
+# spaces, and it does not end with a space. Each space is followed by a
+# non-space character, so a name can be split in only one way: the
+# matching time is linear in the line length, even when the rest of the
+# pattern fails (e.g. on long pasted lines without separator). The hard
+# separator is two spaces or a tab, which a name can not contain either.
+name = r"[^;#\%\|\*\n\t\ ]+(?:\ [^;#\%\|\*\n\t\ ]+)*"
+
 # Pattern to catch automatic transactions.
 #
 # It catches the following groups:
@@ -15,8 +25,8 @@ Defines all patterns to find transactions and relevant information.
 pattern_autom = r"""
     (?<=\n)=\ /([^/]+)/[ \t]*\n  # REGEX definition
     ((?:\ [ \t]*
-        (?:[^;#\%\|\*\n\t ]|(?<!\ )\ )+[^;#\%\|\*\n\t ]  # ACCOUNT
-        (?:[ {2}\t][ \t]*                              # HARD SEP
+        """ + name + r"""                                 # ACCOUNT
+        (?:(?:\ {2}|\t)[ \t]*                           # HARD SEP
             [$£¥€¢]?                                   # CURRENCY SYMB
             -?\d+(?:,\d{3})*(?:\.\d{1,2})?             # NUMBER
             (?:\ [A-Za-z]+)?                           # CURRENCY NAME
@@ -35,8 +45,8 @@ pattern_autom = r"""
 #     5. The long currency name
 posting_pattern = r"""
     ^\ [ \t]*
-    ((?:[^;#\%\|\*\n\t ]|(?<!\ )\ )+[^;#\%\|\*\n\t ])# ACCOUNT
-    (?:[ {2}\t][ \t]*                              # HARD SEP
+    (""" + name + r""")                                # ACCOUNT
+    (?:(?:\ {2}|\t)[ \t]*                           # HARD SEP
         ([$£¥€¢]?)                                 # CURRENCY SYMB
         (-?\d+(?:,\d{3})*(?:\.\d{1,2})?)           # NUMBER
         ((?:\ [A-Za-z]+)?)                         # CURRENCY NAME
@@ -59,6 +69,12 @@ trans_date_line = r"""
     (?:=(?:\d{2}[/-]\d{2}[/-]\d{4}) | (?:\d{4}[/-]\d{2}[/-]\d{2}))? # AUX DATE
     [ \t]+                                                          # SEP
     (?:[!\*][ \t]+)?                                                 # STATE
-    ((?:[^;#\%\|\*\n\t ]|(?<!\ )\ )+[^;#\%\|\*\n\t ])                # PAYEE
+    (""" + name + r""")                                             # PAYEE
     .*$                                                 # Commentary and co.
 """
+
+# Pattern to catch an include directive.
+#
+# It catches the following groups:
+#     1. The included file name
+include_line = r"^include[ \t]+(.*[^ \t\n])[ \t]*$"
@@ -0,0 +1,471 @@
+"""
+Computes balance, register and monthly reports over a journal.
+
+The postings are stored by column in arrays: date ordinals, months,
+transaction numbers and interned payee, account and commodity ids, and
+amounts in units of the commodity scale. A report first selects the
+rows, then goes through the few columns it needs only.
+
+NumPy is not available in Sublime Text's Python, so the columns are
+standard library arrays. This module does not depend on Sublime Text.
+
+@author: Etienne Monier <etienne.monier@enseeiht.fr>
+@license: CC-BY-NC-SA
+@since: 2026-10-17
+"""
+
+import array
+import datetime
+import decimal
+import itertools
+import re
+
+from . import ledger_balance
+from .ledger_model import Amount, Balance, decimal_places, parse_date
+
+
+class PostingTable():
+    """The postings of a journal, by column.
+
+    Attributes
+    ----------
+    dates: array of int
+        The date ordinal of each posting.
+    months: array of int
+        The month of each posting, as year * 12 + month - 1.
+    transactions: array of int
+        The number of the transaction of each posting.
+    payees, accounts, commodities: array of int
+        The payee, account and commodity id of each posting.
+    units: array of int
+        The amount of each posting, as an integer number of units of its
+        commodity scale.
+    payee_names, account_names, commodity_names: list of str
+        The names, by id.
+    commodity_scales: list of int
+        The number of decimals of each commodity, by id: the largest
+        number of decimals of its amounts. An amount of 10.125 AAPL is
+        stored as 10125 units if the scale of AAPL is 3.
+    """
+
+    COLUMNS = ('dates', 'months', 'transactions', 'payees', 'accounts',
+               'commodities', 'units')
+
+    NAMES = ('payee_names', 'account_names', 'commodity_names')
+
+    def __init__(self):
+
+        # The amounts may exceed 32 bits, not the other columns.
+        for column in self.COLUMNS:
+            setattr(self, column,
+                    array.array('q' if column == 'units' else 'i'))
+
+        for names in self.NAMES:
+            setattr(self, names, [])
+
+        self.commodity_scales = []
+
+        # The id of each name, for each kind of name.
+        self.ids = dict((names, {}) for names in self.NAMES)
+
+        self.transaction_count = 0
+
+    def intern(self, names, name):
+        """Returns the id of a name, NAMES being the kind of name (e.g.
+        'account_names').
+        """
+        ids = self.ids[names]
+
+        try:
+            return ids[name]
+        except KeyError:
+            ids[name] = len(ids)
+            getattr(self, names).append(name)
+
+            if names == 'commodity_names':
+                self.commodity_scales.append(0)
+
+            return ids[name]
+
+    def set_scale(self, commodity, places):
+        """Makes the scale of a commodity id at least PLACES decimals.
+        The amounts already stored are converted. The scale of a
+        commodity only grows, so this is done a few times at most.
+        """
+        scale = self.commodity_scales[commodity]
+
+        if places <= scale:
+            return
+
+        factor = 10 ** (places - scale)
+        units = self.units
+        for row, row_commodity in enumerate(self.commodities):
+            if row_commodity == commodity:
+                units[row] *= factor
+
+        self.commodity_scales[commodity] = places
+
+    def number(self, units, commodity):
+        """Converts a number of units of a commodity id to a decimal
+        number.
+        """
+        return decimal.Decimal(units).scaleb(
+            -self.commodity_scales[commodity])
+
+    def add_transaction(self, transaction):
+        """Adds the postings of a user transaction. Its date should be a
+        datetime.date. The postings without currency are ignored.
+        """
+        date = transaction.date
+        ordinal = date.toordinal()
+        month = date.year * 12 + date.month - 1
+        payee = self.intern('payee_names', transaction.payee)
+
+        for posting in transaction.postings:
+
+            if not posting.is_Amount():
+                continue
+
+            self.dates.append(ordinal)
+            self.months.append(month)
+            self.transactions.append(self.transaction_count)
+            self.payees.append(payee)
+            self.accounts.append(self.intern(
+                'account_names',
+                ledger_balance.clean_account(posting.account)))
+            commodity = self.intern(
+                'commodity_names', posting.number.currency)
+            number = posting.number.number
+            self.set_scale(commodity, decimal_places(number))
+
+            self.commodities.append(commodity)
+            self.units.append(int(number.scaleb(
+                self.commodity_scales[commodity])))
+
+        self.transaction_count += 1
+
+    def extend(self, other):
+        """Appends the postings of another table.
+        """
+        # The other table ids, in this table.
+        mappings = dict(
+            (names, [self.intern(names, name)
+                     for name in getattr(other, names)])
+            for names in self.NAMES)
+
+        # The other table units, converted to the scales of this table.
+        factors = []
+        for commodity, scale in zip(mappings['commodity_names'],
+                                    other.commodity_scales):
+            self.set_scale(commodity, scale)
+            factors.append(10 ** (self.commodity_scales[commodity] - scale))
+
+        self.dates.extend(other.dates)
+        self.months.extend(other.months)
+        self.transactions.extend(
+            number + self.transaction_count for number in other.transactions)
+
+        for column, names in zip(('payees', 'accounts', 'commodities'),
+                                 self.NAMES):
+            mapping = mappings[names]
+            getattr(self, column).extend(
+                mapping[i] for i in getattr(other, column))
+
+        self.units.extend(
+            units * factors[commodity]
+            for units, commodity in zip(other.units, other.commodities))
+        self.transaction_count += other.transaction_count
+
+    def __len__(self):
+        return len(self.dates)
+
+
+def extract_table(blocks):
+    """Builds the posting table of the user transactions of a file.
+
+    Arguments
+    ---------
+    blocks: iterable of ledger_stream.Block
+        The file blocks.
+
+    Returns
+    -------
+    PostingTable
+    """
+    table = PostingTable()
+
+    for block in blocks:
+        if block.kind == 'user_transaction':
+            transaction = ledger_balance.parse_transaction(block)
+            if transaction is not None:
+                table.add_transaction(transaction)
+
+    return table
+
+
+def merge_tables(tables):
+    """Merges the posting tables of several files, in order.
+    """
+    table = PostingTable()
+
+    for other in tables:
+        table.extend(other)
+
+    return table
+
+
+def select(table, pattern=None, begin=None, end=None):
+    """Selects postings.
+
+    Arguments
+    ---------
+    table: PostingTable
+        The postings.
+    pattern: optional, None or str
+        A regular expression the account names should contain.
+    begin, end: optional, None or datetime.date
+        The first and last dates of the postings.
+
+    Returns
+    -------
+    list of int
+        The selected rows, in table order.
+    """
+    rows = range(len(table))
+
+    if pattern:
+        # The pattern is only matched against the distinct accounts.
+        regex = re.compile(pattern)
+        ids = set(i for i, name in enumerate(table.account_names)
+                  if regex.search(name))
+        rows = itertools.compress(
+            rows, [account in ids for account in table.accounts])
+
+    if begin is not None or end is not None:
+        first = begin.toordinal() if begin is not None else 0
+        last = end.toordinal() if end is not None else \
+            datetime.date.max.toordinal()
+        # The rows may already be filtered by account.
+        dates = table.dates
+        rows = (row for row in rows if first <= dates[row] <= last)
+
+    return list(rows)
+
+
+def parse_query(query):
+    """Parses a report query such as
+
+        Expenses from:2020/01/01 to:2020/12/31 depth:2
+
+    The words without prefix form the account regular expression.
+
+    Arguments
+    ---------
+    query: str
+        The query.
+
+    Returns
+    -------
+    dict
+        The pattern, begin, end and depth of the query.
+
+    Raises
+    ------
+    ValueError
+        If a date or the depth is invalid.
+    """
+    options = {'pattern': None, 'begin': None, 'end': None, 'depth': None}
+    words = []
+
+    for word in query.split():
+
+        prefix, _, value = word.partition(':')
+
+        if prefix in ('from', 'to') and value:
+            date = parse_date(value)
+            if date is None:
+                raise ValueError('Invalid date {}.'.format(value))
+            options['begin' if prefix == 'from' else 'end'] = date
+
+        elif prefix == 'depth' and value:
+            if not value.isdigit():
+                raise ValueError('Invalid depth {}.'.format(value))
+            options['depth'] = int(value)
+
+        else:
+            words.append(word)
+
+    if words:
+        options['pattern'] = ' '.join(words)
+
+    return options
+
+
+def account_names(table, depth=None):
+    """Returns the account names by id, truncated to DEPTH levels.
+    """
+    if not depth:
+        return table.account_names
+
+    return [':'.join(name.split(':')[:depth])
+            for name in table.account_names]
+
+
+def balance_report(table, rows, depth=None):
+    """Computes the balance of each account.
+
+    Arguments
+    ---------
+    table: PostingTable
+        The postings.
+    rows: list of int
+        The selected rows. See select.
+    depth: optional, None or int
+        The number of account levels. The sub-accounts balances are
+        added to their parents at this level.
+
+    Returns
+    -------
+    list of tuple
+        The (account, Balance) of each account with a non-zero balance,
+        sorted by account, followed by ('', total).
+    """
+    accounts = table.accounts
+    commodities = table.commodities
+    units = table.units
+
+    # Sum by (account id, commodity id) first.
+    sums = {}
+    for row in rows:
+        key = (accounts[row], commodities[row])
+        sums[key] = sums.get(key, 0) + units[row]
+
+    names = account_names(table, depth)
+    balances = {}
+    total = Balance()
+
+    for (account, commodity), value in sums.items():
+        name = names[account]
+        number = table.number(value, commodity)
+        if name not in balances:
+            balances[name] = Balance()
+        balances[name].add_number(number, table.commodity_names[commodity])
+        total.add_number(number, table.commodity_names[commodity])
+
+    report = [(name, balances[name])
+              for name in sorted(balances) if balances[name]]
+    report.append(('', total))
+
+    return report
+
+
+def register_report(table, rows):
+    """Lists the postings with the running total of their commodity.
+
+    Arguments
+    ---------
+    table: PostingTable
+        The postings.
+    rows: list of int
+        The selected rows. See select.
+
+    Returns
+    -------
+    list of tuple
+        The (date ordinal, payee, account, Amount, running total Amount)
+        of each posting, sorted by date.
+    """
+    dates = table.dates
+    rows = sorted(rows, key=dates.__getitem__)
+
+    running = {}
+    report = []
+
+    for row in rows:
+        commodity = table.commodities[row]
+        value = table.units[row]
+        running[commodity] = running.get(commodity, 0) + value
+
+        name = table.commodity_names[commodity]
+        report.append((
+            dates[row],
+            table.payee_names[table.payees[row]],
+            table.account_names[table.accounts[row]],
+            Amount(table.number(value, commodity), name),
+            Amount(table.number(running[commodity], commodity), name)))
+
+    return report
+
+
+def monthly_report(table, rows):
+    """Sums the postings by month.
+
+    Arguments
+    ---------
+    table: PostingTable
+        The postings.
+    rows: list of int
+        The selected rows. See select.
+
+    Returns
+    -------
+    list of tuple
+        The (year, month, Balance) of each month with postings, sorted.
+    """
+    months = table.months
+    commodities = table.commodities
+    units = table.units
+
+    sums = {}
+    for row in rows:
+        key = (months[row], commodities[row])
+        sums[key] = sums.get(key, 0) + units[row]
+
+    balances = {}
+    for (month, commodity), value in sums.items():
+        if month not in balances:
+            balances[month] = Balance()
+        balances[month].add_number(
+            table.number(value, commodity),
+            table.commodity_names[commodity])
+
+    return [(month // 12, month % 12 + 1, balances[month])
+            for month in sorted(balances)]
+
+
+def format_report(kind, report):
+    """Formats a report as text.
+
+    Arguments
+    ---------
+    kind: str
+        The report kind: 'balance', 'register' or 'monthly'.
+    report: list
+        The report, as given by the corresponding function.
+    """
+    lines = []
+
+    if kind == 'balance':
+        for name, balance in report:
+            if not name:
+                lines.append('-' * 40)
+            lines.append('{:>20}  {}'.format(str(balance), name))
+
+    elif kind == 'register':
+        date_strings = {}
+        for ordinal, payee, account, amount, running in report:
+            if ordinal not in date_strings:
+                date_strings[ordinal] = datetime.date.fromordinal(
+                    ordinal).strftime('%Y/%m/%d')
+            lines.append('{}  {:<25.25}  {:<30.30}  {:>14}  {:>14}'.format(
+                date_strings[ordinal], payee, account, str(amount),
+                str(running)))
+
+    elif kind == 'monthly':
+        for year, month, balance in report:
+            lines.append('{}/{:02d}  {}'.format(year, month, balance))
+
+    else:
+        raise ValueError('Unknown report kind {}.'.format(kind))
+
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,246 @@
+"""
+Reads ledger files block by block.
+
+A block is a non-indented line (a transaction header, a command, a
+comment, ...) followed by the indented lines below it. Files are read
+by chunks so that the memory used does not depend on the file size.
+
+@author: Etienne Monier <etienne.monier@enseeiht.fr>
+@license: CC-BY-NC-SA
+@since: 2026-10-17
+"""
+
+import collections
+
+
+# The number of characters read at once.
+CHUNK_SIZE = 1 << 16
+
+# The comment characters.
+COMMENT_CHARS = ';#%|*'
+
+
+class Block(collections.namedtuple('Block', ['kind', 'begin', 'text'])):
+    """A ledger block.
+
+    Attributes
+    ----------
+    kind: str
+        The block kind. One of 'user_transaction',
+        'automatic_transaction', 'periodic_transaction', 'directive',
+        'comment' or 'unknown' (indented lines without header).
+    begin: int
+        The position of the block in the file, in characters.
+    text: str
+        The block lines, with their end of line.
+    """
+
+    __slots__ = ()
+
+    @property
+    def header(self):
+        """The first line of the block, without end of line.
+        """
+        return self.text.split('\n', 1)[0]
+
+    @property
+    def end(self):
+        """The position of the end of the block in the file.
+        """
+        return self.begin + len(self.text)
+
+
+def block_kind(line):
+    """Returns the kind of the block beginning with LINE.
+    """
+    first_char = line[:1]
+
+    if first_char.isdigit():
+        return 'user_transaction'
+    elif first_char == '=':
+        return 'automatic_transaction'
+    elif first_char == '~':
+        return 'periodic_transaction'
+    elif first_char in COMMENT_CHARS:
+        return 'comment'
+    else:
+        return 'directive'
+
+
+def iter_lines(filename, chunk_size=CHUNK_SIZE):
+    """Yields the lines of a file, with their end of line. The file is
+    read by chunks of CHUNK_SIZE characters.
+
+    Arguments
+    ---------
+    filename: str
+        The file location.
+    chunk_size: int
+        The number of characters read at once.
+    """
+    with open(filename, encoding="utf-8") as file:
+
+        # The beginning of a line which continues in the next chunk.
+        rest = ''
+
+        while True:
+            chunk = file.read(chunk_size)
+            if not chunk:
+                break
+
+            lines = (rest + chunk).split('\n')
+            rest = lines.pop()
+
+            for line in lines:
+                yield line + '\n'
+
+        if rest:
+            yield rest
+
+
+def iter_blocks_from_lines(lines):
+    """Groups lines into blocks. Empty lines are dropped.
+
+    Arguments
+    ---------
+    lines: iterable of str
+        The lines, with their end of line.
+
+    Yields
+    ------
+    Block
+    """
+    # The current block.
+    kind = None
+    begin = 0
+    block_lines = []
+
+    position = 0
+    for line in lines:
+
+        if line[:1] in (' ', '\t') and line.strip():
+            # Indented line: the current block goes on.
+            if not block_lines:
+                kind, begin = 'unknown', position
+            block_lines.append(line)
+
+        else:
+            # A new block begins.
+            if block_lines:
+                yield Block(kind, begin, ''.join(block_lines))
+                block_lines = []
+
+            if line.strip():
+                kind, begin = block_kind(line), position
+                block_lines.append(line)
+
+        position += len(line)
+
+    if block_lines:
+        yield Block(kind, begin, ''.join(block_lines))
+
+
+def iter_blocks(filename, chunk_size=CHUNK_SIZE):
+    """Yields the blocks of a ledger file, one at a time.
+
+    Arguments
+    ---------
+    filename: str
+        The file location.
+    chunk_size: int
+        The number of characters read at once.
+
+    Yields
+    ------
+    Block
+    """
+    return iter_blocks_from_lines(iter_lines(filename, chunk_size))
+
+
+def split_blocks(text):
+    """Returns the blocks of a ledger text.
+
+    Arguments
+    ---------
+    text: str
+        The ledger text.
+
+    Returns
+    -------
+    list of Block
+    """
+    lines = [line + '\n' for line in text.split('\n')]
+    lines[-1] = lines[-1][:-1]
+
+    return list(iter_blocks_from_lines(lines))
+
+
+class BlockTable():
+    """Information computed for some blocks of a text, e.g. a view.
+
+    The information is stored by block content. When the text is
+    modified, only the blocks whose content changed are analyzed again.
+    Subclasses define the analyzed block kinds and the analysis, compute.
+
+    Attributes
+    ----------
+    kinds: tuple of str
+        The analyzed block kinds.
+    blocks: dict
+        The information by block text.
+    """
+
+    kinds = ()
+
+    def __init__(self):
+        self.blocks = {}
+
+    def compute(self, block):
+        """Returns the information of a block.
+        """
+        raise NotImplementedError
+
+    def clear(self):
+        """Forgets the information of all blocks.
+        """
+        self.blocks = {}
+
+    def update(self, text, is_cancelled=None):
+        """Analyzes the blocks of a text.
+
+        Arguments
+        ---------
+        text: str
+            The ledger text.
+        is_cancelled: optional, None or function
+            A function returning True if the analysis should be stopped.
+
+        Returns
+        -------
+        None or list of tuple
+            None if the analysis was cancelled. Otherwise, each analyzed
+            block with its information.
+        """
+        blocks = {}
+        results = []
+
+        for block in split_blocks(text):
+
+            if block.kind not in self.kinds:
+                continue
+
+            if is_cancelled is not None and is_cancelled():
+                return None
+
+            try:
+                information = self.blocks[block.text]
+            except KeyError:
+                information = self.compute(block)
+            blocks[block.text] = information
+
+            results.append((block, information))
+
+        # Forget the blocks which disappeared.
+        self.blocks = blocks
+
+        return results
@@ -0,0 +1,347 @@
+"""
+Splits posting lines into an account and an amount.
+
+The lines are scanned once, character by character, without regular
+expressions. The transaction blocks are parsed once for all the
+features (gutter, linter, balances, indexes, ...): the last parsed
+blocks are kept by content.
+
+This module does not depend on Sublime Text.
+
+@author: Etienne Monier <etienne.monier@enseeiht.fr>
+@license: CC-BY-NC-SA
+@since: 2026-10-17
+"""
+
+import collections
+import decimal
+import functools
+import re
+
+from . import ledger_regex
+from .ledger_model import Amount, Posting
+
+
+# The strings which end an account name: hard separators and comment
+# characters.
+ACCOUNT_STOPS = ('  ', ' \t', '\t', ';', '#', '%', '|', '*')
+
+# The currency symbols.
+CURRENCY_SYMBOLS = frozenset('$£¥€¢')
+
+DIGITS = frozenset('0123456789')
+LETTERS = frozenset(
+    'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ')
+
+# The number of parsed blocks kept. A parsed block takes about 1 kB.
+PARSE_CACHE_SIZE = 1 << 15
+
+# The user transaction header pattern.
+HEADER_PATTERN = re.compile(ledger_regex.trans_date_line, re.X)
+
+# A posting line of a block: its position in the block (without end of
+# line), its account and its number (None if not given).
+PostingLine = collections.namedtuple(
+    'PostingLine', ['begin', 'end', 'account', 'number'])
+
+
+def scan_account(line, start):
+    """Scans an account (or payee) name. A name can not contain comment
+    characters, tabs or several consecutive spaces.
+
+    Arguments
+    ---------
+    line: str
+        The line, without end of line.
+    start: int
+        The position of the name in the line.
+
+    Returns
+    -------
+    int
+        The position of the end of the name.
+    """
+    end = len(line)
+
+    # Each search is done by str.find and stops at the closest stop
+    # found so far, so the line is scanned in linear time.
+    for stop in ACCOUNT_STOPS:
+        position = line.find(stop, start, end)
+        if position != -1:
+            end = position
+
+    # A single space may precede a comment or the end of line.
+    while end > start and line[end - 1] == ' ':
+        end -= 1
+
+    return end
+
+
+def parse_number(line, start):
+    """Scans a number such as -1,000.50.
+
+    Arguments
+    ---------
+    line: str
+        The line.
+    start: int
+        The position of the number in the line.
+
+    Returns
+    -------
+    tuple
+        The number as a tuple (negative, integer digits, decimal
+        digits) and its end position. The number is None if there is no
+        number at START.
+    """
+    position = start
+    length = len(line)
+
+    negative = position < length and line[position] == '-'
+    if negative:
+        position += 1
+
+    # Integer part, with thousands separators.
+    digits_start = position
+    while position < length and (
+            line[position] in DIGITS or
+            (line[position] == ',' and position > digits_start)):
+        position += 1
+
+    # A trailing comma does not belong to the number.
+    if position > digits_start and line[position - 1] == ',':
+        position -= 1
+
+    if position == digits_start:
+        return None, start
+
+    integer = line[digits_start:position].replace(',', '')
+
+    # Decimal part.
+    decimals = ''
+    if position + 1 < length and line[position] == '.' and \
+            line[position + 1] in DIGITS:
+        decimals_start = position + 1
+        position += 1
+        while position < length and line[position] in DIGITS:
+            position += 1
+        decimals = line[decimals_start:position]
+
+    return (negative, integer, decimals), position
+
+
+def number_value(number):
+    """Converts a scanned number into an int or a float.
+    """
+    negative, integer, decimals = number
+
+    if decimals:
+        value = float(integer + '.' + decimals)
+    else:
+        value = int(integer)
+
+    return -value if negative else value
+
+
+def number_decimal(number):
+    """Converts a scanned number into an exact decimal number, with all
+    its decimals.
+    """
+    negative, integer, decimals = number
+
+    text = integer + '.' + decimals if decimals else integer
+
+    return decimal.Decimal('-' + text if negative else text)
+
+
+def parse_amount(line, start=0):
+    """Scans an amount: a number with an optional currency (€10, 10 EUR
+    or 10 "a long name").
+
+    Arguments
+    ---------
+    line: str
+        The line.
+    start: int
+        The position of the amount in the line.
+        Default: 0
+
+    Returns
+    -------
+    None, int, float or Amount
+        None if there is no amount at START, a number if there is no
+        currency, else the Amount.
+    """
+    position = start
+    length = len(line)
+
+    # A sign may be written before the currency symbol.
+    negative = position < length and line[position] == '-' and \
+        position + 1 < length and line[position + 1] in CURRENCY_SYMBOLS
+    if negative:
+        position += 1
+
+    # Currency symbol
+    currency = ''
+    if position < length and line[position] in CURRENCY_SYMBOLS:
+        currency = line[position]
+        position += 1
+
+    number, position = parse_number(line, position)
+    if number is None:
+        return None
+
+    if negative:
+        number = (not number[0],) + number[1:]
+
+    if not currency and position + 1 < length and line[position] == ' ':
+
+        # Currency name
+        if line[position + 1] in LETTERS:
+            end = position + 1
+            while end < length and line[end] in LETTERS:
+                end += 1
+            currency = line[position + 1:end]
+
+        # Currency long name
+        elif line[position + 1] == '"':
+            end = line.find('"', position + 2)
+            if end > position + 2:
+                currency = line[position + 1:end + 1]
+
+    if not currency:
+        # That was a multiplier
+        return number_value(number)
+
+    # That was an amount
+    return Amount(number_decimal(number), currency)
+
+
+class ParsedBlock(collections.namedtuple(
+        'ParsedBlock', ['header', 'date', 'payee', 'postings'])):
+    """A transaction block, as read by parse_block.
+
+    Attributes
+    ----------
+    header: str
+        The first line.
+    date: None or str
+        The date of a user transaction. None if the header is not a
+        user transaction header.
+    payee: None or str
+        The payee of a user transaction.
+    postings: tuple of PostingLine
+        The posting lines.
+    """
+
+    __slots__ = ()
+
+    def new_postings(self):
+        """Returns new Posting objects for the posting lines. They can be
+        modified, e.g. when the missing amount is computed.
+        """
+        return [Posting(posting.account, posting.number)
+                for posting in self.postings]
+
+
+@functools.lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_block(text):
+    """Splits a transaction block into its header and posting lines.
+
+    The result is shared by all the callers parsing the same block, so
+    it should not be modified.
+
+    Arguments
+    ---------
+    text: str
+        The block text.
+
+    Returns
+    -------
+    ParsedBlock
+    """
+    lines = text.split('\n')
+
+    date = payee = None
+    m = HEADER_PATTERN.match(lines[0])
+    if m:
+        date, payee = m.group(1), m.group(2)
+
+    postings = []
+    line_begin = len(lines[0]) + 1
+    for line in lines[1:]:
+
+        line_end = line_begin + len(line)
+
+        # Notes and empty lines are skipped at once.
+        if line[:1] in (' ', '\t'):
+            posting = scan_posting(line)
+
+            if posting is not None:
+                postings.append(PostingLine(
+                    line_begin, line_end, posting[0], posting[1]))
+
+        line_begin = line_end + 1
+
+    return ParsedBlock(lines[0], date, payee, tuple(postings))
+
+
+def parse_posting(line):
+    """Analyzes a posting line such as
+
+        Expenses:Food        10.50 EUR  ; A note
+
+    Arguments
+    ---------
+    line: str
+        The line, without end of line.
+
+    Returns
+    -------
+    None or Posting
+        None if the line is not a posting, else the posting. Its number
+        is None if no amount is given.
+    """
+    result = scan_posting(line)
+
+    if result is None:
+        return None
+
+    return Posting(*result)
+
+
+def scan_posting(line):
+    """Analyzes a posting line. See parse_posting.
+
+    Returns
+    -------
+    None or tuple
+        None if the line is not a posting, else its account and number.
+    """
+    length = len(line)
+
+    # Postings are indented.
+    if not length or line[0] not in ' \t':
+        return None
+
+    start = 1
+    while start < length and line[start] in ' \t':
+        start += 1
+
+    end = scan_account(line, start)
+    if end == start:
+        # Empty line or note.
+        return None
+
+    account = line[start:end]
+
+    # The amount follows a hard separator.
+    position = end
+    while position < length and line[position] in ' \t':
+        position += 1
+
+    number = None
+    if position > end and position < length:
+        number = parse_amount(line, position)
+
+    return account, number
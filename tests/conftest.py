@@ -0,0 +1,55 @@
+"""
+Makes the package importable as LedgerTools in the tests, with the fake
+sublime module of the benchmarks.
+
+@author: Etienne Monier <etienne.monier@enseeiht.fr>
+@license: CC-BY-NC-SA
+@since: 2026-10-17
+"""
+
+import os.path
+import sys
+
+PACKAGE_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__)))
+
+sys.path.insert(0, os.path.join(PACKAGE_DIRECTORY, 'benchmarks'))
+
+import fake_sublime  # noqa: E402
+
+fake_sublime.install(PACKAGE_DIRECTORY)
+
+import pytest  # noqa: E402
+
+from LedgerTools import ledger_cache  # noqa: E402
+
+
+@pytest.fixture
+def cache_directory(tmpdir):
+    """Stores the parse cache in a temporary directory and starts from an
+    empty cache.
+    """
+    directory = str(tmpdir.mkdir('cache'))
+    ledger_cache.set_cache_directory(directory)
+    ledger_cache.clear()
+
+    yield directory
+
+    ledger_cache.set_cache_directory(None)
+    ledger_cache.clear()
+
+
+@pytest.fixture
+def write_journal(tmpdir, cache_directory):
+    """Returns a function writing journal files in a temporary directory.
+    It takes (name, text) pairs and returns the file locations.
+    """
+    def write(*files):
+        locations = []
+        for name, text in files:
+            location = tmpdir.join(name)
+            location.write(text)
+            locations.append(str(location))
+        return locations
+
+    return write
@@ -0,0 +1,119 @@
+"""
+Tests the amount alignment command on the fake view.
+
+@author: Etienne Monier <etienne.monier@enseeiht.fr>
+@license: CC-BY-NC-SA
+@since: 2026-10-17
+"""
+
+import fake_sublime
+
+from LedgerTools import AlignAmount
+from LedgerTools import ledger_align
+
+
+TEXT = (
+    '2020/01/01 Shop\n'
+    '    Expenses:Food  10.00 EUR\n'
+    '    Assets:Bank  -10.00 EUR\n'
+    '\n'
+    '2020/01/02 Shop\n'
+    '    Expenses:Car  20.00 EUR\n'
+    '    Assets:Bank  -20.00 EUR\n')
+
+
+def align(view, dirty_only=False):
+    AlignAmount.LedgerAlignAmountsCommand(view).run(
+        fake_sublime.Edit(), dirty_only=dirty_only)
+
+
+def test_one_replacement_per_block():
+    view = fake_sublime.View(TEXT)
+    second = TEXT.index('2020/01/02')
+    view.add_regions(AlignAmount.DIRTY_REGIONS_KEY, [
+        fake_sublime.Region(0, 1),
+        fake_sublime.Region(second, second + 1)])
+
+    align(view, dirty_only=True)
+
+    assert view.change_count() == 2
+    assert view.content() == ledger_align.apply_edits(
+        TEXT, ledger_align.alignment_edits(TEXT))
+
+
+def test_aligned_text_is_not_modified():
+    aligned = ledger_align.apply_edits(
+        TEXT, ledger_align.alignment_edits(TEXT))
+    view = fake_sublime.View(aligned)
+
+    align(view)
+
+    assert view.change_count() == 0
+
+
+def modify(view, begin, end, text):
+    """Replaces the text between BEGIN and END and marks it as Sublime
+    does after the modification.
+    """
+    view.replace(fake_sublime.Edit(), fake_sublime.Region(begin, end), text)
+    view.selection = [fake_sublime.Region(begin + len(text))]
+    AlignAmount.alignOnModified().mark_dirty(
+        view, len(text) - (end - begin))
+
+
+def block_texts(view):
+    return [view.substr(block) for block in AlignAmount.dirty_blocks(view)]
+
+
+FIRST, SECOND = TEXT.split('\n\n')
+
+
+def test_edit_at_block_boundary():
+    second = TEXT.index('2020/01/02')
+
+    # Typed at the end of the first transaction.
+    view = fake_sublime.View(TEXT)
+    modify(view, second - 2, second - 2, ' ')
+
+    assert block_texts(view) == [FIRST + ' ']
+
+    # Typed at the beginning of the second one.
+    view = fake_sublime.View(TEXT)
+    modify(view, second, second, '1')
+
+    assert block_texts(view) == ['1' + SECOND.rstrip('\n')]
+
+    # A pasted transaction ending at the beginning of the second one:
+    # the cursor line is modified too.
+    view = fake_sublime.View(TEXT)
+    pasted = '2020/01/03 Bakery\n    Expenses  1 EUR\n'
+    modify(view, second, second, pasted)
+
+    assert block_texts(view) == [pasted + SECOND.rstrip('\n')]
+
+
+def test_deletion_spanning_blocks():
+    view = fake_sublime.View(TEXT)
+    modify(view, TEXT.index('Assets:Bank'), TEXT.index('Expenses:Car'), '')
+
+    # The rest of both transactions form a single block.
+    text = view.content()
+    assert block_texts(view) == [text.rstrip('\n')]
+
+    align(view, dirty_only=True)
+
+    assert view.content() == ledger_align.apply_edits(
+        text, ledger_align.alignment_edits(text))
+    assert view.get_regions(AlignAmount.DIRTY_REGIONS_KEY) == []
+
+
+def test_full_alignment_clears_dirty_lines():
+    view = fake_sublime.View(TEXT)
+    modify(view, 0, 0, ' ')
+    modify(view, view.size(), view.size(), '    Assets:Cash  1 EUR\n')
+
+    assert len(AlignAmount.dirty_blocks(view)) == 2
+
+    align(view)
+
+    assert AlignAmount.dirty_blocks(view) == []
@@ -0,0 +1,221 @@
+"""
+Tests the automatic transaction gutters.
+
+@author: Etienne Monier <etienne.monier@enseeiht.fr>
+@license: CC-BY-NC-SA
+@since: 2026-10-17
+"""
+
+import fake_sublime
+import pytest
+
+from LedgerTools import autom_transaction_gutter
+from LedgerTools import utils
+
+
+@pytest.fixture
+def definition(write_journal):
+    return write_journal(
+        ('main.ledger',
+         'include rules.ledger\n\n'
+         '= /Food/\n    Budget:Food  -1\n    Assets:Budget  1\n'),
+        ('rules.ledger',
+         '= /Car/\n    Budget:Car  -1\n    Assets:Budget  1\n'))
+
+
+TEXT = ('2021/01/01 Shop\n'
+        '    Expenses:Food  10 EUR\n'
+        '    Expenses:Car  20 EUR\n'
+        '    Assets:Bank\n')
+
+
+def test_gutter_lines(definition):
+    main, _ = definition
+    matcher = autom_transaction_gutter.get_automatic_transaction_matcher(
+        main)
+
+    gutter_index = autom_transaction_gutter.compute_gutter_settings(
+        TEXT, matcher)
+
+    assert [TEXT[line.begin():line.end()] for line in gutter_index.lines] \
+        == ['    Expenses:Food  10 EUR', '    Expenses:Car  20 EUR']
+
+
+def test_definition_of_included_rule(definition):
+    main, included = definition
+    matcher = autom_transaction_gutter.get_automatic_transaction_matcher(
+        main)
+
+    gutter_index = autom_transaction_gutter.compute_gutter_settings(
+        TEXT, matcher)
+
+    assert gutter_index.definition(0) == (main, 'Food')
+    assert gutter_index.definition(1) == (included, 'Car')
+
+
+def test_unsupported_period_is_not_marked(definition):
+    main, _ = definition
+    matcher = autom_transaction_gutter.get_automatic_transaction_matcher(
+        main)
+    text = '~ /Food/\n    Expenses:Food  10 EUR\n    Assets:Bank\n'
+
+    gutter_index = autom_transaction_gutter.compute_gutter_settings(
+        text, matcher)
+
+    assert gutter_index.lines == []
+
+
+class CountingTable(autom_transaction_gutter.GutterTable):
+    """A gutter table recording the analyzed blocks.
+    """
+
+    def __init__(self):
+        autom_transaction_gutter.GutterTable.__init__(self)
+        self.computed = []
+
+    def compute(self, block):
+        self.computed.append(block.text)
+        return autom_transaction_gutter.GutterTable.compute(self, block)
+
+
+OTHER = ('2021/01/02 Garage\n'
+         '    Expenses:Car  30 EUR\n'
+         '    Assets:Bank\n')
+
+
+def line_texts(text, gutter_index):
+    return [text[line.begin():line.end()] for line in gutter_index.lines]
+
+
+def test_unchanged_blocks_are_reused(definition):
+    main, _ = definition
+    matcher = autom_transaction_gutter.get_automatic_transaction_matcher(
+        main)
+    table = CountingTable()
+    table.update(TEXT + '\n' + OTHER, matcher)
+
+    # The first transaction grows: the second one is only shifted.
+    table.computed = []
+    text = TEXT.replace('Shop', 'Big shop') + '\n' + OTHER
+    gutter_index = table.update(text, matcher)
+
+    assert table.computed == [TEXT.replace('Shop', 'Big shop')]
+    assert line_texts(text, gutter_index) == [
+        '    Expenses:Food  10 EUR', '    Expenses:Car  20 EUR',
+        '    Expenses:Car  30 EUR']
+
+
+def test_table_is_cleared_when_matcher_changes(definition):
+    main, included = definition
+    matcher = autom_transaction_gutter.get_automatic_transaction_matcher(
+        main)
+    table = CountingTable()
+    table.update(TEXT, matcher)
+
+    with open(included, 'w') as file:
+        file.write('= /Bank/\n    Budget:Bank  -1\n    Assets:Budget  1\n')
+    new_matcher = \
+        autom_transaction_gutter.get_automatic_transaction_matcher(main)
+
+    table.computed = []
+    gutter_index = table.update(TEXT, new_matcher)
+
+    assert new_matcher is not matcher
+    assert table.computed == [TEXT]
+    assert line_texts(TEXT, gutter_index) == [
+        '    Expenses:Food  10 EUR', '    Assets:Bank']
+
+
+def test_find_at_line_edges(definition):
+    main, _ = definition
+    matcher = autom_transaction_gutter.get_automatic_transaction_matcher(
+        main)
+    gutter_index = autom_transaction_gutter.compute_gutter_settings(
+        TEXT, matcher)
+    first, second = gutter_index.lines
+    Region = fake_sublime.Region
+
+    # The header line ends right before the first gutter line.
+    assert gutter_index.find(Region(0, first.begin() - 1)) is None
+    assert gutter_index.find(Region(first.begin(), first.begin())) is None
+    assert gutter_index.find(Region(first.begin(), first.end())) == 0
+    assert gutter_index.find(Region(first.end() - 1, first.end())) == 0
+    assert gutter_index.find(Region(second.begin(), second.end())) == 1
+    assert gutter_index.find(Region(second.end(), len(TEXT))) is None
+
+
+@pytest.fixture
+def listen(definition, tmpdir, monkeypatch):
+    """Returns a function opening a ledger view and computing its gutters
+    as the plugin does on load.
+    """
+    main, _ = definition
+    settings = utils.get_settings()
+    monkeypatch.setitem(settings.values, 'definition_filename', main)
+
+    def open_view(name, text):
+        view = fake_sublime.View(text, str(tmpdir.join(name)))
+        listener = \
+            autom_transaction_gutter.AutomaticTransactionGutterUpdateOnSave(
+                view)
+        listener.on_load()
+        return view, listener
+
+    yield open_view
+
+    autom_transaction_gutter.GUTTER_INDEXES.clear()
+    autom_transaction_gutter.AutomaticTransactionGutterUpdateOnSave \
+        .tables.clear()
+
+
+def test_views_have_their_own_gutters(listen):
+    view, listener = listen('view.ledger', TEXT)
+    other_view, _ = listen('other.ledger', OTHER)
+    indexes = autom_transaction_gutter.GUTTER_INDEXES
+
+    assert line_texts(TEXT, indexes[view.id()]) == [
+        '    Expenses:Food  10 EUR', '    Expenses:Car  20 EUR']
+    assert line_texts(OTHER, indexes[other_view.id()]) == [
+        '    Expenses:Car  30 EUR']
+    assert view.get_regions('autom_tran') == indexes[view.id()].lines
+
+    # Closing a view keeps the gutters of the other one.
+    listener.on_close()
+
+    assert view.id() not in indexes
+    assert line_texts(OTHER, indexes[other_view.id()]) == [
+        '    Expenses:Car  30 EUR']
+
+
+def test_tooltips_are_rendered_on_hover(listen, monkeypatch):
+    rendered = []
+    format_tooltip = autom_transaction_gutter.format_tooltip
+
+    def counting_format_tooltip(postings_list, autom_trans_regex):
+        rendered.append(autom_trans_regex)
+        return format_tooltip(postings_list, autom_trans_regex)
+
+    monkeypatch.setattr(autom_transaction_gutter, 'format_tooltip',
+                        counting_format_tooltip)
+
+    view, _ = listen('view.ledger', TEXT)
+    popups = []
+    view.show_popup = lambda content, **kwargs: popups.append(content)
+
+    # Computing the gutters does not render any tooltip.
+    assert rendered == []
+
+    controller = autom_transaction_gutter.TooltipController()
+    food = TEXT.index('Expenses:Food')
+    car = TEXT.index('Expenses:Car')
+
+    controller.on_hover(view, food, fake_sublime.HOVER_GUTTER)
+    controller.on_hover(view, food + 5, fake_sublime.HOVER_GUTTER)
+    controller.on_hover(view, car, fake_sublime.HOVER_GUTTER)
+    # The header line has no gutter.
+    controller.on_hover(view, 0, fake_sublime.HOVER_GUTTER)
+
+    assert rendered == ['Food', 'Car']
+    assert len(popups) == 3
+    assert popups[0] is popups[1]
+    assert 'Budget:Food' in popups[0] and 'Budget:Car' in popups[2]
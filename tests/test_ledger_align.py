@@ -0,0 +1,49 @@
+"""
+Tests the amount alignment edits.
+
+@author: Etienne Monier <etienne.monier@enseeiht.fr>
+@license: CC-BY-NC-SA
+@since: 2026-10-17
+"""
+
+from LedgerTools.ledger_align import alignment_edits, apply_edits
+
+
+TEXT = (
+    '2020/01/01 Shop\n'
+    '    Expenses:Food  10.00 EUR\n'
+    '    Assets:Bank{}-10.00 EUR\n'
+    '\n').format(' ' * 60)
+
+
+def dot_positions(text):
+    return [line.index('.') for line in text.split('\n')
+            if line.startswith('    ')]
+
+
+def test_alignment():
+    aligned = apply_edits(TEXT, alignment_edits(TEXT, dot_pos=30))
+
+    assert dot_positions(aligned) == [30, 30]
+
+
+def test_alignment_is_stable():
+    aligned = apply_edits(TEXT, alignment_edits(TEXT, dot_pos=30))
+
+    assert alignment_edits(aligned, dot_pos=30) == []
+
+
+def test_hard_separator_is_kept():
+    # The amount can not reach the dot position without removing the
+    # separator.
+    aligned = apply_edits(TEXT, alignment_edits(TEXT, dot_pos=10))
+
+    assert '    Expenses:Food  10.00 EUR' in aligned
+    assert '    Assets:Bank  -10.00 EUR' in aligned
+
+
+def test_offset():
+    edits = alignment_edits(TEXT, dot_pos=30, offset=100)
+
+    assert apply_edits(TEXT, edits, offset=100) == \
+        apply_edits(TEXT, alignment_edits(TEXT, dot_pos=30))
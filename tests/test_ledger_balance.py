@@ -0,0 +1,136 @@
+"""
+Tests the balance engine.
+
+@author: Etienne Monier <etienne.monier@enseeiht.fr>
+@license: CC-BY-NC-SA
+@since: 2026-10-17
+"""
+
+import datetime
+
+from LedgerTools import ledger_stream
+from LedgerTools.ledger_balance import (
+    BalanceEngine, clean_account, extract_entries)
+
+
+JOURNAL = '''\
+2021/01/01 Shop
+    Expenses:Food                    10 EUR
+    Assets:Bank
+
+2021/01/02 Shop
+    Expenses 2021                     5 EUR
+    Expenses-Old                      2 EUR
+    Assets:Bank 2
+
+2021/01/03 Shop
+    Expenses                          1 EUR
+    Expenses:Food:Fruits              3 EUR
+    Assets:Bank
+'''
+
+
+def engine_of(text):
+    engine = BalanceEngine()
+    engine.update_source(
+        None, extract_entries(ledger_stream.split_blocks(text)))
+    return engine
+
+
+def strings(amounts):
+    return [str(amount) for amount in amounts]
+
+
+def test_sub_accounts_with_siblings():
+    engine = engine_of(JOURNAL)
+
+    assert engine.sub_accounts('Expenses') == [
+        'Expenses', 'Expenses:Food', 'Expenses:Food:Fruits']
+    assert strings(engine.balance('Expenses')) == ['14 EUR']
+    assert engine.sub_accounts('Assets:Bank') == ['Assets:Bank']
+
+
+def test_balance_at_date():
+    engine = engine_of(JOURNAL)
+
+    assert strings(engine.balance(
+        'Expenses', datetime.date(2021, 1, 2))) == ['10 EUR']
+    assert engine.balance('Expenses', datetime.date(2020, 12, 31)) == []
+
+
+def test_clean_account():
+    assert clean_account('[Budget:Food]') == 'Budget:Food'
+    assert clean_account('(Assets:Cash)') == 'Assets:Cash'
+    assert clean_account('Assets:Loan (car)') == 'Assets:Loan (car)'
+    assert clean_account('(Assets:Loan (car))') == 'Assets:Loan (car)'
+    assert clean_account('[Budget)') == '[Budget)'
+
+
+def test_missing_amount_of_virtual_postings():
+    engine = engine_of(
+        '2021/01/01 Shop\n'
+        '    Expenses:Food                    10 EUR\n'
+        '    (Budget:Food)                   -10 EUR\n'
+        '    Assets:Bank\n'
+        '    [Budget:Savings]                  4 EUR\n'
+        '    [Assets:Budget]\n')
+
+    assert strings(engine.balance('Assets:Bank')) == ['-10 EUR']
+    assert strings(engine.balance('Budget:Food')) == ['-10 EUR']
+    assert strings(engine.balance('Assets:Budget')) == ['-4 EUR']
+
+
+def test_amounts_with_many_decimals():
+    engine = engine_of(
+        '2021/01/01 Broker\n'
+        '    Assets:Broker                    10.125 AAPL\n'
+        '    Assets:Bank                    -1500.50 EUR\n'
+        '\n'
+        '2021/01/02 Broker\n'
+        '    Assets:Broker                    0.00012 BTC\n'
+        '    Assets:Broker                    -0.125 AAPL\n'
+        '    Assets:Bank                        -5 EUR\n')
+
+    assert strings(engine.balance('Assets:Broker')) == \
+        ['10 AAPL', '0.00012 BTC']
+    assert strings(engine.balance('Assets:Bank')) == ['-1505.50 EUR']
+
+
+CANCELLING = '''\
+2021/01/03 Refund
+    Expenses                         -1 EUR
+    Expenses:Food:Fruits             -3 EUR
+    Assets:Bank
+'''
+
+
+def balances(engine, accounts):
+    return [strings(engine.balance(account, date, False))
+            for account in accounts
+            for date in (None, datetime.date(2021, 1, 2))]
+
+
+def test_edits_give_the_balance_of_a_fresh_engine():
+    engine = engine_of(JOURNAL)
+    first, second, third = JOURNAL.split('\n\n')
+    edited = second.replace('5 EUR', '7 EUR').replace('01/02', '01/04')
+
+    for text in (
+            # Editing a transaction, and moving it to another date.
+            '\n\n'.join((first, edited, third)),
+            # Duplicating a transaction.
+            '\n\n'.join((first, edited, edited, third)),
+            # Deleting transactions.
+            '\n\n'.join((edited, third)),
+            third,
+            # Movements cancelling each other on the same day.
+            third + '\n' + CANCELLING,
+            JOURNAL):
+
+        engine.update_source(None, extract_entries(
+            ledger_stream.split_blocks(text), engine.sources[None]))
+
+        # The accounts of the deleted transactions are kept, with an
+        # empty balance.
+        assert balances(engine, engine.accounts) == \
+            balances(engine_of(text), engine.accounts)
@@ -0,0 +1,112 @@
+"""
+Tests the parse cache and its persistent storage.
+
+@author: Etienne Monier <etienne.monier@enseeiht.fr>
+@license: CC-BY-NC-SA
+@since: 2026-10-17
+"""
+
+import os
+import threading
+
+import pytest
+
+from LedgerTools import ledger_cache
+from LedgerTools import ledger_index
+
+
+@pytest.fixture
+def journal(write_journal, cache_directory):
+    main, _ = write_journal(
+        ('main.ledger',
+         'include included.ledger\n\n2021/01/01 Shop\n    A  1 EUR\n'),
+        ('included.ledger', '2021/01/02 Shop\n    B  2 EUR\n'))
+
+    return main, cache_directory
+
+
+def count_blocks(blocks):
+    return sum(1 for block in blocks if block.kind == 'user_transaction')
+
+
+def test_include_order(journal):
+    main, _ = journal
+
+    assert ledger_cache.derive_all(main, 'count', count_blocks) == [1, 1]
+    assert [os.path.basename(cached.filename)
+            for cached in ledger_cache.resolve_includes(main)] == \
+        ['main.ledger', 'included.ledger']
+
+
+def test_information_is_kept_on_disk(journal):
+    main, _ = journal
+    ledger_cache.derive(main, 'count', count_blocks)
+
+    # After a restart, the information is read from the disk.
+    ledger_cache.clear()
+
+    def fail(blocks):
+        raise AssertionError('The file is read again.')
+
+    assert ledger_cache.derive(main, 'count', fail) == 1
+
+    # Only the asked information is loaded.
+    assert list(ledger_cache.get_file(main).derived) == ['count']
+
+
+def test_unpicklable_information(journal):
+    main, cache_directory = journal
+    before = set(os.listdir(cache_directory))
+
+    # Pickling a lock raises a TypeError.
+    value = ledger_cache.derive(main, 'lock', lambda blocks: threading.Lock())
+
+    assert value.acquire()
+    assert set(os.listdir(cache_directory)) == before
+
+
+def test_only_modified_files_are_read_again(journal, tmpdir):
+    main, _ = journal
+    read = []
+
+    def count_usages(blocks):
+        blocks = list(blocks)
+        read.append(blocks[0].text)
+        return ledger_index.extract_usage(blocks)
+
+    ledger_cache.derive_all(main, 'usage', count_usages)
+    tmpdir.join('included.ledger').write(
+        '2021/01/02 Shop\n    Bb  2 EUR\n')
+
+    usages = ledger_cache.derive_all(main, 'usage', count_usages)
+
+    assert [usage.accounts for usage in usages] == [{'A': 1}, {'Bb': 1}]
+    assert read == ['include included.ledger\n',
+                    '2021/01/02 Shop\n    B  2 EUR\n',
+                    '2021/01/02 Shop\n    Bb  2 EUR\n']
+
+
+def names(filename):
+    return [os.path.basename(cached.filename)
+            for cached in ledger_cache.resolve_includes(filename)]
+
+
+def test_unreadable_file_is_ignored(journal, tmpdir):
+    main, _ = journal
+    tmpdir.join('included.ledger').write_binary(b'; \xff\xfe\n')
+
+    assert names(main) == ['main.ledger']
+
+
+def test_glob_include(journal, tmpdir):
+    main, _ = journal
+    tmpdir.join('main.ledger').write('include *.ledger\n')
+
+    # The including file does not match its own pattern.
+    assert names(main) == ['main.ledger', 'included.ledger']
+
+    # The files created afterwards are found, even if the including file
+    # did not change.
+    tmpdir.join('other.ledger').write('2021/01/03 Shop\n    C  3 EUR\n')
+
+    assert names(main) == ['main.ledger', 'included.ledger', 'other.ledger']
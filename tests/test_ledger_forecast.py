@@ -0,0 +1,60 @@
+"""
+Tests the periodic transactions and their occurrences.
+
+@author: Etienne Monier <etienne.monier@enseeiht.fr>
+@license: CC-BY-NC-SA
+@since: 2026-10-17
+"""
+
+import datetime
+
+from LedgerTools import ledger_forecast
+
+
+RENT = '''\
+~ Monthly from 2020/01/31
+    Expenses:Rent                   800 EUR
+    Assets:Bank
+'''
+
+
+def test_parse_period():
+    period = ledger_forecast.parse_period('every 2 weeks from 2020/01/06')
+
+    assert period == ledger_forecast.Period(
+        'week', 2, datetime.date(2020, 1, 6), None)
+    assert ledger_forecast.parse_period('/Re(g|e)x/') is None
+    assert ledger_forecast.parse_period('every 0 days') is None
+
+
+def test_month_ends():
+    period = ledger_forecast.parse_period('monthly from 2020/01/31 to 2020/05')
+    dates = ledger_forecast.occurrences(period, None).between(
+        datetime.date(2020, 1, 1), datetime.date(2021, 1, 1))
+
+    assert [date.day for date in dates] == [31, 29, 31, 30]
+
+
+def test_dates_past_year_9999():
+    period = ledger_forecast.parse_period('every 1000 years from 8000')
+    dates = ledger_forecast.occurrences(period, None).between(
+        datetime.date(2000, 1, 1), datetime.date.max)
+
+    assert [date.year for date in dates] == [8000, 9000]
+
+
+def test_unsupported_period():
+    assert ledger_forecast.parse_periodic_transaction(
+        '~ /Re(g|e)x/\n Test:account_A  1\n Bug:account_D  -1\n') is None
+
+
+def test_forecast_balance():
+    transaction = ledger_forecast.parse_periodic_transaction(RENT)
+
+    assert transaction.period == 'Monthly from 2020/01/31'
+
+    total = ledger_forecast.forecast_balance(
+        [transaction], 'Assets', datetime.date(2020, 3, 1),
+        datetime.date(2020, 5, 31))
+
+    assert str(total) == '-2400 EUR'
@@ -0,0 +1,49 @@
+"""
+Tests the account and payee index.
+
+@author: Etienne Monier <etienne.monier@enseeiht.fr>
+@license: CC-BY-NC-SA
+@since: 2026-10-17
+"""
+
+from LedgerTools import ledger_stream
+from LedgerTools.ledger_index import NameIndex, extract_usage
+
+
+JOURNAL = '''\
+2021/01/01 Shop
+    Expenses:Food                    10 EUR
+    [Budget:Food]                   -10 EUR
+    (Assets:Cash)
+
+2021/01/02 Market
+    Expenses:Food                     5 EUR
+    Assets:Cash
+'''
+
+
+def index_of(text, declared=()):
+    usage = extract_usage(ledger_stream.split_blocks(text))
+
+    index = NameIndex(declared)
+    index.add_counts(usage.counts('account'))
+    index.usages = [usage]
+    return index
+
+
+def test_virtual_accounts_are_counted_with_real_ones():
+    index = index_of(JOURNAL, ['Budget:Food'])
+
+    assert index.ranked() == ['Assets:Cash', 'Expenses:Food', 'Budget:Food']
+    assert index.counts['Assets:Cash'] == 2
+    assert index.counts['Budget:Food'] == 1
+    assert index.prefix('Budg') == ['Budget:Food']
+
+
+def test_uses():
+    index = index_of(JOURNAL)
+
+    count, first, last = index.uses('Expenses:Food', 'account')
+
+    assert count == 2
+    assert (first.day, last.day) == (1, 2)
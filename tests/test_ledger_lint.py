@@ -0,0 +1,110 @@
+"""
+Tests the transaction checks.
+
+@author: Etienne Monier <etienne.monier@enseeiht.fr>
+@license: CC-BY-NC-SA
+@since: 2026-10-17
+"""
+
+from LedgerTools.ledger_lint import LintTable, check_transaction
+
+
+def messages(text):
+    return [problem.message for problem in check_transaction(text)]
+
+
+def test_balanced():
+    assert messages(
+        '2021/01/01 Shop\n'
+        '    Expenses:Food    10.50 EUR\n'
+        '    Assets:Bank\n') == []
+
+
+def test_not_balanced():
+    assert messages(
+        '2021/01/01 Shop\n'
+        '    Expenses:Food    10.50 EUR\n'
+        '    Assets:Bank     -10 EUR\n') == \
+        ['The transaction is not balanced: 0.50 EUR left.']
+
+
+def test_exchange():
+    assert messages(
+        '2021/01/01 Exchange\n'
+        '    Assets:Bank      10 EUR\n'
+        '    Assets:Bank     -12 USD\n') == []
+
+
+def test_decimals_are_exact():
+    assert messages(
+        '2021/01/01 Broker\n'
+        '    Assets:Wallet    0.125 BTC\n'
+        '    Assets:Wallet    0.00012 BTC\n'
+        '    Assets:Exchange  -0.12512 BTC\n') == []
+
+    assert messages(
+        '2021/01/01 Fuel\n'
+        '    Expenses:Fuel    1.859 EUR\n'
+        '    Assets:Bank     -1.86 EUR\n') == \
+        ['The transaction is not balanced: -0.001 EUR left.']
+
+
+def test_trailing_zeros_are_accepted():
+    assert messages(
+        '2021/01/01 Shop\n'
+        '    Expenses:Food    10.500 EUR\n'
+        '    Assets:Bank     -10.5 EUR\n') == []
+
+
+def test_table_positions():
+    text = ('2021/01/01 Shop\n'
+            '    Expenses:Food    10 EUR\n'
+            '    Assets:Bank       -9 EUR\n'
+            '\n'
+            '2021/01/02 Shop\n'
+            '    Expenses:Food    10 EUR\n'
+            '    Assets:Bank\n')
+    problems = LintTable().update(text)
+
+    assert [text[problem.begin:problem.end] for problem in problems] == \
+        ['2021/01/01 Shop']
+
+
+def test_virtual_postings_in_parentheses_are_not_checked():
+    assert messages(
+        '2021/01/01 Shop\n'
+        '    Expenses:Food    10 EUR\n'
+        '    Assets:Bank     -10 EUR\n'
+        '    (Budget:Food)   -10 EUR\n') == []
+
+    # The missing amount is computed from the real postings only.
+    assert messages(
+        '2021/01/01 Shop\n'
+        '    Expenses:Food    10 EUR\n'
+        '    (Budget:Food)   -10 USD\n'
+        '    Assets:Bank\n') == []
+
+
+def test_virtual_postings_in_brackets_are_balanced_apart():
+    assert messages(
+        '2021/01/01 Shop\n'
+        '    Expenses:Food       10 EUR\n'
+        '    Assets:Bank\n'
+        '    [Budget:Food]      -10 EUR\n'
+        '    [Assets:Budget]\n') == []
+
+    assert messages(
+        '2021/01/01 Shop\n'
+        '    Expenses:Food       10 EUR\n'
+        '    Assets:Bank        -10 EUR\n'
+        '    [Budget:Food]      -10 EUR\n'
+        '    [Assets:Budget]      5 EUR\n') == \
+        ['The virtual postings are not balanced: -5 EUR left.']
+
+    # The real postings can not balance the virtual ones.
+    assert messages(
+        '2021/01/01 Shop\n'
+        '    Expenses:Food       10 EUR\n'
+        '    [Budget:Food]      -10 EUR\n') == [
+            'The transaction is not balanced: 10 EUR left.',
+            'The virtual postings are not balanced: -10 EUR left.']
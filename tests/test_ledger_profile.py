@@ -0,0 +1,76 @@
+"""
+Tests the profiling records and their statistics.
+
+@author: Etienne Monier <etienne.monier@enseeiht.fr>
+@license: CC-BY-NC-SA
+@since: 2026-10-17
+"""
+
+import pytest
+
+from LedgerTools import ledger_profile
+
+
+@pytest.fixture
+def profiling():
+    ledger_profile.clear()
+    ledger_profile.configure(True, budget_ms=1000, buffer_size=500)
+
+    yield
+
+    ledger_profile.configure(False)
+    ledger_profile.clear()
+
+
+def test_percentile():
+    values = list(range(1, 11))
+
+    assert ledger_profile.percentile(values, 0.5) == 5
+    assert ledger_profile.percentile(values, 0.95) == 10
+    assert ledger_profile.percentile(values, 0) == 1
+    assert ledger_profile.percentile([7], 0.95) == 7
+
+
+def test_statistics(profiling):
+    for ms in (30, 10, 20):
+        ledger_profile.record('search', ms / 1000, size=100 * ms)
+    ledger_profile.record('align', 0.005, items=4)
+
+    assert ledger_profile.statistics() == [
+        ('align', 1, 5, 5, 5, None, 4),
+        ('search', 3, 20, 30, 30, 3000, None)]
+
+
+def test_ring_buffer_wraps_around(profiling):
+    ledger_profile.configure(True, budget_ms=1000, buffer_size=3)
+
+    for ms in range(1, 6):
+        ledger_profile.record('lint', ms / 1000, items=ms)
+
+    # Only the last 3 calls are kept.
+    (name, calls, p50, p95, maximum, size, items), = \
+        ledger_profile.statistics()
+
+    assert (calls, p50, maximum, items) == (3, 4, 5, 5)
+    assert [round(call.seconds * 1000) for call in
+            ledger_profile.RECORDS['lint']] == [3, 4, 5]
+
+    # A larger buffer keeps the recorded calls.
+    ledger_profile.configure(True, budget_ms=1000, buffer_size=10)
+    ledger_profile.record('lint', 0.006)
+
+    assert len(ledger_profile.RECORDS['lint']) == 4
+
+
+def test_profiled_counts_items(profiling):
+
+    @ledger_profile.profiled('count')
+    def count(values):
+        ledger_profile.set_size(len(values) * 10)
+        ledger_profile.add_items(len(values))
+        return sum(values)
+
+    assert count([1, 2, 3]) == 6
+
+    record, = ledger_profile.RECORDS['count']
+    assert (record.size, record.items) == (30, 3)
@@ -0,0 +1,87 @@
+"""
+Tests the worst case matching time of the journal patterns.
+
+Each pattern is run on long lines which make the end of the pattern fail,
+so that the regex engine backtracks over the whole account or payee name.
+The time bound is generous: a linear match takes a few milliseconds, an
+ambiguous pattern takes seconds.
+
+@author: Etienne Monier <etienne.monier@enseeiht.fr>
+@license: CC-BY-NC-SA
+@since: 2026-10-17
+"""
+
+import re
+import time
+
+import pytest
+
+from LedgerTools import ledger_regex
+
+
+LENGTH = 20000
+BOUND = 0.5
+
+LONG_LINES = [
+    '    ' + 'memo ' * (LENGTH // 5) + 'end',
+    '    a' + '2' * LENGTH + ';',
+    '    a' + ' 2' * (LENGTH // 2) + ';',
+    '    Account' + '  ' + '1' * LENGTH + ' EUR;',
+]
+LINE_IDS = ['words', 'digits', 'spaced-digits', 'amount']
+
+
+def timed_search(pattern, text, flags):
+    start = time.perf_counter()
+    match = re.compile(pattern, flags).search(text)
+    return match, time.perf_counter() - start
+
+
+@pytest.mark.parametrize('line', LONG_LINES, ids=LINE_IDS)
+def test_posting_pattern(line):
+    match, duration = timed_search(
+        ledger_regex.posting_pattern, line + '\n', re.X | re.M)
+
+    assert duration < BOUND
+    assert match is not None
+
+
+@pytest.mark.parametrize('line', LONG_LINES, ids=LINE_IDS)
+def test_trans_date_line(line):
+    text = '2020/01/01 ' + line.strip() + '\n'
+    match, duration = timed_search(
+        ledger_regex.trans_date_line, text, re.X | re.M)
+
+    assert duration < BOUND
+    assert match is not None
+
+
+@pytest.mark.parametrize('line', LONG_LINES, ids=LINE_IDS)
+def test_pattern_autom(line):
+    text = '\n= /Food/\n' + line + '\n'
+    match, duration = timed_search(
+        ledger_regex.pattern_autom, text, re.X)
+
+    assert duration < BOUND
+    assert match is None or match.group(1) == 'Food'
+
+
+def test_pattern_autom_matches():
+    text = ('\n= /Food/\n'
+            '    Budget:Food  -1 EUR\n'
+            '    Assets:Budget\n'
+            '\n')
+    match = re.search(ledger_regex.pattern_autom, text, re.X)
+
+    assert match.group(1) == 'Food'
+    assert match.group(2) == ('    Budget:Food  -1 EUR\n'
+                              '    Assets:Budget\n')
+
+
+def test_posting_pattern_matches():
+    match = re.search(ledger_regex.posting_pattern,
+                      '    Expenses:Food 2  $-1,000.50 EUR ; memo',
+                      re.X | re.M)
+
+    assert match.groups() == ('Expenses:Food 2', '$', '-1,000.50',
+                              ' EUR', '')
@@ -0,0 +1,163 @@
+"""
+Tests the balance, register and monthly reports.
+
+@author: Etienne Monier <etienne.monier@enseeiht.fr>
+@license: CC-BY-NC-SA
+@since: 2026-10-17
+"""
+
+import datetime
+
+import pytest
+
+from LedgerTools import ledger_report, ledger_stream
+
+
+JOURNAL = '''\
+2021/01/15 Grocer
+    Expenses:Food:Fruits             10 EUR
+    Expenses:Food:Bread               2 EUR
+    Assets:Bank
+
+2021/02/01 Landlord
+    Expenses:Rent                   800 EUR
+    Assets:Bank
+
+2021/02/28 Grocer
+    Expenses:Food:Fruits              5 EUR
+    Assets:Bank
+'''
+
+
+def table_of(text):
+    return ledger_report.extract_table(ledger_stream.split_blocks(text))
+
+
+def test_commodity_scales():
+    first = table_of(
+        '2021/01/01 Broker\n'
+        '    Assets:Broker    10.5 AAPL\n'
+        '    Assets:Bank     -100 EUR\n'
+        '\n'
+        '2021/01/02 Broker\n'
+        '    Assets:Broker    0.125 AAPL\n'
+        '    Assets:Bank     -1.25 EUR\n')
+    second = table_of(
+        '2021/01/03 Broker\n'
+        '    Assets:Broker    0.0001 AAPL\n'
+        '    Assets:Bank     -1 EUR\n')
+
+    assert first.commodity_scales == [3, 2]
+    assert list(first.units) == [10500, -10000, 125, -125]
+
+    table = ledger_report.merge_tables([first, second])
+    report = ledger_report.balance_report(table, range(len(table)))
+
+    assert [(name, str(balance)) for name, balance in report] == [
+        ('Assets:Bank', '-102.25 EUR'),
+        ('Assets:Broker', '10.6251 AAPL'),
+        ('', '10.6251 AAPL, -102.25 EUR')]
+
+
+def strings(report):
+    return [(name, str(balance)) for name, balance in report]
+
+
+def test_select():
+    table = table_of(JOURNAL)
+
+    assert ledger_report.select(table) == list(range(7))
+    assert ledger_report.select(table, 'Food') == [0, 1, 5]
+    # The bounds are included.
+    assert ledger_report.select(
+        table, begin=datetime.date(2021, 2, 1),
+        end=datetime.date(2021, 2, 28)) == [3, 4, 5, 6]
+    assert ledger_report.select(
+        table, 'Food', end=datetime.date(2021, 1, 15)) == [0, 1]
+    assert ledger_report.select(
+        table, begin=datetime.date(2021, 3, 1)) == []
+
+
+def test_parse_query():
+    assert ledger_report.parse_query(
+        'Expenses Food from:2021/02/01 to:2021/02/28 depth:2') == {
+            'pattern': 'Expenses Food',
+            'begin': datetime.date(2021, 2, 1),
+            'end': datetime.date(2021, 2, 28),
+            'depth': 2}
+    assert ledger_report.parse_query('') == {
+        'pattern': None, 'begin': None, 'end': None, 'depth': None}
+
+    with pytest.raises(ValueError):
+        ledger_report.parse_query('from:2021/13/01')
+    with pytest.raises(ValueError):
+        ledger_report.parse_query('depth:two')
+
+
+def test_balance_report_depth():
+    table = table_of(JOURNAL)
+    rows = ledger_report.select(table, 'Expenses')
+
+    assert strings(ledger_report.balance_report(table, rows)) == [
+        ('Expenses:Food:Bread', '2 EUR'),
+        ('Expenses:Food:Fruits', '15 EUR'),
+        ('Expenses:Rent', '800 EUR'),
+        ('', '817 EUR')]
+    # The sub-accounts are rolled up into their parents.
+    assert strings(ledger_report.balance_report(table, rows, depth=2)) == [
+        ('Expenses:Food', '17 EUR'),
+        ('Expenses:Rent', '800 EUR'),
+        ('', '817 EUR')]
+    assert strings(ledger_report.balance_report(table, rows, depth=1)) == [
+        ('Expenses', '817 EUR'),
+        ('', '817 EUR')]
+
+
+def test_balance_report_between_dates():
+    table = table_of(JOURNAL)
+    options = ledger_report.parse_query('from:2021/02/01 to:2021/02/28')
+    rows = ledger_report.select(
+        table, options['pattern'], options['begin'], options['end'])
+
+    # The balanced accounts are left out, not the total.
+    assert strings(ledger_report.balance_report(table, rows, depth=1)) == [
+        ('Assets', '-805 EUR'),
+        ('Expenses', '805 EUR'),
+        ('', '0')]
+
+
+def test_register_report():
+    table = table_of(JOURNAL)
+    rows = ledger_report.select(table, 'Fruits')
+
+    report = ledger_report.register_report(table, list(reversed(rows)))
+
+    assert [(datetime.date.fromordinal(ordinal), payee, account,
+             str(amount), str(running))
+            for ordinal, payee, account, amount, running in report] == [
+        (datetime.date(2021, 1, 15), 'Grocer', 'Expenses:Food:Fruits',
+         '10 EUR', '10 EUR'),
+        (datetime.date(2021, 2, 28), 'Grocer', 'Expenses:Food:Fruits',
+         '5 EUR', '15 EUR')]
+
+
+def test_monthly_report():
+    table = table_of(JOURNAL)
+    rows = ledger_report.select(table, 'Expenses')
+
+    assert [(year, month, str(balance)) for year, month, balance
+            in ledger_report.monthly_report(table, rows)] == [
+        (2021, 1, '12 EUR'), (2021, 2, '805 EUR')]
+
+
+def test_merge_tables():
+    first, second, third = JOURNAL.split('\n\n')
+    table = ledger_report.merge_tables(
+        [table_of(first + '\n\n' + second), table_of(third)])
+    expected = table_of(JOURNAL)
+
+    for column in ledger_report.PostingTable.COLUMNS:
+        assert list(getattr(table, column)) == \
+            list(getattr(expected, column))
+    assert table.account_names == expected.account_names
+    assert table.transaction_count == 3
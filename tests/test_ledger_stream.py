@@ -0,0 +1,51 @@
+"""
+Tests the block reader.
+
+@author: Etienne Monier <etienne.monier@enseeiht.fr>
+@license: CC-BY-NC-SA
+@since: 2026-10-17
+"""
+
+import pytest
+
+from LedgerTools.ledger_stream import iter_blocks, split_blocks
+
+
+TEXT = (
+    '; A comment\n'
+    'include other.ledger\n'
+    '\n'
+    '2021/01/01 Shop\n'
+    '    Expenses:Food    10 EUR\n'
+    '    ; A note\n'
+    '    Assets:Bank\n'
+    '\n'
+    '\n'
+    '= /Food/\n'
+    '    Budget:Food  -1\n'
+    '~ Monthly\n'
+    '    Expenses:Rent    800 EUR\n'
+    '    Assets:Bank\n'
+    '2021/01/02 Last\n'
+    '    Expenses:Food    1 EUR\n'
+    '    Assets:Bank')
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 7, 1 << 16])
+@pytest.mark.parametrize('newline', ['\n', '\r\n'])
+def test_blocks_across_chunks(tmpdir, chunk_size, newline):
+    journal = tmpdir.join('journal.ledger')
+    journal.write_binary(TEXT.replace('\n', newline).encode('utf-8'))
+
+    blocks = list(iter_blocks(str(journal), chunk_size))
+
+    assert blocks == split_blocks(TEXT)
+    assert [block.kind for block in blocks] == [
+        'comment', 'directive', 'user_transaction',
+        'automatic_transaction', 'periodic_transaction',
+        'user_transaction']
+
+    # The last line has no final new line.
+    assert blocks[-1].text.endswith('    Assets:Bank')
+    assert all(TEXT[block.begin:block.end] == block.text
+               for block in blocks)
@@ -0,0 +1,74 @@
+"""
+Tests the posting and block tokenizer.
+
+@author: Etienne Monier <etienne.monier@enseeiht.fr>
+@license: CC-BY-NC-SA
+@since: 2026-10-17
+"""
+
+import decimal
+
+from LedgerTools.ledger_model import Amount
+from LedgerTools.ledger_tokenizer import parse_block, parse_posting
+
+
+BLOCK = '''\
+2021/01/01 * Shop  ; note
+    Expenses:Food                    10.50 EUR
+    ; A comment
+    Assets:Bank
+'''
+
+
+def test_parse_posting():
+    posting = parse_posting('    Expenses:Food    €10.50  ; note')
+
+    assert posting.account == 'Expenses:Food'
+    assert posting.number == Amount('10.50', '€')
+
+    assert parse_posting('    Assets:Bank').number is None
+    assert parse_posting('    ; A comment') is None
+    assert parse_posting('2021/01/01 Shop') is None
+
+
+def test_parse_block():
+    parsed = parse_block(BLOCK)
+
+    assert (parsed.date, parsed.payee) == ('2021/01/01', 'Shop')
+    assert [posting.account for posting in parsed.postings] == \
+        ['Expenses:Food', 'Assets:Bank']
+
+    first = parsed.postings[0]
+    assert BLOCK[first.begin:first.end] == \
+        '    Expenses:Food                    10.50 EUR'
+
+
+def test_parse_block_is_shared():
+    assert parse_block(BLOCK) is parse_block(BLOCK)
+
+    # The postings given to the transactions are new objects.
+    postings = parse_block(BLOCK).new_postings()
+    postings[1].update_number(Amount('-10.50', 'EUR'))
+    assert parse_block(BLOCK).postings[1].number is None
+
+
+def test_parse_block_without_user_header():
+    parsed = parse_block('~ Monthly\n    Expenses:Rent    800 EUR\n')
+
+    assert parsed.date is None
+    assert len(parsed.postings) == 1
+
+
+def test_amounts_are_not_rounded():
+    for line, number in (('    Assets:Broker    10.125 AAPL', '10.125'),
+                         ('    Assets:Wallet    0.00012 BTC', '0.00012'),
+                         ('    Expenses:Fuel    -1,859.999 EUR',
+                          '-1859.999')):
+        assert parse_posting(line).number.number == decimal.Decimal(number)
+
+    assert str(parse_posting('    Assets:Broker    10.125 AAPL').number) == \
+        '10.125 AAPL'
+    assert str(Amount('0.00012', 'BTC')) == '0.00012 BTC'
+    assert str(Amount('10.5', 'EUR')) == '10.50 EUR'
+    assert parse_posting('    Assets:Broker    10.120 AAPL').number == \
+        Amount('10.12', 'AAPL')
@@ -0,0 +1,117 @@
+"""
+Tests the account and payee search indexes.
+
+@author: Etienne Monier <etienne.monier@enseeiht.fr>
+@license: CC-BY-NC-SA
+@since: 2026-10-17
+"""
+
+import fake_sublime
+import pytest
+
+from LedgerTools import SearchAccountPayee
+
+
+@pytest.fixture
+def journal(write_journal):
+    SearchAccountPayee.INDEXES.clear()
+
+    yield write_journal(
+        ('main.ledger',
+         'account Assets:Bank\n'
+         'account Expenses:Car\n'
+         'include journal.ledger\n'),
+        ('journal.ledger',
+         '2021/01/01 Shop\n'
+         '    Expenses:Food  10 EUR\n'
+         '    Assets:Bank\n'
+         '\n'
+         '2021/01/05 Market\n'
+         '    Expenses:Food  5 EUR\n'
+         '    Assets:Bank\n'))
+
+    SearchAccountPayee.INDEXES.clear()
+
+
+def test_counts_follow_the_files(journal, tmpdir):
+    main, included = journal
+    index = SearchAccountPayee.get_index(main, 'account')
+
+    assert index.ranked() == ['Assets:Bank', 'Expenses:Food', 'Expenses:Car']
+    assert index.counts['Expenses:Food'] == 2
+
+    # The counts of the edited file are replaced.
+    tmpdir.join('journal.ledger').write(
+        '2021/01/01 Shop\n'
+        '    Expenses:Fruits  10 EUR\n'
+        '    Assets:Bank\n')
+
+    assert SearchAccountPayee.get_index(main, 'account') is index
+    assert index.ranked() == ['Assets:Bank', 'Expenses:Fruits',
+                              'Expenses:Car']
+    assert index.counts['Expenses:Food'] == 0
+    assert index.counts['Assets:Bank'] == 1
+
+    # The file is not included anymore: its counts are removed.
+    tmpdir.join('main.ledger').write(
+        'account Assets:Bank\n'
+        'account Expenses:Car\n')
+
+    assert SearchAccountPayee.get_index(main, 'account') is index
+    assert index.ranked() == ['Assets:Bank', 'Expenses:Car']
+    assert index.counts['Assets:Bank'] == 0
+    assert not index.is_listed('Expenses:Fruits')
+
+
+def test_journal_files_are_counted(journal, write_journal):
+    main, _ = journal
+    other, = write_journal(
+        ('other.ledger',
+         '2021/02/01 Garage\n'
+         '    Expenses:Car  30 EUR\n'
+         '    Assets:Bank\n'))
+
+    index = SearchAccountPayee.get_index(main, 'payee', [other])
+
+    assert index.ranked() == ['Garage', 'Market', 'Shop']
+
+    # The view is closed: its payees are not counted anymore.
+    index = SearchAccountPayee.get_index(main, 'payee')
+
+    assert index.ranked() == ['Market', 'Shop']
+
+
+def complete(tmpdir, text, prefix):
+    view = fake_sublime.View(text, str(tmpdir.join('view.ledger')))
+
+    return SearchAccountPayee.IndexUpdater().on_query_completions(
+        view, prefix, [len(text)])
+
+
+def test_completions_are_ranked(journal, tmpdir):
+    main, _ = journal
+    for search_key in ('account', 'payee'):
+        SearchAccountPayee.get_index(main, search_key)
+
+    # Most used first, then by name.
+    assert complete(tmpdir, '2021/01/10 Shop\n    Exp', 'Exp') == [
+        ['Expenses:Food\t2 uses', 'Expenses:Food'],
+        ['Expenses:Car\t0 uses', 'Expenses:Car']]
+    # Only the current word is replaced.
+    assert complete(tmpdir, '2021/01/10 Shop\n    [Expenses:F', 'F') == [
+        ['Expenses:Food\t2 uses', 'Food']]
+    assert complete(tmpdir, '2021/01/10 * Ma', 'Ma') == [
+        ['Market\t1 uses', 'Market']]
+    # The amount is not completed.
+    assert complete(tmpdir, '    Assets:Bank  10', '10') is None
+
+
+def test_description_of_uses(journal):
+    main, _ = journal
+    index = SearchAccountPayee.get_index(main, 'account')
+
+    assert SearchAccountPayee.describe_uses(
+        index.uses('Expenses:Food', 'account')) == \
+        'Used 2 times, from 2021-01-01 to 2021-01-05'
+    assert SearchAccountPayee.describe_uses(
+        index.uses('Expenses:Car', 'account')) == 'Used 0 times'
@@ -11,6 +11,29 @@ See README.md for details.
 import sublime
 import os.path
 
+from . import ledger_cache
+from . import ledger_profile
+
+
+def plugin_loaded():
+
+    # Keep the parse cache between sessions, if enabled.
+    if get_settings().get('persistent_cache', True):
+        ledger_cache.set_cache_directory(
+            os.path.join(sublime.cache_path(), 'LedgerTools'))
+
+    # Profile the commands and listeners, if enabled.
+    configure_profiling()
+    get_settings().add_on_change('LedgerTools.profiling', configure_profiling)
+
+
+def configure_profiling():
+    settings = get_settings()
+    ledger_profile.configure(
+        settings.get('profiling', False),
+        settings.get('profiling_budget_ms', 100),
+        settings.get('profiling_buffer_size', 500))
+
 
 def get_settings():
 
@@ -56,3 +79,74 @@ def get_definition_filename():
         return False
 
     return definition_filename
+
+
+class SnapshotAnalysis():
+    """Analyzes snapshots of a view in Sublime's worker thread. To be
+    mixed with sublime_plugin.ViewEventListener.
+
+    An analysis is abandoned as soon as a newer one is requested, and its
+    result is dropped if the view was modified in the meantime. Each
+    subclass defines its own generations dictionary.
+    """
+
+    # The number of the last requested analysis, by view id.
+    generations = {}
+
+    def request_analysis(self, analyze, delay=0):
+        """Requests an analysis of the view after DELAY ms.
+
+        Arguments
+        ---------
+        analyze: function
+            Called in the worker thread with the snapshot text, the view
+            change count and the generation of the analysis.
+        delay: optional, int
+            The delay in ms.
+        """
+        view_id = self.view.id()
+        generation = self.generations.get(view_id, 0) + 1
+        self.generations[view_id] = generation
+
+        sublime.set_timeout(
+            lambda: self.take_snapshot(analyze, generation), delay)
+
+    def cancel_analysis(self):
+        """Drops the requested analysis, if any.
+        """
+        view_id = self.view.id()
+        self.generations[view_id] = self.generations.get(view_id, 0) + 1
+
+    def take_snapshot(self, analyze, generation):
+        """Takes a snapshot of the view and analyzes it in the worker
+        thread.
+        """
+        if self.is_outdated(generation) or not self.view.is_valid():
+            return
+
+        change_count = self.view.change_count()
+        text = self.view.substr(sublime.Region(0, self.view.size()))
+
+        sublime.set_timeout_async(
+            lambda: analyze(text, change_count, generation), 0)
+
+    def is_outdated(self, generation):
+        """Returns True if a newer analysis was requested.
+        """
+        return self.generations.get(self.view.id()) != generation
+
+    def publish_analysis(self, publish, change_count, generation):
+        """Calls PUBLISH in the main thread, unless the view was modified
+        or a newer analysis was requested in the meantime.
+        """
+        def publish_if_current():
+            if self.view.change_count() == change_count and \
+                    not self.is_outdated(generation):
+                publish()
+
+        sublime.set_timeout(publish_if_current, 0)
+
+    def forget_analysis(self):
+        """Forgets the analyses of a closed view.
+        """
+        self.generations.pop(self.view.id(), None)